@@ -0,0 +1,154 @@
+# AUTOGENERATED FROM 'app/api/v1/assignments/db_queries/insert_assignment.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class InsertAssignmentResult(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    text: str
+    deadline: datetime.datetime
+    subject: InsertAssignmentResultSubject
+    teacher: InsertAssignmentResultTeacher
+    submissions_count: int
+    done_count: int
+    submissions: list[InsertAssignmentResultSubmissionsItem]
+
+
+@dataclasses.dataclass
+class InsertAssignmentResultSubject(NoPydanticValidation):
+    id: uuid.UUID
+    name: str
+
+
+@dataclasses.dataclass
+class InsertAssignmentResultSubmissionsItem(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    done_by_student: bool
+    grade: int | None
+    student: InsertAssignmentResultSubmissionsItemStudent
+
+
+@dataclasses.dataclass
+class InsertAssignmentResultSubmissionsItemStudent(NoPydanticValidation):
+    id: uuid.UUID
+    user: InsertAssignmentResultTeacherUser
+
+
+@dataclasses.dataclass
+class InsertAssignmentResultTeacher(NoPydanticValidation):
+    id: uuid.UUID
+    user: InsertAssignmentResultTeacherUser
+
+
+@dataclasses.dataclass
+class InsertAssignmentResultTeacherUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+
+
+async def insert_assignment(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    student_ids: list[uuid.UUID],
+    class_ids: list[uuid.UUID],
+    text: str,
+    deadline: datetime.datetime,
+    subject_id: uuid.UUID,
+    teacher_id: uuid.UUID,
+) -> InsertAssignmentResult:
+    return await executor.query_single(
+        """\
+        with
+            students := (
+                select Student
+                filter .id in array_unpack(<array<uuid>>$student_ids)
+                    or .class_.id in array_unpack(<array<uuid>>$class_ids)
+            ),
+            new_assignment := (
+                insert Assignment {
+                    text := <str>$text,
+                    deadline := <datetime>$deadline,
+                    subject := (select Subject filter .id = <uuid>$subject_id),
+                    teacher := (select Teacher filter .id = <uuid>$teacher_id),
+                }
+            ),
+            new_submissions := (
+                for student in students union (
+                    insert Submission {
+                        assignment := new_assignment,
+                        student := student,
+                    }
+                )
+            ),
+        select new_assignment {
+            id,
+            created_at,
+            updated_at,
+            text,
+            deadline,
+            subject: {
+                id,
+                name
+            },
+            teacher: {
+                id,
+                user: {
+                    id,
+                    first_name,
+                    last_name
+                }
+            },
+            submissions_count := count(new_submissions),
+            done_count := 0,
+            submissions := new_submissions {
+                id,
+                created_at,
+                updated_at,
+                done_by_student,
+                grade,
+                student: {
+                    id,
+                    user: {
+                        id,
+                        first_name,
+                        last_name
+                    }
+                }
+            },
+        }\
+        """,
+        student_ids=student_ids,
+        class_ids=class_ids,
+        text=text,
+        deadline=deadline,
+        subject_id=subject_id,
+        teacher_id=teacher_id,
+    )
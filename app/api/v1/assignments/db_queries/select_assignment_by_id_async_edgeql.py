@@ -0,0 +1,133 @@
+# AUTOGENERATED FROM 'app/api/v1/assignments/db_queries/select_assignment_by_id.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class SelectAssignmentByIdResult(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    text: str
+    deadline: datetime.datetime
+    subject: SelectAssignmentByIdResultSubject
+    teacher: SelectAssignmentByIdResultTeacher
+    submissions_count: int
+    done_count: int
+    submissions: list[SelectAssignmentByIdResultSubmissionsItem]
+
+
+@dataclasses.dataclass
+class SelectAssignmentByIdResultSubject(NoPydanticValidation):
+    id: uuid.UUID
+    name: str
+
+
+@dataclasses.dataclass
+class SelectAssignmentByIdResultSubmissionsItem(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    done_by_student: bool
+    grade: int | None
+    student: SelectAssignmentByIdResultSubmissionsItemStudent
+
+
+@dataclasses.dataclass
+class SelectAssignmentByIdResultSubmissionsItemStudent(NoPydanticValidation):
+    id: uuid.UUID
+    user: SelectAssignmentByIdResultTeacherUser
+
+
+@dataclasses.dataclass
+class SelectAssignmentByIdResultTeacher(NoPydanticValidation):
+    id: uuid.UUID
+    user: SelectAssignmentByIdResultTeacherUser
+
+
+@dataclasses.dataclass
+class SelectAssignmentByIdResultTeacherUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+
+
+async def select_assignment_by_id(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    user_id: uuid.UUID,
+    assignment_id: uuid.UUID,
+) -> SelectAssignmentByIdResult | None:
+    return await executor.query_single(
+        """\
+        # Submissions are visible to admins and the assignment's teacher in full,
+        # and to a student only for their own row.
+        with user := (select User filter .id = <uuid>$user_id)
+        select Assignment {
+            id,
+            created_at,
+            updated_at,
+            text,
+            deadline,
+            subject: {
+                id,
+                name
+            },
+            teacher: {
+                id,
+                user: {
+                    id,
+                    first_name,
+                    last_name
+                }
+            },
+            submissions_count := count(.submissions),
+            done_count := count(.submissions filter .done_by_student),
+            submissions := (
+                select .submissions
+                filter user.is_admin or .assignment.teacher.user = user or .student.user = user
+            ) {
+                id,
+                created_at,
+                updated_at,
+                done_by_student,
+                grade,
+                student: {
+                    id,
+                    user: {
+                        id,
+                        first_name,
+                        last_name
+                    }
+                }
+            },
+        }
+        filter .id = <uuid>$assignment_id and (
+            user.is_admin or .teacher.user = user or user in .submissions.student.user
+        )\
+        """,
+        user_id=user_id,
+        assignment_id=assignment_id,
+    )
@@ -0,0 +1,96 @@
+# AUTOGENERATED FROM 'app/api/v1/assignments/db_queries/select_assignments.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class SelectAssignmentsResult(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    text: str
+    deadline: datetime.datetime
+    subject: SelectAssignmentsResultSubject
+    teacher: SelectAssignmentsResultTeacher
+    submissions_count: int
+    done_count: int
+
+
+@dataclasses.dataclass
+class SelectAssignmentsResultSubject(NoPydanticValidation):
+    id: uuid.UUID
+    name: str
+
+
+@dataclasses.dataclass
+class SelectAssignmentsResultTeacher(NoPydanticValidation):
+    id: uuid.UUID
+    user: SelectAssignmentsResultTeacherUser
+
+
+@dataclasses.dataclass
+class SelectAssignmentsResultTeacherUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+
+
+async def select_assignments(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    user_id: uuid.UUID,
+    class_id: uuid.UUID | None,
+) -> list[SelectAssignmentsResult]:
+    return await executor.query(
+        """\
+        with user := (select User filter .id = <uuid>$user_id)
+        select Assignment {
+            id,
+            created_at,
+            updated_at,
+            text,
+            deadline,
+            subject: {
+                id,
+                name
+            },
+            teacher: {
+                id,
+                user: {
+                    id,
+                    first_name,
+                    last_name
+                }
+            },
+            submissions_count := count(.submissions),
+            done_count := count(.submissions filter .done_by_student),
+        }
+        filter (user.is_admin or .teacher.user = user)
+            and ((<optional uuid>$class_id in .submissions.student.class_.id) ?? true)
+        order by .deadline then .id\
+        """,
+        user_id=user_id,
+        class_id=class_id,
+    )
@@ -0,0 +1,141 @@
+# AUTOGENERATED FROM 'app/api/v1/assignments/db_queries/update_assignment.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class UpdateAssignmentResult(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    text: str
+    deadline: datetime.datetime
+    subject: UpdateAssignmentResultSubject
+    teacher: UpdateAssignmentResultTeacher
+    submissions_count: int
+    done_count: int
+    submissions: list[UpdateAssignmentResultSubmissionsItem]
+
+
+@dataclasses.dataclass
+class UpdateAssignmentResultSubject(NoPydanticValidation):
+    id: uuid.UUID
+    name: str
+
+
+@dataclasses.dataclass
+class UpdateAssignmentResultSubmissionsItem(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    done_by_student: bool
+    grade: int | None
+    student: UpdateAssignmentResultSubmissionsItemStudent
+
+
+@dataclasses.dataclass
+class UpdateAssignmentResultSubmissionsItemStudent(NoPydanticValidation):
+    id: uuid.UUID
+    user: UpdateAssignmentResultTeacherUser
+
+
+@dataclasses.dataclass
+class UpdateAssignmentResultTeacher(NoPydanticValidation):
+    id: uuid.UUID
+    user: UpdateAssignmentResultTeacherUser
+
+
+@dataclasses.dataclass
+class UpdateAssignmentResultTeacherUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+
+
+async def update_assignment(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    user_id: uuid.UUID,
+    assignment_id: uuid.UUID,
+    text: str | None,
+    deadline: datetime.datetime | None,
+) -> UpdateAssignmentResult | None:
+    return await executor.query_single(
+        """\
+        with
+            user := (select User filter .id = <uuid>$user_id),
+            updated := (
+                update Assignment
+                filter .id = <uuid>$assignment_id and (user.is_admin or .teacher.user = user)
+                set {
+                    text := <optional str>$text ?? .text,
+                    deadline := <optional datetime>$deadline ?? .deadline,
+                }
+            ),
+        select updated {
+            id,
+            created_at,
+            updated_at,
+            text,
+            deadline,
+            subject: {
+                id,
+                name
+            },
+            teacher: {
+                id,
+                user: {
+                    id,
+                    first_name,
+                    last_name
+                }
+            },
+            submissions_count := count(.submissions),
+            done_count := count(.submissions filter .done_by_student),
+            submissions := (
+                select .submissions
+                filter user.is_admin or .assignment.teacher.user = user or .student.user = user
+            ) {
+                id,
+                created_at,
+                updated_at,
+                done_by_student,
+                grade,
+                student: {
+                    id,
+                    user: {
+                        id,
+                        first_name,
+                        last_name
+                    }
+                }
+            },
+        }\
+        """,
+        user_id=user_id,
+        assignment_id=assignment_id,
+        text=text,
+        deadline=deadline,
+    )
@@ -0,0 +1,94 @@
+# AUTOGENERATED FROM 'app/api/v1/assignments/db_queries/update_submission.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class UpdateSubmissionResult(NoPydanticValidation):
+    id: uuid.UUID
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    done_by_student: bool
+    grade: int | None
+    student: UpdateSubmissionResultStudent
+
+
+@dataclasses.dataclass
+class UpdateSubmissionResultStudent(NoPydanticValidation):
+    id: uuid.UUID
+    user: UpdateSubmissionResultStudentUser
+
+
+@dataclasses.dataclass
+class UpdateSubmissionResultStudentUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+
+
+async def update_submission(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    submission_id: uuid.UUID,
+    assignment_id: uuid.UUID,
+    user_id: uuid.UUID,
+    grade: int | None,
+    done_by_student: bool | None,
+) -> UpdateSubmissionResult | None:
+    return await executor.query_single(
+        """\
+        with updated := (
+            update Submission
+            filter .id = <uuid>$submission_id and
+                .assignment.id = <uuid>$assignment_id and
+                (.student.user.id = <uuid>$user_id or
+                        .assignment.teacher.user.id = <uuid>$user_id)
+            set {
+                grade := <optional int32>$grade ?? .grade,
+                done_by_student := <optional bool>$done_by_student ?? .done_by_student,
+            }
+        )
+        select updated {
+            id,
+            created_at,
+            updated_at,
+            done_by_student,
+            grade,
+            student: {
+                id,
+                user: {
+                    id,
+                    first_name,
+                    last_name
+                }
+            }
+        }\
+        """,
+        submission_id=submission_id,
+        assignment_id=assignment_id,
+        user_id=user_id,
+        grade=grade,
+        done_by_student=done_by_student,
+    )
@@ -0,0 +1,119 @@
+from uuid import UUID
+
+from edgedb.errors import ConstraintViolationError, MissingRequiredError
+from fastapi import Depends, HTTPException, status
+
+from app.dependencies.auth import allow_access, get_user_db
+from app.schemas.auth import FullUser
+from app.server.router import TrailingSlashAPIRouter
+
+from ....schemas.assignments import (
+    Assignment,
+    AssignmentsList,
+    CreateAssignmentPayload,
+    Submission,
+    UpdateAssignmentPayload,
+    UpdateSubmissionPayload,
+)
+from .db_queries.insert_assignment_async_edgeql import insert_assignment
+from .db_queries.select_assignment_by_id_async_edgeql import select_assignment_by_id
+from .db_queries.select_assignments_async_edgeql import select_assignments
+from .db_queries.update_assignment_async_edgeql import update_assignment
+from .db_queries.update_submission_async_edgeql import update_submission
+
+router = TrailingSlashAPIRouter()
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_assignment(
+    payload: CreateAssignmentPayload,
+    db_client=Depends(get_user_db),
+    _: FullUser = Depends(allow_access(teacher=True)),
+) -> Assignment:
+    try:
+        assignment = await insert_assignment(
+            db_client,
+            text=payload.text,
+            deadline=payload.deadline,
+            subject_id=payload.subject_id,
+            teacher_id=payload.teacher_id,
+            student_ids=payload.student_ids,
+            class_ids=payload.class_ids,
+        )
+    except (ConstraintViolationError, MissingRequiredError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+        ) from e
+    return Assignment.model_validate(assignment, from_attributes=True)
+
+
+@router.get("/")
+async def get_assignments(
+    class_id: UUID | None = None,
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(allow_access(teacher=True)),
+) -> AssignmentsList:
+    assignments = await select_assignments(
+        db_client, user_id=user.id, class_id=class_id
+    )
+    return AssignmentsList(
+        data=[Assignment.model_validate(i, from_attributes=True) for i in assignments]
+    )
+
+
+@router.get("/{assignment_id}")
+async def get_assignment_by_id(
+    assignment_id: UUID,
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(allow_access(teacher=True, student=True)),
+) -> Assignment:
+    assignment = await select_assignment_by_id(
+        db_client, assignment_id=assignment_id, user_id=user.id
+    )
+    if assignment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return Assignment.model_validate(assignment, from_attributes=True)
+
+
+@router.patch("/{assignment_id}")
+async def update_assignment_by_id(
+    payload: UpdateAssignmentPayload,
+    assignment_id: UUID,
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(allow_access(teacher=True)),
+) -> Assignment:
+    assignment = await update_assignment(
+        db_client,
+        assignment_id=assignment_id,
+        user_id=user.id,
+        text=payload.text,
+        deadline=payload.deadline,
+    )
+    if assignment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return Assignment.model_validate(assignment, from_attributes=True)
+
+
+@router.patch("/{assignment_id}/submissions/{submission_id}")
+async def update_submission_by_id(
+    payload: UpdateSubmissionPayload,
+    assignment_id: UUID,
+    submission_id: UUID,
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(allow_access(teacher=True, student=True)),
+) -> Submission:
+    if not (user.is_teacher or user.is_admin) and payload.grade is not None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Student can't set grade"
+        )
+    submission = await update_submission(
+        db_client,
+        submission_id=submission_id,
+        assignment_id=assignment_id,
+        user_id=user.id,
+        grade=payload.grade,
+        done_by_student=payload.done_by_student,
+    )
+    if submission is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return Submission.model_validate(submission, from_attributes=True)
@@ -3,27 +3,33 @@ from datetime import timedelta
 import orjson
 from edgedb.asyncio_client import AsyncIOClient
 from edgedb.errors import ConstraintViolationError
-from fastapi import Depends, HTTPException, status
+from fastapi import BackgroundTasks, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from telethon import TelegramClient
-from telethon.types import User as TgUser
 
 from app.dependencies.db import get_db
 from app.dependencies.tg import get_tg
+from app.dependencies.tg_resolver import resolve_tg_users
+from app.dependencies.user_cache import current_user_cache
 from app.server.router import TrailingSlashAPIRouter
 
 from ....dependencies.auth import (
+    allow_access,
+    authenticate_user,
     create_access_token,
-    get_current_active_user,
+    decode_access_token,
+    get_fresh_current_user,
     get_password_hash,
-    get_user,
-    get_users_with_tg_name,
+    get_users,
+    oauth2_scheme,
+    revoked_tokens,
 )
 from ....schemas.auth import (
     CreateUserPayload,
     FullUser,
     Status,
     Token,
+    UserCacheStats,
     UsersList,
 )
 
@@ -36,11 +42,12 @@ router = TrailingSlashAPIRouter()
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db_client=Depends(get_db)
 ):
-    user = await get_user(db_client, form_data.username)
-    if not user:
+    # OAuth2 password forms call the login field `username`; ours is the email.
+    user = await authenticate_user(db_client, form_data.username, form_data.password)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
+            detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -49,9 +56,13 @@ async def login_for_access_token(
             "sub": orjson.dumps(
                 {
                     "user_id": str(user.id),
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                    "status": user.status,
                     "is_teacher": user.is_teacher,
                     "is_student": user.is_student,
                     "is_admin": user.is_admin,
+                    "is_parent": user.is_parent,
                 }
             ).decode()
         },
@@ -60,78 +71,73 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@router.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_access_token(token: str = Depends(oauth2_scheme)):
+    claims, _ = decode_access_token(token)
+    revoked_tokens.revoke(claims["jti"], claims["exp"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/users/me/", response_model=FullUser)
-async def read_users_me(current_user=Depends(get_current_active_user)):
+async def read_users_me(current_user=Depends(get_fresh_current_user)):
     return current_user
 
 
-@router.post("/users", status_code=status.HTTP_201_CREATED)
+@router.get("/users/cache-stats/", dependencies=[Depends(allow_access())])
+async def read_user_cache_stats() -> UserCacheStats:
+    return UserCacheStats(**current_user_cache.stats())
+
+
+@router.post("/users", status_code=status.HTTP_202_ACCEPTED)
 async def post_user(
+    background_tasks: BackgroundTasks,
     user: CreateUserPayload = Depends(),
     db_client: AsyncIOClient = Depends(get_db),
     tg_client: TelegramClient = Depends(get_tg),
 ) -> FullUser:
-    tg_id = None
-    if user.tg_name is not None:
-        tg_entity = await tg_client.get_entity(user.tg_name)
-        match tg_entity:
-            case TgUser(id=id_):
-                tg_id = id_
-            case _:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"TG name is {type(tg_entity)}, not user",
-                )
+    """Create the user now; `tg_id` is filled in by the Telegram resolver."""
     try:
-        (created_user,) = await db_client.query(
+        created_user = await db_client.query_single(
             """
             WITH
             new_user := (INSERT User {
                 first_name := <str>$first_name,
                 last_name := <str>$last_name,
+                email := <str>$email,
                 status := <str>$status,
-                username := <str>$username,
                 hashed_password := <str>$hashed_password,
-                tg_id := <optional int64>$tg_id
+                tg_username := <optional str>$tg_name
                 })
             SELECT new_user {
                 id,
                 first_name,
                 last_name,
-                username,
+                email,
                 status,
                 is_teacher,
                 is_student,
                 is_admin,
-                tg_id,
-
+                is_parent,
+                tg_name := .tg_username,
             };
             """,
             first_name=user.first_name,
             last_name=user.last_name,
+            email=user.email,
             status=Status.active.value,
-            username=user.username,
-            hashed_password=get_password_hash(user.password),
-            tg_id=tg_id,
+            hashed_password=await get_password_hash(user.password),
+            tg_name=user.tg_name,
         )
     except ConstraintViolationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": f"Username '{user.username}' already exists,"},
+            detail={"error": f"Email '{user.email}' already exists,"},
         ) from e
-    return FullUser(
-        id=created_user.id,
-        first_name=created_user.first_name,
-        last_name=created_user.last_name,
-        username=created_user.username,
-        status=created_user.status,
-        is_teacher=created_user.is_teacher,
-        is_student=created_user.is_student,
-        is_admin=created_user.is_admin,
-        tg_name=user.tg_name,
-    )
+    if user.tg_name is not None:
+        background_tasks.add_task(resolve_tg_users, db_client, tg_client)
+    return FullUser.model_validate(created_user, from_attributes=True)
 
 
 @router.get("/users/", response_model=UsersList)
-async def get_all_users(users=Depends(get_users_with_tg_name)):
+async def get_all_users(users=Depends(get_users)):
     return UsersList(data=users)
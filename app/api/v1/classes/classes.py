@@ -1,42 +1,34 @@
 from uuid import UUID
 
-import orjson
 from edgedb.errors import ConstraintViolationError
 from fastapi import Depends, HTTPException, status
 
-from app.dependencies.auth import allow_access, get_current_active_user
-from app.dependencies.db import get_db
+from app.dependencies.auth import allow_access, get_current_active_user, get_user_db
+from app.dependencies.etag import conditional_list, version_stamp_query
 from app.schemas.auth import FullUser, InlineUser
 from app.server.router import TrailingSlashAPIRouter
 
 from ....schemas.classes import Class, ClassesList, CreateClassPayload
+from ....schemas.homeworks import HomeworkStats, StatsWindow
+from ..homeworks.stats import CLASS_HOMEWORK_STATS
+from .db_queries.insert_class_async_edgeql import insert_class
+from .db_queries.select_class_by_id_async_edgeql import select_class_by_id
+from .db_queries.select_classes_async_edgeql import select_classes
 
 router = TrailingSlashAPIRouter()
 
+CLASSES_VERSION = version_stamp_query("select Class")
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_class(
     payload: CreateClassPayload,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: FullUser = Depends(allow_access(teacher=True)),
 ) -> Class:
     try:
-        created_class = await db_client.query_single_json(
-            """
-            WITH
-            new_class := (INSERT Class {
-                name := <str>$name,
-                year := <int16>$year,
-                })
-            SELECT new_class {
-                id,
-                updated_at,
-                created_at,
-                name,
-                year
-
-            };
-            """,
+        created_class = await insert_class(
+            db_client,
             name=payload.name,
             year=payload.year,
         )
@@ -44,44 +36,39 @@ async def create_class(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from e
-    return Class.model_validate_json(created_class)
+    return Class.model_validate(created_class, from_attributes=True)
 
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(conditional_list(CLASSES_VERSION))])
 async def get_classes(
-    db_client=Depends(get_db), _: InlineUser = Depends(get_current_active_user)
+    db_client=Depends(get_user_db), _: InlineUser = Depends(get_current_active_user)
 ) -> ClassesList:
-    classes = await db_client.query_json(
-        """
-            select Class {
-                id,
-                updated_at,
-                created_at,
-                name,
-                year
-                }
-            """
+    classes = await select_classes(db_client)
+    return ClassesList(
+        data=[Class.model_validate(i, from_attributes=True) for i in classes]
     )
-    return ClassesList(data=orjson.loads(classes))
 
 
 @router.get("/{class_id}")
 async def get_class_by_id(
     class_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: InlineUser = Depends(get_current_active_user),
 ) -> Class:
-    class_ = await db_client.query_single_json(
-        """
-            select Class {
-                id,
-                updated_at,
-                created_at,
-                name,
-                year
-                }
-            filter .id = <uuid>$class_id
-            """,
-        class_id=class_id,
+    class_ = await select_class_by_id(db_client, class_id=class_id)
+    if class_ is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return Class.model_validate(class_, from_attributes=True)
+
+
+@router.get("/{class_id}/homework-stats")
+async def get_class_homework_stats(
+    class_id: UUID,
+    window: StatsWindow = StatsWindow.month,
+    db_client=Depends(get_user_db),
+    _: InlineUser = Depends(get_current_active_user),
+) -> HomeworkStats:
+    stats = await db_client.query_single_json(
+        CLASS_HOMEWORK_STATS, class_id=class_id, window=window.value
     )
-    return Class(**orjson.loads(class_))
+    return HomeworkStats.model_validate_json(stats)
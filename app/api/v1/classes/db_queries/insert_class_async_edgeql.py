@@ -0,0 +1,61 @@
+# AUTOGENERATED FROM 'app/api/v1/classes/db_queries/insert_class.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class InsertClassResult(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+    year: int
+
+
+async def insert_class(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    name: str,
+    year: int,
+) -> InsertClassResult:
+    return await executor.query_single(
+        """\
+        with new_class := (
+            insert Class {
+                name := <str>$name,
+                year := <int32>$year,
+            }
+        )
+        select new_class {
+            id,
+            updated_at,
+            created_at,
+            name,
+            year,
+        }\
+        """,
+        name=name,
+        year=year,
+    )
@@ -0,0 +1,54 @@
+# AUTOGENERATED FROM 'app/api/v1/classes/db_queries/select_class_by_id.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class SelectClassByIdResult(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+    year: int
+
+
+async def select_class_by_id(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    class_id: uuid.UUID,
+) -> SelectClassByIdResult | None:
+    return await executor.query_single(
+        """\
+        select Class {
+            id,
+            updated_at,
+            created_at,
+            name,
+            year,
+        }
+        filter .id = <uuid>$class_id\
+        """,
+        class_id=class_id,
+    )
@@ -0,0 +1,50 @@
+# AUTOGENERATED FROM 'app/api/v1/classes/db_queries/select_classes.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class SelectClassesResult(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+    year: int
+
+
+async def select_classes(
+    executor: edgedb.AsyncIOExecutor,
+) -> list[SelectClassesResult]:
+    return await executor.query(
+        """\
+        select Class {
+            id,
+            updated_at,
+            created_at,
+            name,
+            year,
+        }\
+        """,
+    )
@@ -0,0 +1,62 @@
+# AUTOGENERATED FROM 'app/api/v1/homeworks/db_queries/bulk_update_homeworks.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class BulkUpdateHomeworksResult(NoPydanticValidation):
+    id: uuid.UUID
+    grade: int | None
+    done_by_student: bool
+
+
+async def bulk_update_homeworks(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    items: str,
+) -> list[BulkUpdateHomeworksResult]:
+    return await executor.query(
+        """\
+        # Rows whose Submission the caller may not update are left out.
+        for item in json_array_unpack(<json>$items) union (
+            with
+                homework := (select Homework filter .id = <uuid>item['id']),
+                updated := (
+                    update Submission
+                    filter .id = homework.submission.id
+                    set {
+                        grade := <int32>json_get(item, 'grade') ?? .grade,
+                        done_by_student := <bool>json_get(item, 'done_by_student') ?? .done_by_student,
+                    }
+                ),
+            select homework {
+                id,
+                grade := updated.grade,
+                done_by_student := updated.done_by_student,
+            }
+            filter exists updated
+        )\
+        """,
+        items=items,
+    )
@@ -0,0 +1,183 @@
+# AUTOGENERATED FROM 'app/api/v1/homeworks/db_queries/update_homework.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class UpdateHomeworkResult(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    deadline: datetime.datetime
+    assignment: str
+    done_by_student: bool
+    grade: int | None
+    assigned_to: UpdateHomeworkResultAssignedTo
+    assigned_by: UpdateHomeworkResultAssignedBy
+    subject: UpdateHomeworkResultAssignedBySubjectsItem
+
+
+@dataclasses.dataclass
+class UpdateHomeworkResultAssignedBy(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    user: UpdateHomeworkResultAssignedToUser
+    subjects: list[UpdateHomeworkResultAssignedBySubjectsItem]
+    classes: list[UpdateHomeworkResultAssignedToClass]
+
+
+@dataclasses.dataclass
+class UpdateHomeworkResultAssignedBySubjectsItem(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+
+
+@dataclasses.dataclass
+class UpdateHomeworkResultAssignedTo(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    user: UpdateHomeworkResultAssignedToUser
+    class_: UpdateHomeworkResultAssignedToClass | None
+
+
+@dataclasses.dataclass
+class UpdateHomeworkResultAssignedToClass(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+    year: int
+
+
+@dataclasses.dataclass
+class UpdateHomeworkResultAssignedToUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+    status: str
+
+
+async def update_homework(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    homework_id: uuid.UUID,
+    grade: int | None,
+    done_by_student: bool | None,
+    assignment: str | None,
+) -> UpdateHomeworkResult | None:
+    return await executor.query_single(
+        """\
+        # Homework is computed from its Submission and Assignment, which are
+        # what gets updated; the statement still sees the Homework as it was
+        # before, so the changed fields are read from the updated objects.
+        # Callers that may see but not update the Submission get nothing back.
+        with
+            homework := (select Homework filter .id = <uuid>$homework_id),
+            updated_submission := (
+                update Submission
+                filter .id = homework.submission.id
+                set {
+                    grade := <optional int32>$grade ?? .grade,
+                    done_by_student := <optional bool>$done_by_student ?? .done_by_student,
+                }
+            ),
+            updated_assignment := (
+                update Assignment
+                filter .id = homework.submission.assignment.id
+                    and exists <optional str>$assignment
+                set {
+                    text := <optional str>$assignment ?? .text,
+                }
+            ),
+        select homework {
+            id,
+            updated_at := max({
+                updated_submission.updated_at, updated_assignment.updated_at
+            }),
+            created_at,
+            deadline,
+            assignment := updated_assignment.text ?? .assignment,
+            done_by_student := updated_submission.done_by_student,
+            grade := updated_submission.grade,
+            assigned_to: {
+                id,
+                updated_at,
+                created_at,
+                user: {
+                    id,
+                    first_name,
+                    last_name,
+                    status
+                },
+                class_: {
+                    id,
+                    updated_at,
+                    created_at,
+                    name,
+                    year
+                }
+            },
+            assigned_by: {
+                id,
+                updated_at,
+                created_at,
+                user: {
+                    id,
+                    first_name,
+                    last_name,
+                    status
+                },
+                subjects: {
+                    id,
+                    updated_at,
+                    created_at,
+                    name,
+                },
+                classes: {
+                    id,
+                    updated_at,
+                    created_at,
+                    name,
+                    year,
+                },
+            },
+            subject: {
+                id,
+                updated_at,
+                created_at,
+                name,
+            },
+        }
+        filter exists updated_submission\
+        """,
+        homework_id=homework_id,
+        grade=grade,
+        done_by_student=done_by_student,
+        assignment=assignment,
+    )
@@ -1,391 +1,466 @@
+import csv
+import io
+from collections.abc import AsyncIterator
+from datetime import datetime
+from functools import lru_cache
+from itertools import combinations
+from typing import Annotated
 from uuid import UUID
 
 import orjson
-from edgedb.errors import ConstraintViolationError
-from fastapi import Depends, HTTPException, status
+from edgedb.errors import (
+    AccessPolicyError,
+    ConstraintViolationError,
+    MissingRequiredError,
+)
+from fastapi import Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.dependencies.auth import allow_access, get_current_active_user
-from app.dependencies.db import get_db
+from app.dependencies.auth import allow_access, get_current_active_user, get_user_db
+from app.dependencies.etag import check_etag, version_stamp_query
+from app.dependencies.fieldsets import (
+    HOMEWORK_FIELDSET,
+    build_shape,
+    full_shape,
+    sparse_shape,
+)
+from app.dependencies.pagination import KeysetCursor, Page, get_page
+from app.dependencies.warmup import register_query
 from app.schemas.auth import FullUser
 from app.server.router import TrailingSlashAPIRouter
 
 from ....schemas.homeworks import (
+    BulkUpdateHomeworkItem,
+    BulkUpdateHomeworkResult,
+    BulkUpdateHomeworksResult,
+    CreatedHomework,
     CreateHomeworkPayload,
+    ExportFormat,
     Homework,
+    HomeworksCreated,
     HomeworksList,
+    SparseHomework,
+    SparseHomeworksList,
     UpdateHomeworkPayload,
 )
+from .db_queries.bulk_update_homeworks_async_edgeql import (
+    bulk_update_homeworks,
+)
+from .db_queries.update_homework_async_edgeql import update_homework
 
 router = TrailingSlashAPIRouter()
 
+MAX_BULK_UPDATE_ITEMS = 500
+EXPORT_PAGE_SIZE = 500
+
+
+# Students are resolved from explicit ids and enrolled classes on the
+# server. One statement inserts the shared Assignment and, per student, a
+# Submission and the Homework that shows it.
+CREATE_HOMEWORKS = """
+    with
+        students := (
+            select Student
+            filter .id in array_unpack(<array<uuid>>$student_ids)
+                or .class_.id in array_unpack(<array<uuid>>$class_ids)
+        ),
+        new_assignment := (
+            insert Assignment {
+                text := <str>$assignment,
+                deadline := <datetime>$deadline,
+                subject := (select Subject filter .id = <uuid>$subject_id),
+                teacher := (select Teacher filter .id = <uuid>$teacher_id),
+            }
+        ) if exists students else <Assignment>{},
+        new_homeworks := (
+            for student in students union (
+                insert Homework {
+                    submission := (
+                        insert Submission {
+                            assignment := new_assignment,
+                            student := student,
+                        }
+                    ),
+                }
+            )
+        ),
+"""
+
+
+CREATED_HOMEWORKS_SHAPE = "{ id, assigned_to: { id } }"
+
+
+@lru_cache(maxsize=2)
+def create_homeworks_query(shape: str) -> str:
+    return f"{CREATE_HOMEWORKS} select new_homeworks {shape}"
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_homeworks(
     payload: CreateHomeworkPayload,
-    db_client=Depends(get_db),
-    _=Depends(allow_access(teacher=True)),
-) -> HomeworksList:
+    db_client=Depends(get_user_db),
+    full: bool = False,
+) -> HomeworksCreated | HomeworksList:
+    shape = full_shape(HOMEWORK_FIELDSET) if full else CREATED_HOMEWORKS_SHAPE
     try:
         created_homeworks = await db_client.query_json(
-            """
-            with new_homeworks := (
-
-            with student_ids_unpacked := array_unpack(<array<uuid>>$student_ids)
-                for student_id in student_ids_unpacked union (
-                    INSERT Homework {
-                        assigned_by := (
-                            select Teacher filter .id = <uuid>$teacher_id
-                            ),
-                        assigned_to := (
-                            select Student filter .id = student_id
-                            ),
-                        assignment := <str>$assignment,
-                        subject := (
-                            select Subject filter .id = <uuid>$subject_id
-                            ),
-                        deadline := <datetime>$deadline,
-                        }
-                    )
-                ),
-            SELECT new_homeworks {
-                id,
-                updated_at,
-                created_at,
-                deadline,
-                assignment,
-                done_by_student,
-                grade,
-                assigned_to: {
-                    id,
-                    updated_at,
-                    created_at,
-                    user: {
-                        id,
-                        first_name,
-                        last_name,
-                        username,
-                        status
-                    },
-                    class: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                        year
-                    }
-                },
-                assigned_by: {
-                    id,
-                    updated_at,
-                    created_at,
-                    user: {
-                        id,
-                        first_name,
-                        last_name,
-                        username,
-                        status
-                    },
-                    subjects: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                    },
-                    classes: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                        year,
-                        },
-                },
-                subject: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-            };
-            """,
+            create_homeworks_query(shape),
             subject_id=payload.subject_id,
             student_ids=payload.assigned_to,
+            class_ids=payload.class_ids,
             teacher_id=payload.assigned_by,
             deadline=payload.deadline,
             assignment=payload.assignment,
         )
-    except ConstraintViolationError as e:
+    except AccessPolicyError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN) from e
+    except (ConstraintViolationError, MissingRequiredError) as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from e
-    return HomeworksList(data=orjson.loads(created_homeworks))
+    homeworks = orjson.loads(created_homeworks)
+    if full:
+        return HomeworksList(data=homeworks)
+    return HomeworksCreated(
+        count=len(homeworks),
+        assignment=payload.assignment,
+        assigned_by=payload.assigned_by,
+        subject_id=payload.subject_id,
+        deadline=payload.deadline,
+        data=[
+            CreatedHomework(id=i["id"], assigned_to=i["assigned_to"]["id"])
+            for i in homeworks
+        ],
+    )
+
+
+# A scope is the caller's roles. Each combination gets its own query text
+# and compiled plan, so a single-role caller's plan can use the
+# Assignment (teacher, deadline) or Submission student index instead of
+# an OR over every role.
+HOMEWORKS_SCOPE_FILTERS = {
+    "admin": "(select User filter .id = <uuid>$user_id).is_admin",
+    "teacher": ".assigned_by.user.id = <uuid>$user_id",
+    "student": ".assigned_to.user.id = <uuid>$user_id",
+    "parent": "<uuid>$user_id in .assigned_to.parents.user.id",
+}
+HOMEWORKS_SCOPES = [("admin",)] + [
+    roles
+    for n in range(1, 4)
+    for roles in combinations(("teacher", "student", "parent"), n)
+]
+
+
+def homeworks_scope_filter(scope: tuple[str, ...]) -> str:
+    return " or ".join(f"({HOMEWORKS_SCOPE_FILTERS[role]})" for role in scope)
+
 
+@lru_cache(maxsize=8)
+def homeworks_version_query(scope: tuple[str, ...]) -> str:
+    return version_stamp_query(
+        f"select Homework filter {homeworks_scope_filter(scope)}",
+        ".assigned_to.user",
+        ".assigned_by.user",
+        ".subject",
+    )
+
+
+@lru_cache(maxsize=256)
+def homeworks_feed_query(scope: tuple[str, ...], shape: str) -> str:
+    return f"""
+        with
+            cursor_deadline := <optional datetime>$cursor_deadline,
+            cursor_id := <optional uuid>$cursor_id,
+        select Homework {shape}
+        filter ({homeworks_scope_filter(scope)})
+            and ((
+                .deadline > cursor_deadline
+                or (.deadline = cursor_deadline and .id > cursor_id)
+            ) ?? true)
+        order by .deadline then .id
+        limit <int64>$limit
+    """
+
+
+def get_homeworks_scope(user: FullUser) -> tuple[str, ...]:
+    """Roles whose homeworks the caller sees; admins see all of them."""
+    if user.is_admin:
+        return ("admin",)
+    scope = tuple(
+        role
+        for role, has_role in (
+            ("teacher", user.is_teacher),
+            ("student", user.is_student),
+            ("parent", user.is_parent),
+        )
+        if has_role
+    )
+    if not scope:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    return scope
+
+
+async def homeworks_etag(
+    request: Request,
+    response: Response,
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(get_current_active_user),
+) -> None:
+    stamp = await db_client.query_single_json(
+        homeworks_version_query(get_homeworks_scope(user)), user_id=user.id
+    )
+    check_etag(request, response, str(user.id), stamp)
 
-@router.get("/")
+
+@router.get(
+    "/", response_model_exclude_unset=True, dependencies=[Depends(homeworks_etag)]
+)
 async def get_homeworkss(
-    db_client=Depends(get_db), _: FullUser = Depends(get_current_active_user)
-) -> HomeworksList:
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(get_current_active_user),
+    page: Page = Depends(get_page),
+    shape: str = Depends(sparse_shape(HOMEWORK_FIELDSET, always=["deadline"])),
+) -> SparseHomeworksList:
     homeworkes = await db_client.query_json(
-        """
-            SELECT Homework {
-                id,
-                updated_at,
-                created_at,
-                deadline,
-                assignment,
-                done_by_student,
-                grade,
-                assigned_to: {
-                    id,
-                    updated_at,
-                    created_at,
-                    user: {
-                        id,
-                        first_name,
-                        last_name,
-                        username,
-                        status
-                    },
-                    class: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                        year
-                    }
-                },
-                assigned_by: {
-                    id,
-                    updated_at,
-                    created_at,
-                    user: {
-                        id,
-                        first_name,
-                        last_name,
-                        username,
-                        status
-                    },
-                    subjects: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                    },
-                    classes: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                        year,
-                        },
-                },
-                subject: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-            };
-            """
+        homeworks_feed_query(get_homeworks_scope(user), shape),
+        user_id=user.id,
+        cursor_deadline=page.cursor.deadline if page.cursor else None,
+        cursor_id=page.cursor.id if page.cursor else None,
+        limit=page.limit + 1,
     )
     homework_data = orjson.loads(homeworkes)
-    return HomeworksList(data=homework_data)
+    next_cursor = None
+    if len(homework_data) > page.limit:
+        homework_data = homework_data[: page.limit]
+        last = homework_data[-1]
+        next_cursor = KeysetCursor(deadline=last["deadline"], id=last["id"]).encode()
+    return SparseHomeworksList(data=homework_data, next_cursor=next_cursor)
 
 
-@router.get("/{homeworks_id}")
-async def get_homeworks_by_id(
-    homeworks_id: UUID,
-    db_client=Depends(get_db),
-    user: FullUser = Depends(allow_access(teacher=True, student=True)),
-) -> Homework:
-    homework = await db_client.query_single_json(
-        """
-            SELECT Homework {
-                id,
-                updated_at,
-                created_at,
-                deadline,
-                assignment,
-                done_by_student,
-                grade,
-                assigned_to: {
-                    id,
-                    updated_at,
-                    created_at,
-                    user: {
-                        id,
-                        first_name,
-                        last_name,
-                        username,
-                        status
-                    },
-                    class: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                        year
-                    }
-                },
-                assigned_by: {
-                    id,
-                    updated_at,
-                    created_at,
-                    user: {
-                        id,
-                        first_name,
-                        last_name,
-                        username,
-                        status
-                    },
-                    subjects: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                    },
-                    classes: {
-                        id,
-                        updated_at,
-                        created_at,
-                        name,
-                        year,
-                        },
-                },
-                subject: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-            }
-            filter
-                .id = <uuid>$homeworks_id and
-                (.assigned_to.user.id = <uuid>$user_id or
-                        .assigned_by.user.id = <uuid>$user_id)
+# Flat rows, so NDJSON and CSV exports share one shape.
+HOMEWORKS_EXPORT_SHAPE = """{
+    id,
+    deadline,
+    subject := .subject.name,
+    class := .assigned_to.class_.name,
+    student_id := .assigned_to.id,
+    student_first_name := .assigned_to.user.first_name,
+    student_last_name := .assigned_to.user.last_name,
+    teacher_first_name := .assigned_by.user.first_name,
+    teacher_last_name := .assigned_by.user.last_name,
+    assignment,
+    done_by_student,
+    grade,
+}"""
+HOMEWORKS_EXPORT_COLUMNS = (
+    "id",
+    "deadline",
+    "subject",
+    "class",
+    "student_id",
+    "student_first_name",
+    "student_last_name",
+    "teacher_first_name",
+    "teacher_last_name",
+    "assignment",
+    "done_by_student",
+    "grade",
+)
 
 
-            """,
-        homeworks_id=homeworks_id,
+@lru_cache(maxsize=8)
+def homeworks_export_query(scope: tuple[str, ...]) -> str:
+    return f"""
+        with
+            cursor_deadline := <optional datetime>$cursor_deadline,
+            cursor_id := <optional uuid>$cursor_id,
+            class_id := <optional uuid>$class_id,
+            from_deadline := <optional datetime>$from_deadline,
+            to_deadline := <optional datetime>$to_deadline,
+        select Homework {HOMEWORKS_EXPORT_SHAPE}
+        filter ({homeworks_scope_filter(scope)})
+            and ((.assigned_to.class_.id = class_id) ?? true)
+            and ((.deadline >= from_deadline) ?? true)
+            and ((.deadline < to_deadline) ?? true)
+            and ((
+                .deadline > cursor_deadline
+                or (.deadline = cursor_deadline and .id > cursor_id)
+            ) ?? true)
+        order by .deadline then .id
+        limit <int64>$limit
+    """
+
+
+@lru_cache(maxsize=256)
+def homework_by_id_query(shape: str) -> str:
+    return f"SELECT Homework {shape} filter .id = <uuid>$homeworks_id"
+
+
+# Variants with the default shapes, compiled at startup.
+for shape in (CREATED_HOMEWORKS_SHAPE, full_shape(HOMEWORK_FIELDSET)):
+    register_query(create_homeworks_query(shape))
+for scope in HOMEWORKS_SCOPES:
+    homeworks_version_query(scope)
+    register_query(homeworks_feed_query(scope, build_shape(HOMEWORK_FIELDSET)))
+    register_query(homeworks_export_query(scope))
+register_query(homework_by_id_query(build_shape(HOMEWORK_FIELDSET)), single=True)
+
+
+async def export_pages(db_client, query: str, **kwargs) -> AsyncIterator[list[dict]]:
+    """Walk the export query page by page, holding one page at a time."""
+    cursor_deadline = cursor_id = None
+    while True:
+        page = orjson.loads(
+            await db_client.query_json(
+                query,
+                cursor_deadline=cursor_deadline,
+                cursor_id=cursor_id,
+                limit=EXPORT_PAGE_SIZE,
+                **kwargs,
+            )
+        )
+        if page:
+            yield page
+        if len(page) < EXPORT_PAGE_SIZE:
+            return
+        cursor_deadline = datetime.fromisoformat(page[-1]["deadline"])
+        cursor_id = UUID(page[-1]["id"])
+
+
+async def ndjson_chunks(pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    async for page in pages:
+        yield b"".join(orjson.dumps(row) + b"\n" for row in page)
+
+
+async def csv_chunks(pages: AsyncIterator[list[dict]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=HOMEWORKS_EXPORT_COLUMNS)
+    writer.writeheader()
+    async for page in pages:
+        writer.writerows(page)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_homeworks(
+    format_: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    class_id: UUID | None = None,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(allow_access(teacher=True)),
+) -> StreamingResponse:
+    pages = export_pages(
+        db_client,
+        homeworks_export_query(get_homeworks_scope(user)),
         user_id=user.id,
+        class_id=class_id,
+        from_deadline=from_,
+        to_deadline=to,
+    )
+    if format_ == ExportFormat.csv:
+        content, media_type = csv_chunks(pages), "text/csv"
+    else:
+        content, media_type = ndjson_chunks(pages), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="homeworks.{format_.value}"'
+        },
+    )
+
+
+@router.get("/{homeworks_id}", response_model_exclude_unset=True)
+async def get_homeworks_by_id(
+    homeworks_id: UUID,
+    db_client=Depends(get_user_db),
+    shape: str = Depends(sparse_shape(HOMEWORK_FIELDSET)),
+) -> SparseHomework:
+    # Who may see which homework is up to the Homework access policies.
+    homework = await db_client.query_single_json(
+        homework_by_id_query(shape), homeworks_id=homeworks_id
     )
     if homework == "null":
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-    return Homework(**orjson.loads(homework))
+    return SparseHomework(**orjson.loads(homework))
 
 
 @router.patch("/{homework_id}")
 async def update_homework_by_id(
     payload: UpdateHomeworkPayload,
     homework_id: UUID,
-    db_client=Depends(get_db),
-    user: FullUser = Depends(allow_access(teacher=True, student=True)),
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(get_current_active_user),
 ) -> Homework:
-    errors = []
-    if user.is_teacher is False:
-        if payload.grade is not None:
-            errors.append("Student can't set grade")
-        if payload.assignment is not None:
-            errors.append("Student can't change assignment")
-    if errors:
+    # Students may not update the shared Assignment at all, so their edits
+    # to it would be skipped without an error.
+    if not (user.is_teacher or user.is_admin) and payload.assignment is not None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="; ".join(errors)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Student can't change assignment",
         )
-    if query_args := payload.model_dump(exclude_none=True):
-        query = """
-            update Homework filter
-                .id = <uuid>$homework_id and
-                (.assigned_to.user.id = <uuid>$user_id or
-                        .assigned_by.user.id = <uuid>$user_id)
-            set {
-        """
-        if payload.grade is not None:
-            query += """
-                grade := <optional int32>$grade,
-            """
-        if payload.done_by_student is not None:
-            query += """
-                done_by_student := <optional bool>$done_by_student,
-            """
-        if payload.assignment is not None:
-            query += """
-                assignment := <optional str>$assignment,
-            """
-        query += "}"
-
-        await db_client.query_single_json(
-            query, homework_id=homework_id, user_id=user.id, **query_args
+    try:
+        homework = await update_homework(
+            db_client,
+            homework_id=homework_id,
+            grade=payload.grade,
+            done_by_student=payload.done_by_student,
+            assignment=payload.assignment,
         )
-    homework = await db_client.query_single_json(
-        """
-        SELECT Homework {
-            id,
-            updated_at,
-            created_at,
-            deadline,
-            assignment,
-            done_by_student,
-            grade,
-            assigned_to: {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                class: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year
-                }
-            },
-            assigned_by: {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                subjects: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-                classes: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year,
-                    },
-            },
-            subject: {
-                id,
-                updated_at,
-                created_at,
-                name,
-            },
-            }
+    except AccessPolicyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=e.args[0]
+        ) from e
+    if homework is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-            filter
-                .id = <uuid>$homework_id and
-                (.assigned_to.user.id = <uuid>$user_id or
-                        .assigned_by.user.id = <uuid>$user_id)
-            ;
-            """,
-        user_id=user.id,
-        homework_id=homework_id,
-    )
+    return Homework.model_validate(homework, from_attributes=True)
+
+
+@router.patch("/")
+async def bulk_update_homeworks_by_id(
+    payload: Annotated[
+        list[BulkUpdateHomeworkItem], Body(max_length=MAX_BULK_UPDATE_ITEMS)
+    ],
+    db_client=Depends(get_user_db),
+    user: FullUser = Depends(allow_access(teacher=True, student=True)),
+) -> BulkUpdateHomeworksResult:
+    if len({item.id for item in payload}) != len(payload):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Homework ids must be unique",
+        )
+    results = {}
+    allowed = []
+    for item in payload:
+        if not (user.is_teacher or user.is_admin) and item.grade is not None:
+            results[item.id] = BulkUpdateHomeworkResult(
+                id=item.id, updated=False, detail="Student can't set grade"
+            )
+        else:
+            allowed.append(item.model_dump(mode="json", exclude_none=True))
 
-    return Homework(**orjson.loads(homework))
+    updated = []
+    if allowed:
+        updated = await bulk_update_homeworks(
+            db_client, items=orjson.dumps(allowed).decode()
+        )
+    for homework in updated:
+        results[homework.id] = BulkUpdateHomeworkResult(
+            id=homework.id,
+            updated=True,
+            done_by_student=homework.done_by_student,
+            grade=homework.grade,
+        )
+    return BulkUpdateHomeworksResult(
+        data=[
+            results.get(item.id)
+            or BulkUpdateHomeworkResult(id=item.id, updated=False, detail="Not found")
+            for item in payload
+        ]
+    )
@@ -0,0 +1,85 @@
+from app.dependencies.warmup import register_query
+
+
+def _stats_shape(homeworks: str) -> str:
+    """Counters and grade aggregates over the `homeworks` set expression."""
+    return f"""
+        total := count({homeworks}),
+        done := count((select {homeworks} filter .done_by_student)),
+        overdue := count((
+            select {homeworks}
+            filter not .done_by_student and .deadline < now
+        )),
+        upcoming := count((
+            select {homeworks}
+            filter not .done_by_student and .deadline >= now
+        )),
+        grade_mean := math::mean({homeworks}.grade),
+        grade_median := (
+            with grades := array_agg((
+                with grade := {homeworks}.grade
+                select grade order by grade
+            ))
+            select (
+                array_get(grades, (len(grades) - 1) // 2)
+                + array_get(grades, len(grades) // 2)
+            ) / 2
+        ),
+        grade_distribution := (
+            select (
+                group (select {homeworks} filter exists .grade)
+                using grade := .grade
+                by grade
+            ) {{
+                grade := .key.grade,
+                count := count(.elements),
+            }}
+            order by .grade
+        ),
+    """
+
+
+def homework_stats_query(homeworks_filter: str) -> str:
+    """Whole stats document for homeworks matching `homeworks_filter`.
+
+    Everything is aggregated by EdgeDB with `group`, so only the summary
+    crosses the wire.
+    """
+    return f"""
+        with
+            now := datetime_of_statement(),
+            homeworks := (select Homework filter {homeworks_filter}),
+        select {{
+            {_stats_shape("homeworks")}
+            by_subject := (
+                select (
+                    group homeworks
+                    using subject := .subject
+                    by subject
+                ) {{
+                    subject := .key.subject {{ id, name }},
+                    {_stats_shape(".elements")}
+                }}
+                order by .subject.name
+            ),
+            by_window := (
+                select (
+                    group homeworks
+                    using window := datetime_truncate(.deadline, <str>$window)
+                    by window
+                ) {{
+                    window := .key.window,
+                    {_stats_shape(".elements")}
+                }}
+                order by .window
+            ),
+        }}
+    """
+
+
+STUDENT_HOMEWORK_STATS = register_query(
+    homework_stats_query(".assigned_to.id = <uuid>$student_id"), single=True
+)
+CLASS_HOMEWORK_STATS = register_query(
+    homework_stats_query(".assigned_to.class_.id = <uuid>$class_id"), single=True
+)
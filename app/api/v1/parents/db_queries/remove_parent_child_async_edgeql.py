@@ -0,0 +1,51 @@
+# AUTOGENERATED FROM 'app/api/v1/parents/db_queries/remove_parent_child.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class RemoveParentChildResult(NoPydanticValidation):
+    id: uuid.UUID
+
+
+async def remove_parent_child(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    parent_id: uuid.UUID,
+    children_id: uuid.UUID,
+) -> RemoveParentChildResult | None:
+    return await executor.query_single(
+        """\
+        update Parent
+        filter .id = <uuid>$parent_id
+        set {
+            children -= (
+                select Student
+                filter .id = <uuid>$children_id
+            )
+        }\
+        """,
+        parent_id=parent_id,
+        children_id=children_id,
+    )
@@ -4,21 +4,36 @@ import orjson
 from edgedb.errors import ConstraintViolationError
 from fastapi import Depends, HTTPException, Response, status
 
-from app.dependencies.auth import get_current_active_user
-from app.dependencies.db import get_db
+from app.dependencies.auth import get_current_active_user, get_user_db
+from app.dependencies.fieldsets import (
+    PARENT_FIELDSET,
+    STUDENT_FIELDSET,
+    build_shape,
+    sparse_shape,
+)
+from app.dependencies.user_cache import current_user_cache
+from app.dependencies.warmup import register_query
 from app.schemas.auth import InlineUser
-from app.schemas.students import StudentsList
+from app.schemas.students import SparseStudentsList
 from app.server.router import TrailingSlashAPIRouter
 
-from ....schemas.parents import CreateParentPayload, Parent, ParentsList
+from ....schemas.parents import (
+    CreateParentPayload,
+    Parent,
+    SparseParent,
+    SparseParentsList,
+)
+from .db_queries.remove_parent_child_async_edgeql import remove_parent_child
 
 router = TrailingSlashAPIRouter()
 
+register_query(f"select Parent {build_shape(PARENT_FIELDSET)}")
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_parent(
     payload: CreateParentPayload,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
 ) -> Parent:
     try:
         created_parent = await db_client.query_single_json(
@@ -35,7 +50,7 @@ async def create_parent(
                     id,
                     first_name,
                     last_name,
-                    username,
+                    email,
                     status
                 }
 
@@ -47,138 +62,97 @@ async def create_parent(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from e
+    current_user_cache.invalidate_user(payload.user_id)
     return Parent.model_validate_json(created_parent)
 
 
-@router.get("/")
+@router.get("/", response_model_exclude_unset=True)
 async def get_parents(
-    db_client=Depends(get_db), _: InlineUser = Depends(get_current_active_user)
-) -> ParentsList:
-    parentes = await db_client.query_json(
-        """
-            select Parent {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-            }
-            """
-    )
-    return ParentsList(data=orjson.loads(parentes))
+    db_client=Depends(get_user_db),
+    _: InlineUser = Depends(get_current_active_user),
+    shape: str = Depends(sparse_shape(PARENT_FIELDSET)),
+) -> SparseParentsList:
+    parentes = await db_client.query_json(f"select Parent {shape}")
+    return SparseParentsList(data=orjson.loads(parentes))
 
 
-@router.get("/{parent_id}")
+@router.get("/{parent_id}", response_model_exclude_unset=True)
 async def get_parent_by_id(
     parent_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: InlineUser = Depends(get_current_active_user),
-) -> Parent:
+    shape: str = Depends(sparse_shape(PARENT_FIELDSET)),
+) -> SparseParent:
     parent = await db_client.query_single_json(
-        """
-            select Parent {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-            }
+        f"""
+            select Parent {shape}
             filter .id = <uuid>$parent_id
             """,
         parent_id=parent_id,
     )
-    response = Parent(**orjson.loads(parent))
+    if parent == "null":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response = SparseParent(**orjson.loads(parent))
     return response
 
 
-@router.post("/{parent_id}/children/{children_id}")
+@router.post(
+    "/{parent_id}/children/{children_id}", response_model_exclude_unset=True
+)
 async def add_parent_child(
     parent_id: UUID,
     children_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: InlineUser = Depends(get_current_active_user),
-):
-    await db_client.query_single_json(
-        """
-        update Parent
-        filter .id = <uuid>$parent_id
-        set {
-            children += (
-                select Student {}
-                filter .id = <uuid>$children_id
-                )
-            }
-            """,
+) -> SparseParent:
+    parent = await db_client.query_single_json(
+        f"""
+        with updated := (
+            update Parent
+            filter .id = <uuid>$parent_id
+            set {{
+                children += (
+                    select Student {{}}
+                    filter .id = <uuid>$children_id
+                    )
+                }}
+        )
+        select updated {build_shape(PARENT_FIELDSET, expand=frozenset({"children"}))}
+            """,  # noqa: S608
         parent_id=parent_id,
         children_id=children_id,
     )
-    return
+    if parent == "null":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return SparseParent(**orjson.loads(parent))
 
 
 @router.delete("/{parent_id}/children/{children_id}")
 async def delete_parent_child(
     parent_id: UUID,
     children_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: InlineUser = Depends(get_current_active_user),
 ):
-    await db_client.query_single_json(
-        """
-        update Parent
-        filter .id = <uuid>$parent_id
-        set {
-            children -= (
-                select Student
-                filter .id = <uuid>$children_id
-                )
-            }
-            """,
-        parent_id=parent_id,
-        children_id=children_id,
+    await remove_parent_child(
+        db_client, parent_id=parent_id, children_id=children_id
     )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("/{parent_id}/children")
+@router.get("/{parent_id}/children", response_model_exclude_unset=True)
 async def get_parent_children(
     parent_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: InlineUser = Depends(get_current_active_user),
-) -> StudentsList:
+    shape: str = Depends(sparse_shape(STUDENT_FIELDSET)),
+) -> SparseStudentsList:
     students = await db_client.query_json(
-        """
-            select Student {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                class: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year
-                }
-            }
+        f"""
+            select Student {shape}
             filter .parents.id = <uuid>$parent_id
             """,
         parent_id=parent_id,
     )
-    response = StudentsList(data=orjson.loads(students))
+    response = SparseStudentsList(data=orjson.loads(students))
     return response
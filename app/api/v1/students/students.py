@@ -4,24 +4,39 @@ import orjson
 from edgedb.errors import ConstraintViolationError
 from fastapi import Depends, HTTPException, status
 
-from app.dependencies.auth import allow_access, get_current_active_user
-from app.dependencies.db import get_db
+from app.dependencies.auth import allow_access, get_current_active_user, get_user_db
+from app.dependencies.etag import conditional_list, version_stamp_query
+from app.dependencies.fieldsets import (
+    STUDENT_FIELDSET,
+    build_shape,
+    full_shape,
+    sparse_shape,
+)
+from app.dependencies.user_cache import current_user_cache
+from app.dependencies.warmup import register_query
 from app.schemas.auth import FullUser, InlineUser
 from app.server.router import TrailingSlashAPIRouter
 
+from ....schemas.homeworks import HomeworkStats, StatsWindow
 from ....schemas.students import (
     CreateStudentPayload,
+    SparseStudent,
+    SparseStudentsList,
     Student,
-    StudentsList,
     UpdateStudentPayload,
 )
+from ..homeworks.stats import STUDENT_HOMEWORK_STATS
 
 router = TrailingSlashAPIRouter()
 
+register_query(f"select Student {build_shape(STUDENT_FIELDSET)}")
+
+STUDENTS_VERSION = version_stamp_query("select Student", ".user", ".class_")
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_student(
-    payload: CreateStudentPayload, db_client=Depends(get_db)
+    payload: CreateStudentPayload, db_client=Depends(get_user_db)
 ) -> Student:
     try:
         created_student = await db_client.query_single_json(
@@ -29,7 +44,7 @@ async def create_student(
             WITH
             new_student := (INSERT Student {
                 user := (select User filter .id = <uuid>$user_id),
-                class := (select Class filter .id = <uuid>$class_id),
+                class_ := (select Class filter .id = <uuid>$class_id),
                 })
             SELECT new_student {
                 id,
@@ -39,10 +54,10 @@ async def create_student(
                     id,
                     first_name,
                     last_name,
-                    username,
+                    email,
                     status
                 },
-                class: {
+                class_: {
                     id,
                     updated_at,
                     created_at,
@@ -59,73 +74,43 @@ async def create_student(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from e
+    current_user_cache.invalidate_user(payload.user_id)
     response = Student.model_validate_json(created_student)
     return response
 
 
-@router.get("/")
+@router.get(
+    "/",
+    response_model_exclude_unset=True,
+    dependencies=[Depends(conditional_list(STUDENTS_VERSION))],
+)
 async def get_students(
-    db_client=Depends(get_db), _: InlineUser = Depends(get_current_active_user)
-) -> StudentsList:
-    studentes = await db_client.query_json(
-        """
-            select Student {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                class: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year
-                }
-            }
-            """
-    )
-    response = StudentsList(data=orjson.loads(studentes))
+    db_client=Depends(get_user_db),
+    _: InlineUser = Depends(get_current_active_user),
+    shape: str = Depends(sparse_shape(STUDENT_FIELDSET)),
+) -> SparseStudentsList:
+    studentes = await db_client.query_json(f"select Student {shape}")
+    response = SparseStudentsList(data=orjson.loads(studentes))
     return response
 
 
-@router.get("/{student_id}")
+@router.get("/{student_id}", response_model_exclude_unset=True)
 async def get_student_by_id(
     student_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: InlineUser = Depends(get_current_active_user),
-) -> Student:
+    shape: str = Depends(sparse_shape(STUDENT_FIELDSET)),
+) -> SparseStudent:
     student = await db_client.query_single_json(
-        """
-            select Student {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                class: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year
-                }
-            }
+        f"""
+            select Student {shape}
             filter .id = <uuid>$student_id
             """,
         student_id=student_id,
     )
-    response = Student(**orjson.loads(student))
+    if student == "null":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response = SparseStudent(**orjson.loads(student))
     return response
 
 
@@ -133,36 +118,32 @@ async def get_student_by_id(
 async def update_student(
     payload: UpdateStudentPayload,
     student_id: UUID,
-    db_client=Depends(get_db),
+    db_client=Depends(get_user_db),
     _: FullUser = Depends(allow_access(teacher=True, student=True)),
 ) -> Student:
     student = await db_client.query_single_json(
-        """
-        with updated_student := (update Student filter .id = <uuid>$student_id
-        set {class := (select Class filter .id = <uuid>$class_id)}),
-        select updated_student {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                class: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year
-                }
-
-            }
-        """,
+        f"""
+        with updated := (update Student filter .id = <uuid>$student_id
+        set {{class_ := (select Class filter .id = <uuid>$class_id)}}),
+        select updated {full_shape(STUDENT_FIELDSET)}
+        """,  # noqa: S608
         student_id=student_id,
         class_id=payload.class_id,
     )
+    if student == "null":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     response = Student(**orjson.loads(student))
     return response
+
+
+@router.get("/{student_id}/homework-stats")
+async def get_student_homework_stats(
+    student_id: UUID,
+    window: StatsWindow = StatsWindow.month,
+    db_client=Depends(get_user_db),
+    _: InlineUser = Depends(get_current_active_user),
+) -> HomeworkStats:
+    stats = await db_client.query_single_json(
+        STUDENT_HOMEWORK_STATS, student_id=student_id, window=window.value
+    )
+    return HomeworkStats.model_validate_json(stats)
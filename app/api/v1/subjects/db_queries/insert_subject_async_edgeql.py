@@ -0,0 +1,56 @@
+# AUTOGENERATED FROM 'app/api/v1/subjects/db_queries/insert_subject.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class InsertSubjectResult(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+
+
+async def insert_subject(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    name: str,
+) -> InsertSubjectResult:
+    return await executor.query_single(
+        """\
+        with new_subject := (
+            insert Subject {
+                name := <str>$name,
+            }
+        )
+        select new_subject {
+            id,
+            updated_at,
+            created_at,
+            name,
+        }\
+        """,
+        name=name,
+    )
@@ -1,18 +1,23 @@
 from uuid import UUID
 
-import orjson
 from edgedb.errors import ConstraintViolationError
 from fastapi import Depends, HTTPException, status
 
 from app.dependencies.auth import allow_access, get_current_active_user
 from app.dependencies.db import get_db
+from app.dependencies.etag import conditional_list, version_stamp_query
 from app.schemas.auth import FullUser, InlineUser
 from app.server.router import TrailingSlashAPIRouter
 
 from ....schemas.subjects import CreateSubjectPayload, Subject, SubjectsList
+from .db_queries.insert_subject_async_edgeql import insert_subject
+from .db_queries.select_subject_by_id_async_edgeql import select_subject_by_id
+from .db_queries.select_subjects_async_edgeql import select_subjects
 
 router = TrailingSlashAPIRouter()
 
+SUBJECTS_VERSION = version_stamp_query("select Subject")
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_subject(
@@ -21,44 +26,26 @@ async def create_subject(
     _: FullUser = Depends(allow_access(teacher=True)),
 ) -> Subject:
     try:
-        created_subject = await db_client.query_single_json(
-            """
-            WITH
-            new_subject := (INSERT Subject {
-                name := <str>$name
-                })
-            SELECT new_subject {
-                id,
-                updated_at,
-                created_at,
-                name,
-            };
-            """,
+        created_subject = await insert_subject(
+            db_client,
             name=payload.name,
         )
     except ConstraintViolationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from e
-    response = Subject.model_validate_json(created_subject)
+    response = Subject.model_validate(created_subject, from_attributes=True)
     return response
 
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(conditional_list(SUBJECTS_VERSION))])
 async def get_subjects(
     db_client=Depends(get_db), _: InlineUser = Depends(get_current_active_user)
 ) -> SubjectsList:
-    subjectes = await db_client.query_json(
-        """
-            select Subject {
-                id,
-                updated_at,
-                created_at,
-                name,
-            }
-            """
+    subjectes = await select_subjects(db_client)
+    response = SubjectsList(
+        data=[Subject.model_validate(i, from_attributes=True) for i in subjectes]
     )
-    response = SubjectsList(data=orjson.loads(subjectes))
     return response
 
 
@@ -68,17 +55,8 @@ async def get_subject_by_id(
     db_client=Depends(get_db),
     _: InlineUser = Depends(get_current_active_user),
 ) -> Subject:
-    subject = await db_client.query_single_json(
-        """
-            select Subject {
-                id,
-                updated_at,
-                created_at,
-                name,
-            }
-            filter .id = <uuid>$subject_id
-            """,
-        subject_id=subject_id,
-    )
-    response = Subject(**orjson.loads(subject))
+    subject = await select_subject_by_id(db_client, subject_id=subject_id)
+    if subject is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response = Subject.model_validate(subject, from_attributes=True)
     return response
@@ -0,0 +1,115 @@
+# AUTOGENERATED FROM 'app/api/v1/teachers/db_queries/update_teacher.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class UpdateTeacherResult(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    user: UpdateTeacherResultUser
+    subjects: list[UpdateTeacherResultSubjectsItem]
+    classes: list[UpdateTeacherResultClassesItem]
+
+
+@dataclasses.dataclass
+class UpdateTeacherResultClassesItem(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+    year: int
+
+
+@dataclasses.dataclass
+class UpdateTeacherResultSubjectsItem(NoPydanticValidation):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    created_at: datetime.datetime
+    name: str
+
+
+@dataclasses.dataclass
+class UpdateTeacherResultUser(NoPydanticValidation):
+    id: uuid.UUID
+    first_name: str
+    last_name: str
+    status: str
+
+
+async def update_teacher(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    class_ids: list[uuid.UUID] | None,
+    subject_ids: list[uuid.UUID] | None,
+    teacher_id: uuid.UUID,
+) -> UpdateTeacherResult | None:
+    return await executor.query_single(
+        """\
+        with
+            class_ids := <optional array<uuid>>$class_ids,
+            subject_ids := <optional array<uuid>>$subject_ids,
+            updated := (
+                update Teacher
+                filter .id = <uuid>$teacher_id
+                set {
+                    classes := (
+                        select Class filter .id in array_unpack(class_ids)
+                    ) if exists class_ids else .classes,
+                    subjects := (
+                        select Subject filter .id in array_unpack(subject_ids)
+                    ) if exists subject_ids else .subjects,
+                }
+            )
+        select updated {
+            id,
+            updated_at,
+            created_at,
+            user: {
+                id,
+                first_name,
+                last_name,
+                status
+            },
+            subjects: {
+                id,
+                updated_at,
+                created_at,
+                name,
+            },
+            classes: {
+                id,
+                updated_at,
+                created_at,
+                name,
+                year,
+            },
+        }\
+        """,
+        class_ids=class_ids,
+        subject_ids=subject_ids,
+        teacher_id=teacher_id,
+    )
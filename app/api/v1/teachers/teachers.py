@@ -6,18 +6,30 @@ from fastapi import Depends, HTTPException, status
 
 from app.dependencies.auth import get_current_active_user
 from app.dependencies.db import get_db
+from app.dependencies.etag import conditional_list, version_stamp_query
+from app.dependencies.fieldsets import TEACHER_FIELDSET, build_shape, sparse_shape
+from app.dependencies.user_cache import current_user_cache
+from app.dependencies.warmup import register_query
 from app.schemas.auth import InlineUser
 from app.server.router import TrailingSlashAPIRouter
 
 from ....schemas.teachers import (
     CreateTeacherPayload,
+    SparseTeacher,
+    SparseTeachersList,
     Teacher,
-    TeachersList,
     UpdateTeacherPayload,
 )
+from .db_queries.update_teacher_async_edgeql import update_teacher
 
 router = TrailingSlashAPIRouter()
 
+register_query(f"SELECT Teacher {build_shape(TEACHER_FIELDSET)}")
+
+TEACHERS_VERSION = version_stamp_query(
+    "select Teacher", ".user", ".classes", ".subjects"
+)
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_teacher(
@@ -45,7 +57,7 @@ async def create_teacher(
                     id,
                     first_name,
                     last_name,
-                    username,
+                    email,
                     status
                 },
                 subjects: {
@@ -71,85 +83,43 @@ async def create_teacher(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
         ) from e
+    current_user_cache.invalidate_user(payload.user_id)
     response = Teacher.model_validate_json(created_teacher)
     return response
 
 
-@router.get("/")
+@router.get(
+    "/",
+    response_model_exclude_unset=True,
+    dependencies=[Depends(conditional_list(TEACHERS_VERSION))],
+)
 async def get_teachers(
-    db_client=Depends(get_db), _: InlineUser = Depends(get_current_active_user)
-) -> TeachersList:
-    teacheres = await db_client.query_json(
-        """
-            SELECT Teacher {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                subjects: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-                classes: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year,
-                    },
-            };
-            """
-    )
-    response = TeachersList(data=orjson.loads(teacheres))
+    db_client=Depends(get_db),
+    _: InlineUser = Depends(get_current_active_user),
+    shape: str = Depends(sparse_shape(TEACHER_FIELDSET)),
+) -> SparseTeachersList:
+    teacheres = await db_client.query_json(f"SELECT Teacher {shape}")
+    response = SparseTeachersList(data=orjson.loads(teacheres))
     return response
 
 
-@router.get("/{teacher_id}")
+@router.get("/{teacher_id}", response_model_exclude_unset=True)
 async def get_teacher_by_id(
     teacher_id: UUID,
     db_client=Depends(get_db),
     _: InlineUser = Depends(get_current_active_user),
-) -> Teacher:
+    shape: str = Depends(sparse_shape(TEACHER_FIELDSET)),
+) -> SparseTeacher:
     teacher = await db_client.query_single_json(
-        """
-            SELECT Teacher {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                subjects: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-                classes: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year,
-                    },
-            }
+        f"""
+            SELECT Teacher {shape}
             filter .id = <uuid>$teacher_id
             """,
         teacher_id=teacher_id,
     )
-    response = Teacher(**orjson.loads(teacher))
+    if teacher == "null":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response = SparseTeacher(**orjson.loads(teacher))
     return response
 
 
@@ -160,60 +130,13 @@ async def update_teacher_by_id(
     db_client=Depends(get_db),
     _: InlineUser = Depends(get_current_active_user),
 ) -> Teacher:
-    if payload.class_ids is not None or payload.subject_ids is not None:
-        query = """
-        update Teacher { }
-            filter .id = <uuid>$teacher_id
-            set {
-        """
-        if payload.class_ids is not None:
-            query += """
-                classes := (
-                    select Class filter .id in array_unpack(<array<uuid>>$class_ids)
-                    ),
-            """
-        if payload.subject_ids is not None:
-            query += """
-                subjects := (
-                    select Subject filter .id in array_unpack(<array<uuid>>$subject_ids)
-                    ),
-            """
-        query += "}"
-        query_args = payload.model_dump(exclude_none=True)
-        await db_client.query_single_json(
-            query, teacher_id=teacher_id, **query_args
-        )
-
-    teacher = await db_client.query_single_json(
-        """
-            SELECT Teacher {
-                id,
-                updated_at,
-                created_at,
-                user: {
-                    id,
-                    first_name,
-                    last_name,
-                    username,
-                    status
-                },
-                subjects: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                },
-                classes: {
-                    id,
-                    updated_at,
-                    created_at,
-                    name,
-                    year,
-                    },
-            }
-            filter .id = <uuid>$teacher_id
-    """,
+    teacher = await update_teacher(
+        db_client,
         teacher_id=teacher_id,
+        class_ids=payload.class_ids,
+        subject_ids=payload.subject_ids,
     )
-    response = Teacher(**orjson.loads(teacher))
+    if teacher is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response = Teacher.model_validate(teacher, from_attributes=True)
     return response
@@ -9,12 +9,42 @@ ENV_FILE = Path(__file__).parent / ".env"
 class Settings(BaseSettings):
     secret_key: SecretStr
     SERVER_PORT: int = 8000
+    DEBUG: bool = False
 
     API_ID: int
     API_HASH: str
     BOT_TOKEN: str
 
     EDGEDB_AUTH_BASE_URL: str = "http://localhost:10700/db/edgedb/ext/auth"
+    EDGEDB_AUTH_TIMEOUT: float = 5.0
+    EDGEDB_AUTH_CONNECT_TIMEOUT: float = 2.0
+    EDGEDB_AUTH_MAX_CONNECTIONS: int = 20
+    EDGEDB_AUTH_RETRIES: int = 2
+    EDGEDB_AUTH_BREAKER_THRESHOLD: int = 5
+    EDGEDB_AUTH_BREAKER_RESET: float = 30.0
+
+    SLOW_QUERY_SECONDS: float = 0.2
+    # Bearer token Prometheus sends to GET /metrics; unset disables it.
+    METRICS_TOKEN: SecretStr | None = None
+
+    DB_CLIENT_CACHE_SIZE: int = 1024
+
+    CURRENT_USER_CACHE_SIZE: int = 1024
+    CURRENT_USER_CACHE_TTL: float = 60.0
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    TG_RESOLVE_INTERVAL: float = 60.0
+    TG_USERNAME_REFRESH_AFTER: float = 24 * 60 * 60
+    TG_RESOLVE_CONCURRENCY: int = 8
+
+    RATE_LIMIT_IP_PER_MINUTE: float = 30.0
+    RATE_LIMIT_IP_BURST: int = 10
+    RATE_LIMIT_EMAIL_PER_MINUTE: float = 5.0
+    RATE_LIMIT_EMAIL_BURST: int = 5
+    RATE_LIMIT_SHARED_PATH: str | None = None
+    RATE_LIMIT_SHARED_SLOTS: int = 65536
 
     model_config = SettingsConfigDict(
         env_file=ENV_FILE, env_file_encoding="utf-8"
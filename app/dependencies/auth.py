@@ -1,66 +1,80 @@
+import time
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import orjson
 from edgedb.asyncio_client import AsyncIOClient
-from fastapi import Depends, HTTPException, status
+from fastapi import Cookie, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
-from passlib.context import CryptContext
+from jose import JWTError, jwt
+from pydantic import ValidationError
 
 from app.config import settings
 from app.dependencies.db import get_db
-from app.dependencies.tg import get_tg
+from app.dependencies.hashing import password_hasher
+from app.dependencies.user_cache import CachedSession, current_user_cache, token_expiry
 
-from ..schemas.auth import FullUser, Status
+from ..schemas.auth import FullUser, Status, TokenData
 from .db_queries.select_current_user_async_edgeql import select_current_user
+from .db_queries.select_login_user_async_edgeql import (
+    SelectLoginUserResult,
+    select_login_user,
+)
+from .db_queries.select_user_by_id_async_edgeql import select_user_by_id
 
 ALGORITHM = "HS256"
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
-if TYPE_CHECKING:
-    from telethon.types import User as TgUser
 
+class NotAuthenticatedError(Exception):
+    pass
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+class RevokedTokens:
+    """Token ids (`jti`) revoked before expiry, kept until they expire anyway."""
 
+    def __init__(self, timer=time.time):
+        self.timer = timer
+        self.expires_at: dict[str, float] = {}
 
-class NotAuthenticatedError(Exception):
-    pass
+    def revoke(self, jti: str, expires_at: float) -> None:
+        self.expires_at[jti] = expires_at
 
+    def __contains__(self, jti: str) -> bool:
+        now = self.timer()
+        for expired in [k for k, v in self.expires_at.items() if v <= now]:
+            del self.expires_at[expired]
+        return jti in self.expires_at
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
 
+revoked_tokens = RevokedTokens()
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
 
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
-async def get_user(db_client: AsyncIOClient, username: str) -> FullUser | None:
-    user = await db_client.query(
-        """select User {
-                username,
-                is_teacher,
-                is_student,
-                is_admin,
-            }
-            filter User.username = <str>$username
-            limit 1
-            """,
-        username=username,
-    )
-    if user:
-        return user[0]
-    return None
+
+async def authenticate_user(
+    db_client: AsyncIOClient, email: str, password: str
+) -> SelectLoginUserResult | None:
+    """The user with `email`, if `password` matches their stored hash."""
+    user = await select_login_user(db_client, email=email)
+    if user is None or user.hashed_password is None:
+        return None
+    if not await verify_password(password, user.hashed_password):
+        return None
+    return user
 
 
 async def get_user_by_id(db_client: AsyncIOClient, user_id: UUID):
     user = await db_client.query_single_json(
-        """select User {first_name, last_name, status, id, email, username, is_teacher, is_student, is_admin, tg_id}
+        """select User {first_name, last_name, status, id, email, is_teacher, is_student, is_admin, tg_id}
             filter User.id = <uuid>$id
             limit 1
             """,
@@ -71,46 +85,132 @@ async def get_user_by_id(db_client: AsyncIOClient, user_id: UUID):
 
 async def get_users(db_client: AsyncIOClient = Depends(get_db)):
     users = await db_client.query_json(
-        """select User {first_name, last_name, status, id, email, username, tg_id}
+        """select User {
+                first_name,
+                last_name,
+                status,
+                id,
+                email,
+                tg_id,
+                tg_name := .tg_username,
+            }
             """,
     )
     return orjson.loads(users)
 
 
-async def get_tg_name_by_tg_id(tg_id, tg_client):
-    if tg_id is not None:
-        tg_user: TgUser = await tg_client.get_entity(tg_id)
-        return tg_user.username or tg_user.phone
-    return None
-
-
-async def get_users_with_tg_name(
-    users=Depends(get_users), tg_client=Depends(get_tg)
-):
-    for user in users:
-        user["tg_name"] = await get_tg_name_by_tg_id(user["tg_id"], tg_client)
-    return users
-
-
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     return jwt.encode(
         to_encode, settings.secret_key.get_secret_value(), algorithm=ALGORITHM
     )
 
 
+def decode_access_token(token: str) -> tuple[dict, FullUser]:
+    """Verify signature, expiry and revocation locally, without the DB."""
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        claims = jwt.decode(
+            token, settings.secret_key.get_secret_value(), algorithms=[ALGORITHM]
+        )
+        token_data = TokenData.model_validate_json(claims["sub"])
+    except (JWTError, KeyError, ValidationError) as e:
+        raise unauthorized from e
+    if claims.get("jti") in revoked_tokens:
+        raise unauthorized
+    user = FullUser(
+        id=token_data.user_id,
+        **token_data.model_dump(exclude={"user_id"}),
+    )
+    return claims, user
+
+
+async def get_token_user(
+    token: str | None = Depends(optional_oauth2_scheme),
+) -> FullUser | None:
+    if token is None:
+        return None
+    _, user = decode_access_token(token)
+    return user
+
+
+async def get_user_db(
+    token_user: FullUser | None = Depends(get_token_user),
+    db_client: AsyncIOClient = Depends(get_db),
+) -> AsyncIOClient:
+    """DB client whose access policies see the caller as `global current_user`.
+
+    Bearer users are set by id straight from their token. Site users need
+    nothing extra, the DB finds them from the auth extension token.
+    """
+    if token_user is None:
+        return db_client
+    return db_client.with_globals({"current_user_id": token_user.id})
+
+
 async def get_current_user(
+    token_user: FullUser | None = Depends(get_token_user),
     db_client: AsyncIOClient = Depends(get_db),
+    edgedb_auth_token: str | None = Cookie(None),
 ) -> FullUser | None:
+    """Resolve the caller, from Bearer claims when present, else the DB.
+
+    Bearer users are built from their token alone, so roles are as fresh
+    as the token; use `get_fresh_current_user` where that is not enough.
+    """
+    if token_user is not None:
+        return token_user
+    expires_at = None
+    if edgedb_auth_token is not None:
+        expires_at = token_expiry(edgedb_auth_token)
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        session = current_user_cache.get(edgedb_auth_token)
+        if session is not None:
+            return session.user
+
     user = await select_current_user(db_client)
     if user is None:
         return None
 
+    current_user = FullUser(
+        first_name=user.first_name,
+        last_name=user.last_name,
+        status=Status(user.status),
+        id=user.id,
+        is_teacher=user.is_teacher,
+        is_student=user.is_student,
+        is_admin=user.is_admin,
+        is_parent=user.is_parent,
+    )
+    if edgedb_auth_token is not None:
+        current_user_cache.set(
+            edgedb_auth_token,
+            CachedSession(identity_id=user.identity_id, user=current_user, expires_at=expires_at),
+        )
+    return current_user
+
+
+async def get_fresh_current_user(
+    token_user: FullUser | None = Depends(get_token_user),
+    db_client: AsyncIOClient = Depends(get_db),
+) -> FullUser | None:
+    """Like `get_current_user`, but always reads the user from the DB."""
+    if token_user is None:
+        user = await select_current_user(db_client)
+    else:
+        user = await select_user_by_id(db_client, user_id=token_user.id)
+    if user is None:
+        return None
     return FullUser(
         first_name=user.first_name,
         last_name=user.last_name,
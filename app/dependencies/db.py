@@ -1,9 +1,56 @@
+import time
+from collections import OrderedDict
+
 import edgedb
 from fastapi import Cookie
 
-client = edgedb.asyncio_client.create_async_client().with_module_aliases(
+from app.config import settings
+from app.dependencies.db_metrics import create_instrumented_client
+from app.dependencies.user_cache import token_expiry
+
+client = create_instrumented_client().with_module_aliases(
     {"auth": "ext::auth"}
 )
+# For background jobs acting on behalf of no one in particular.
+system_client = client.with_config(apply_access_policies=False)
+
+
+class TokenClientCache:
+    """Bounded LRU of `client.with_globals()` facades, one per auth token.
+
+    A derived client is a few option objects over the pool of the client it
+    came from, so caching them saves those allocations on every request and
+    never holds extra connections. An entry goes away once its token
+    expires; an expired token is not cached at all.
+    """
+
+    def __init__(self, base: edgedb.AsyncIOClient, maxsize: int, clock=time.time):
+        self.base = base
+        self.maxsize = maxsize
+        self.clock = clock
+        self.entries: OrderedDict[str, tuple[edgedb.AsyncIOClient, float | None]] = OrderedDict()
+
+    def get(self, token: str) -> edgedb.AsyncIOClient:
+        entry = self.entries.get(token)
+        if entry is not None:
+            derived, expires_at = entry
+            if expires_at is None or expires_at > self.clock():
+                self.entries.move_to_end(token)
+                return derived
+            del self.entries[token]
+        derived = self.base.with_globals({"auth::client_token": token})
+        expires_at = token_expiry(token)
+        if expires_at is None or expires_at > self.clock():
+            self.entries[token] = (derived, expires_at)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return derived
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+token_clients = TokenClientCache(client, maxsize=settings.DB_CLIENT_CACHE_SIZE)
 
 
 async def get_db(
@@ -13,9 +60,5 @@ async def get_db(
     )
 ) -> edgedb.asyncio_client.AsyncIOClient:
     if edgedb_auth_token is not None:
-        return client.with_globals(
-            {
-                "auth::client_token": edgedb_auth_token,
-            }
-        )
+        return token_clients.get(edgedb_auth_token)
     return client
@@ -0,0 +1,178 @@
+import logging
+import sys
+import time
+from collections.abc import Mapping, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+import edgedb
+from edgedb import abstract
+from edgedb.options import RetryOptions
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.dependencies.metrics import counter, histogram
+
+# The canonical query instrumentation. bot/happy_school_bot/db_metrics.py
+# is a trimmed copy for the separately packaged bot, which cannot import
+# the app; keep metric names and buckets in step with it.
+
+logger = logging.getLogger(__name__)
+
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+@dataclass
+class QueryTally:
+    """DB round trips made while serving one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+
+
+request_queries: ContextVar[QueryTally | None] = ContextVar("request_queries", default=None)
+
+
+def param_shape(value: Any) -> str:
+    """Type of a query argument, with lengths for collections, never its value."""
+    if isinstance(value, Mapping):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, Sequence) and not isinstance(value, str | bytes):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+class CountingRetryOptions:
+    """Retry options that count, per query, the retries they allow."""
+
+    def __init__(self, options: RetryOptions, name: str):
+        self.options = options
+        self.retries = counter(
+            "edgedb_query_retries_total", "Query attempts retried by the client", query=name
+        )
+
+    def get_rule_for_exception(self, exception):
+        rule = self.options.get_rule_for_exception(exception)
+
+        def backoff(attempt: int) -> float:
+            self.retries.inc()
+            return rule.backoff(attempt)
+
+        return rule._replace(backoff=backoff)
+
+
+class InstrumentedClient(edgedb.AsyncIOClient):
+    """`AsyncIOClient` recording latency, rows and result size per query.
+
+    A query is named after the function that ran it, so generated
+    wrappers show up under their .edgeql file name and inline queries
+    under their handler, which keeps the label set as small as the code.
+    `with_globals()` and friends return instrumented clients on the same
+    connection pool. Every round trip also counts towards the current
+    request's `QueryTally`, if there is one. Queries slower than `slow_query_seconds` are logged
+    with the shapes of their arguments only.
+    """
+
+    __slots__ = ()
+
+    slow_query_seconds = settings.SLOW_QUERY_SECONDS
+
+    @staticmethod
+    def caller_name() -> str:
+        # Frames up: _query or _execute, the public client method, its caller.
+        return sys._getframe(3).f_code.co_name  # noqa: SLF001
+
+    async def _query(self, query_context: abstract.QueryContext):
+        name = self.caller_name()
+        if query_context.retry_options is not None:
+            query_context = query_context._replace(
+                retry_options=CountingRetryOptions(query_context.retry_options, name)
+            )
+        started = time.perf_counter()
+        try:
+            result = await super()._query(query_context)
+        finally:
+            elapsed = self.tally(started)
+        histogram("edgedb_query_seconds", "EdgeDB query latency", query=name).observe(elapsed)
+        if isinstance(result, str):
+            histogram(
+                "edgedb_query_result_bytes", "Size of JSON query results", BYTE_BUCKETS, query=name
+            ).observe(len(result))
+        else:
+            rows = len(result) if isinstance(result, list) else int(result is not None)
+            histogram("edgedb_query_rows", "Rows returned by a query", ROW_BUCKETS, query=name).observe(rows)
+        self.log_if_slow(name, elapsed, query_context.query)
+        return result
+
+    async def _execute(self, execute_context: abstract.ExecuteContext) -> None:
+        name = self.caller_name()
+        started = time.perf_counter()
+        try:
+            await super()._execute(execute_context)
+        finally:
+            elapsed = self.tally(started)
+        histogram("edgedb_query_seconds", "EdgeDB query latency", query=name).observe(elapsed)
+        self.log_if_slow(name, elapsed, execute_context.query)
+
+    @staticmethod
+    def tally(started: float) -> float:
+        elapsed = time.perf_counter() - started
+        tally = request_queries.get()
+        if tally is not None:
+            tally.add(elapsed)
+        return elapsed
+
+    def log_if_slow(self, name: str, elapsed: float, query: abstract.QueryWithArgs) -> None:
+        if elapsed < self.slow_query_seconds:
+            return
+        params = [param_shape(arg) for arg in query.args]
+        params.extend(f"{key}: {param_shape(value)}" for key, value in query.kwargs.items())
+        logger.warning("Slow query %s took %.3fs, params (%s)", name, elapsed, ", ".join(params))
+
+
+def create_instrumented_client(max_concurrency: int | None = None, **connect_args) -> InstrumentedClient:
+    """`edgedb.create_async_client()`, instrumented."""
+    return InstrumentedClient(
+        connection_class=edgedb.asyncio_client.AsyncIOConnection,
+        max_concurrency=max_concurrency,
+        **connect_args,
+    )
+
+
+class QueryCountMiddleware:
+    """Tallies the DB round trips of each request and, with `DEBUG` on,
+    reports them in `X-DB-Query-Count` and `X-DB-Query-Time` (ms).
+
+    Headers go out with the response start, so a streamed response only
+    counts the queries made before its first chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tally = QueryTally()
+        token = request_queries.set(tally)
+
+        async def send_with_tally(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-query-count", str(tally.count).encode()),
+                    (b"x-db-query-time", f"{tally.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_tally)
+        finally:
+            request_queries.reset(token)
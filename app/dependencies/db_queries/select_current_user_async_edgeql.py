@@ -34,6 +34,7 @@ class SelectCurrentUserResult(NoPydanticValidation):
     is_student: bool
     is_admin: bool
     is_parent: bool
+    identity_id: uuid.UUID | None
 
 
 async def select_current_user(
@@ -51,6 +52,7 @@ async def select_current_user(
                  is_student,
                  is_admin,
                  is_parent,
+                 identity_id := .identity.id,
              }
         filter User.id = global current_user.id
         limit 1\
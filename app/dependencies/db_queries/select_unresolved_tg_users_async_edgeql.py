@@ -0,0 +1,51 @@
+# AUTOGENERATED FROM 'app/dependencies/db_queries/select_unresolved_tg_users.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class SelectUnresolvedTgUsersResult(NoPydanticValidation):
+    id: uuid.UUID
+    tg_id: int | None
+    tg_username: str | None
+
+
+async def select_unresolved_tg_users(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    stale_before: datetime.datetime,
+    limit: int,
+) -> list[SelectUnresolvedTgUsersResult]:
+    return await executor.query(
+        """\
+        select User {id, tg_id, tg_username}
+        filter (exists .tg_id or exists .tg_username)
+            and ((.tg_resolved_at < <datetime>$stale_before) ?? true)
+        order by .tg_resolved_at empty first
+        limit <int64>$limit\
+        """,
+        stale_before=stale_before,
+        limit=limit,
+    )
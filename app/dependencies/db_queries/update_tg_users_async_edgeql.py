@@ -0,0 +1,27 @@
+# AUTOGENERATED FROM 'app/dependencies/db_queries/update_tg_users.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import edgedb
+
+
+async def update_tg_users(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    users: str,
+) -> None:
+    await executor.execute(
+        """\
+        for item in json_array_unpack(<json>$users) union (
+            update User
+            filter .id = <uuid>item['id']
+            set {
+                tg_id := <int64>json_get(item, 'tg_id') ?? .tg_id,
+                tg_username := <str>json_get(item, 'tg_username') ?? .tg_username,
+                tg_resolved_at := datetime_of_statement(),
+            }
+        )\
+        """,
+        users=users,
+    )
@@ -0,0 +1,181 @@
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+
+PathTree = dict[str, "PathTree"]
+
+
+@dataclass(frozen=True, eq=False)
+class Fieldset:
+    """Selectable shape of an EdgeDB object type.
+
+    Names are the ones in dbschema/default.esdl, which
+    tests/dependencies/test_fieldsets.py checks. `default` lists what is
+    selected when the client doesn't ask for specific fields; `id` is
+    always selected.
+    """
+
+    properties: tuple[str, ...]
+    default: tuple[str, ...]
+    links: dict[str, "Fieldset"] = field(default_factory=dict)
+
+
+class UnknownFieldError(ValueError):
+    pass
+
+
+USER_FIELDSET = Fieldset(
+    properties=(
+        "id",
+        "created_at",
+        "updated_at",
+        "first_name",
+        "last_name",
+        "email",
+        "status",
+    ),
+    default=("first_name", "last_name"),
+)
+CLASS_FIELDSET = Fieldset(
+    properties=("id", "created_at", "updated_at", "name", "year"),
+    default=("name", "year"),
+)
+SUBJECT_FIELDSET = Fieldset(
+    properties=("id", "created_at", "updated_at", "name"),
+    default=("name",),
+)
+STUDENT_FIELDSET = Fieldset(
+    properties=("id", "created_at", "updated_at"),
+    default=("user",),
+    links={"user": USER_FIELDSET, "class_": CLASS_FIELDSET},
+)
+TEACHER_FIELDSET = Fieldset(
+    properties=("id", "created_at", "updated_at"),
+    default=("user",),
+    links={
+        "user": USER_FIELDSET,
+        "subjects": SUBJECT_FIELDSET,
+        "classes": CLASS_FIELDSET,
+    },
+)
+PARENT_FIELDSET = Fieldset(
+    properties=("id", "created_at", "updated_at"),
+    default=("user",),
+    links={"user": USER_FIELDSET, "children": STUDENT_FIELDSET},
+)
+HOMEWORK_FIELDSET = Fieldset(
+    properties=(
+        "id",
+        "created_at",
+        "updated_at",
+        "deadline",
+        "assignment",
+        "done_by_student",
+        "grade",
+    ),
+    default=(
+        "deadline",
+        "assignment",
+        "done_by_student",
+        "grade",
+        "assigned_to",
+        "assigned_by",
+        "subject",
+    ),
+    links={
+        "assigned_to": STUDENT_FIELDSET,
+        "assigned_by": TEACHER_FIELDSET,
+        "subject": SUBJECT_FIELDSET,
+    },
+)
+
+
+def _path_tree(paths: Iterable[str]) -> PathTree:
+    tree: PathTree = {}
+    for path in paths:
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _render(fieldset: Fieldset, fields: PathTree, expand: PathTree) -> str:
+    for name, subtree in fields.items():
+        if name in fieldset.links:
+            continue
+        if name not in fieldset.properties or subtree:
+            raise UnknownFieldError(name)
+    for name in expand:
+        if name not in fieldset.links:
+            raise UnknownFieldError(name)
+
+    leaves = {name for name, subtree in fields.items() if not subtree}
+    selected = {"id", *(leaves or fieldset.default), *fields, *expand}
+
+    parts = []
+    for name in (*fieldset.properties, *fieldset.links):
+        if name not in selected:
+            continue
+        if name in fieldset.links:
+            shape = _render(
+                fieldset.links[name], fields.get(name, {}), expand.get(name, {})
+            )
+            parts.append(f"{name}: {shape}")
+        else:
+            parts.append(name)
+    return "{ " + ", ".join(parts) + " }"
+
+
+@lru_cache(maxsize=256)
+def build_shape(
+    fieldset: Fieldset,
+    fields: frozenset[str] = frozenset(),
+    expand: frozenset[str] = frozenset(),
+) -> str:
+    """Render an EdgeQL shape for the requested dotted `fields`/`expand` paths.
+
+    Names are checked against the fieldset and emitted in declaration
+    order, so equal requests always produce the same query text.
+    """
+    return _render(fieldset, _path_tree(fields), _path_tree(expand))
+
+
+@lru_cache(maxsize=None)
+def full_shape(fieldset: Fieldset) -> str:
+    """Shape selecting every property and link, as write endpoints return."""
+    parts = [*fieldset.properties]
+    parts.extend(f"{name}: {full_shape(link)}" for name, link in fieldset.links.items())
+    return "{ " + ", ".join(parts) + " }"
+
+
+def _split(value: str | None) -> frozenset[str]:
+    if not value:
+        return frozenset()
+    return frozenset(i.strip() for i in value.split(",") if i.strip())
+
+
+def sparse_shape(
+    fieldset: Fieldset, always: Iterable[str] = ()
+) -> Callable[..., str]:
+    """Dependency reading `fields`/`expand` query params into a shape.
+
+    `always` names fields the endpoint itself relies on, e.g. the keyset
+    column; they're kept even when the client narrows `fields`.
+    """
+    kept = frozenset(always)
+
+    def inner(fields: str | None = None, expand: str | None = None) -> str:
+        requested = _split(fields)
+        if requested:
+            requested |= kept
+        try:
+            return build_shape(fieldset, requested, _split(expand))
+        except UnknownFieldError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{e}'",
+            ) from e
+
+    return inner
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.dependencies.metrics import histogram
+
+HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so threads are enough. At most
+    `workers + max_queue` calls may be in flight; any more get 503 instead
+    of queueing behind a login burst.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self.workers = workers
+        self.max_in_flight = workers + max_queue
+        self.in_flight = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.hash_seconds = histogram(
+            "password_hash_seconds", "Time spent in bcrypt per call", HASH_BUCKETS
+        )
+        self.queue_wait_seconds = histogram(
+            "password_hash_queue_wait_seconds", "Time a bcrypt call waited for a worker"
+        )
+
+    async def _run(self, func, *args):
+        if self.in_flight >= self.max_in_flight:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password checks",
+                headers={"Retry-After": "1"},
+            )
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            return started, func(*args), time.perf_counter()
+
+        self.in_flight += 1
+        try:
+            started, result, finished = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.in_flight -= 1
+        # Observed back on the event loop, so the histograms need no locking.
+        self.queue_wait_seconds.observe(started - submitted)
+        self.hash_seconds.observe(finished - started)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    CryptContext(schemes=["bcrypt"], deprecated="auto"),
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,112 @@
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense, in seconds
+    unless given other `buckets`."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        labels: dict[str, str] | None = None,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels = labels or {}
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """`(upper bound, observations <= bound)` pairs, ending with +Inf."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+histograms: dict[tuple[str, tuple[tuple[str, str], ...]], Histogram] = {}
+
+
+def histogram(
+    name: str,
+    description: str,
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    **labels: str,
+) -> Histogram:
+    """Get or register the process-wide histogram `name` with `labels`."""
+    key = (name, tuple(sorted(labels.items())))
+    if key not in histograms:
+        histograms[key] = Histogram(name, description, buckets, labels)
+    return histograms[key]
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: dict[str, str] | None = None):
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+counters: dict[tuple[str, tuple[tuple[str, str], ...]], Counter] = {}
+
+
+def counter(name: str, description: str, **labels: str) -> Counter:
+    """Get or register the process-wide counter `name` with `labels`."""
+    key = (name, tuple(sorted(labels.items())))
+    if key not in counters:
+        counters[key] = Counter(name, description, labels)
+    return counters[key]
+
+
+def _labels(labels: dict[str, str], **extra: str) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    described = set()
+    for metric in sorted(histograms.values(), key=lambda h: h.name):
+        if metric.name not in described:
+            described.add(metric.name)
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} histogram")
+        for bound, count in metric.cumulative():
+            lines.append(f"{metric.name}_bucket{_labels(metric.labels, le=_bound(bound))} {count}")
+        lines.append(f"{metric.name}_sum{_labels(metric.labels)} {metric.sum}")
+        lines.append(f"{metric.name}_count{_labels(metric.labels)} {metric.count}")
+    for metric in sorted(counters.values(), key=lambda c: c.name):
+        if metric.name not in described:
+            described.add(metric.name)
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} counter")
+        lines.append(f"{metric.name}{_labels(metric.labels)} {metric.value}")
+    return "\n".join(lines) + "\n"
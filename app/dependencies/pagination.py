@@ -0,0 +1,49 @@
+import base64
+import binascii
+from datetime import datetime
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ValidationError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class KeysetCursor(BaseModel):
+    """Position of the last row of a page ordered by `(deadline, id)`."""
+
+    deadline: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        raw = orjson.dumps([self.deadline.isoformat(), str(self.id)])
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "KeysetCursor":
+        padded = cursor + "=" * (-len(cursor) % 4)
+        try:
+            deadline, id_ = orjson.loads(base64.urlsafe_b64decode(padded))
+            return cls(deadline=deadline, id=id_)
+        except (binascii.Error, orjson.JSONDecodeError, ValueError, TypeError, ValidationError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            ) from e
+
+
+class Page(BaseModel):
+    limit: int
+    cursor: KeysetCursor | None = None
+
+
+async def get_page(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+) -> Page:
+    return Page(
+        limit=limit,
+        cursor=KeysetCursor.decode(cursor) if cursor is not None else None,
+    )
@@ -0,0 +1,240 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from itertools import islice
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+
+
+@dataclass(frozen=True)
+class Limit:
+    per_minute: float
+    burst: int
+
+    @property
+    def interval(self) -> float:
+        return 60 / self.per_minute
+
+    @property
+    def tolerance(self) -> float:
+        return self.interval * (self.burst - 1)
+
+
+@dataclass(frozen=True)
+class RouteLimits:
+    per_ip: Limit
+    per_email: Limit | None = None
+    email_field: str = "email"
+
+
+def bucket_key(*parts: str) -> bytes:
+    """8-byte digest, so emails are not kept around and every key is the same size."""
+    return hashlib.blake2b("\0".join(parts).encode(), digest_size=8).digest()
+
+
+def gcra(tat: float | None, limit: Limit, now: float) -> tuple[float, float]:
+    """One token bucket step, as a generic cell rate algorithm.
+
+    The whole bucket is a single float, the "theoretical arrival time" at
+    which it would be full again. Returns `(new tat, retry after)`, with
+    retry after 0 when the call is allowed.
+    """
+    tat = now if tat is None or tat < now else tat
+    wait = tat - now - limit.tolerance
+    if wait > 0:
+        return tat, wait
+    return tat + limit.interval, 0.0
+
+
+class MemoryBuckets:
+    """Buckets of one worker process, as digest -> tat.
+
+    A bucket whose tat has passed is full, the same as not having one, so
+    eviction just drops those every `evict_every` seconds, or sooner once
+    there are `max_keys`. Each eviction leaves at most `low_water` of
+    `max_keys`, so under a flood of new keys its O(n) pass runs once per
+    that many requests rather than on every one.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 100_000,
+        evict_every: float = 60.0,
+        low_water: float = 0.9,
+        timer=time.time,
+    ):
+        self.max_keys = max_keys
+        self.keep_keys = int(max_keys * low_water)
+        self.evict_every = evict_every
+        self.timer = timer
+        self.tats: dict[bytes, float] = {}
+        self.next_eviction = timer() + evict_every
+
+    def take(self, key: bytes, limit: Limit) -> float:
+        now = self.timer()
+        if now >= self.next_eviction or len(self.tats) >= self.max_keys:
+            self.evict(now)
+        self.tats[key], retry_after = gcra(self.tats.get(key), limit, now)
+        return retry_after
+
+    def evict(self, now: float) -> None:
+        self.tats = {key: tat for key, tat in self.tats.items() if tat > now}
+        # Still mostly live buckets: forget the oldest ones, erring on the
+        # lenient side rather than growing without bound.
+        for key in list(islice(self.tats, max(0, len(self.tats) - self.keep_keys))):
+            del self.tats[key]
+        self.next_eviction = now + self.evict_every
+
+
+class SharedBuckets:
+    """Buckets shared by all workers on a host through a mapped file.
+
+    The file is a fixed table of `slots` (digest, tat) pairs, open
+    addressed with a short probe window, under an exclusive `flock` per
+    call. Put it on tmpfs, e.g. /dev/shm. A slot whose tat has passed is
+    free; with no free slot in the window the one closest to full is taken
+    over.
+    """
+
+    SLOT = struct.Struct("8sd")
+    PROBES = 8
+
+    def __init__(self, path: str, slots: int = 65536, timer=time.time):
+        self.slots = slots
+        self.timer = timer
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self.SLOT.size
+        if os.fstat(self.fd).st_size != size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+
+    def take(self, key: bytes, limit: Limit) -> float:
+        start = int.from_bytes(key, "little") % self.slots
+        window = [(start + i) % self.slots for i in range(self.PROBES)]
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            now = self.timer()
+            entries = [self.SLOT.unpack_from(self.map, i * self.SLOT.size) for i in window]
+            slot, tat = next(
+                ((i, tat) for i, (k, tat) in zip(window, entries, strict=True) if k == key and tat > now),
+                (None, None),
+            )
+            if slot is None:
+                slot = min(zip(window, entries, strict=True), key=lambda e: e[1][1])[0]
+            new_tat, retry_after = gcra(tat, limit, now)
+            self.SLOT.pack_into(self.map, slot * self.SLOT.size, key, new_tat)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return retry_after
+
+
+def make_bucket_store() -> MemoryBuckets | SharedBuckets:
+    if settings.RATE_LIMIT_SHARED_PATH:
+        return SharedBuckets(settings.RATE_LIMIT_SHARED_PATH, settings.RATE_LIMIT_SHARED_SLOTS)
+    return MemoryBuckets()
+
+
+def login_limits(email_field: str = "email") -> RouteLimits:
+    return RouteLimits(
+        per_ip=Limit(settings.RATE_LIMIT_IP_PER_MINUTE, settings.RATE_LIMIT_IP_BURST),
+        per_email=Limit(settings.RATE_LIMIT_EMAIL_PER_MINUTE, settings.RATE_LIMIT_EMAIL_BURST),
+        email_field=email_field,
+    )
+
+
+def too_many_requests(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Too many attempts, try again later"},
+        status_code=429,
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+def normalize_path(path: str) -> str:
+    return path.rstrip("/") or "/"
+
+
+class RateLimitMiddleware:
+    """Answers 429 on POSTs to `routes` over their per-IP or per-email limit.
+
+    It runs before routing, so a rejected attempt costs no form parsing,
+    hashing or auth extension call. The email is read from the urlencoded
+    form body, which is then replayed to the app unchanged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: dict[str, RouteLimits],
+        store: MemoryBuckets | SharedBuckets,
+        max_body: int = 16 * 1024,
+    ):
+        self.app = app
+        self.routes = {normalize_path(path): limits for path, limits in routes.items()}
+        self.store = store
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Routes answer with and without a trailing slash, so must the limits.
+        path = normalize_path(scope["path"]) if scope["type"] == "http" else None
+        limits = self.routes.get(path)
+        if limits is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        client_ip = scope["client"][0] if scope.get("client") else ""
+        retry_after = self.store.take(bucket_key("ip", path, client_ip), limits.per_ip)
+        if not retry_after and limits.per_email is not None:
+            body = await self.read_body(receive)
+            if body is None:
+                await JSONResponse({"detail": "Request body too large"}, 413)(scope, receive, send)
+                return
+            email = self.form_value(scope, body, limits.email_field)
+            if email:
+                retry_after = self.store.take(bucket_key("email", path, email.lower()), limits.per_email)
+            receive = self.replay(body, receive)
+        if retry_after:
+            await too_many_requests(retry_after)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def read_body(self, receive: Receive) -> bytes | None:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > self.max_body:
+                return None
+            if not message.get("more_body", False):
+                return body
+
+    @staticmethod
+    def form_value(scope: Scope, body: bytes, field: str) -> str | None:
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        if not content_type.startswith(FORM_CONTENT_TYPE):
+            return None
+        values = parse_qs(body.decode("latin-1")).get(field)
+        return values[0].strip() if values else None
+
+    @staticmethod
+    def replay(body: bytes, receive: Receive) -> Receive:
+        sent = False
+
+        async def replayed() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return replayed
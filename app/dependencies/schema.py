@@ -0,0 +1,93 @@
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Just enough of an SDL reader for our own schema. The fieldsets tests
+# and scripts/audit_indexes.py use it.
+SCHEMA = Path(__file__).parent.parent.parent / "dbschema/default.esdl"
+
+SCALARS = {
+    "str", "bool", "uuid", "json", "bytes", "datetime", "duration", "decimal", "bigint",
+    "int16", "int32", "int64", "float32", "float64", "sequence",
+}  # fmt: skip
+MEMBER = re.compile(
+    r"^(?:required\s+|optional\s+)?(?:multi\s+|single\s+)?(?P<kind>link\s+|property\s+)?"
+    r"(?P<name>\w+)\s*(?P<op>:=|->|:)\s*(?P<target>[\w:]+)?"
+)
+TYPE_DECL = re.compile(r"^(?:abstract\s+)?type\s+(?P<name>\w+)(?:\s+extending\s+(?P<bases>[\w\s,]+?))?\s*\{")
+FIRST_STEP = re.compile(r"(?<![\w\])>.])\.(\w+)")
+
+
+@dataclass
+class TypeInfo:
+    bases: list[str] = field(default_factory=list)
+    links: set[str] = field(default_factory=set)
+    properties: set[str] = field(default_factory=set)
+    computed: set[str] = field(default_factory=set)
+    flags: set[str] = field(default_factory=set)
+    indexed: set[str] = field(default_factory=set)
+    # Later elements of composite indexes -> their leading element.
+    index_tails: dict[str, str] = field(default_factory=dict)
+    policy_filters: list[str] = field(default_factory=list)
+
+
+def strip_comments(text: str) -> str:
+    text = re.sub(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"", "''", text)
+    return re.sub(r"#[^\n]*", "", text)
+
+
+def parse_schema(text: str) -> dict[str, TypeInfo]:  # noqa: C901
+    """Members and indexed first path steps of every type, bases merged in."""
+    types: dict[str, TypeInfo] = {}
+    current: TypeInfo | None = None
+    type_depth = depth = 0
+    member: str | None = None
+    for raw in strip_comments(text).splitlines():
+        line = raw.strip()
+        if current is None and (decl := TYPE_DECL.match(line)):
+            current = types[decl["name"]] = TypeInfo(
+                bases=[b.strip() for b in (decl["bases"] or "").split(",") if b.strip()]
+            )
+            type_depth = depth + 1
+        elif current is not None and depth == type_depth:
+            member = None
+            if line.startswith(("index on", "constraint exclusive on")):
+                lead, *tail = FIRST_STEP.findall(line.split(" except ")[0])
+                current.indexed.add(lead)
+                current.index_tails.update(dict.fromkeys(tail, lead))
+            elif line.startswith(("access policy", "allow", "deny")):
+                current.policy_filters.append(line)
+            elif decl := MEMBER.match(line):
+                member = decl["name"]
+                target = (decl["target"] or "").removeprefix("std::")
+                if decl["op"] == ":=":
+                    # Backlinks are looked up through the forward link's index.
+                    is_backlink = line.split(":=", 1)[1].strip().startswith(".<")
+                    (current.links if is_backlink else current.computed).add(member)
+                    if decl["kind"] and decl["kind"].startswith("link"):
+                        current.links.add(member)
+                elif decl["kind"] and decl["kind"].startswith("link") or target not in SCALARS:
+                    current.links.add(member)
+                else:
+                    current.properties.add(member)
+                    if target == "bool":
+                        current.flags.add(member)
+        elif current is not None and depth > type_depth:
+            if member and depth == type_depth + 1 and line.startswith("constraint exclusive"):
+                current.indexed.add(member)
+            if current.policy_filters and "using" not in line and depth == type_depth + 1:
+                current.policy_filters[-1] += " " + line
+        depth += line.count("{") - line.count("}")
+        if current is not None and depth < type_depth:
+            current = None
+    for info in types.values():
+        for base in info.bases:
+            parent = types.get(base)
+            if parent:
+                info.links |= parent.links
+                info.properties |= parent.properties
+                info.computed |= parent.computed
+                info.flags |= parent.flags
+                info.indexed |= parent.indexed
+                info.index_tails |= parent.index_tails
+    return types
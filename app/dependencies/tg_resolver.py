@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from edgedb.errors import ConstraintViolationError
+from telethon.errors import FloodWaitError, RPCError
+from telethon.types import User as TgUser
+
+from app.config import settings
+
+from .db_queries.select_unresolved_tg_users_async_edgeql import (
+    SelectUnresolvedTgUsersResult,
+    select_unresolved_tg_users,
+)
+from .db_queries.update_tg_users_async_edgeql import update_tg_users
+
+logger = logging.getLogger(__name__)
+
+MAX_FLOOD_WAIT_RETRIES = 3
+RESOLVE_BATCH_SIZE = 200
+
+# The resolver loop and the POST /users background task take turns, so
+# together they never exceed TG_RESOLVE_CONCURRENCY Telegram calls or
+# resolve the same users twice at once.
+resolve_lock = asyncio.Lock()
+
+
+async def get_tg_entity(tg_client, key: int | str, semaphore: asyncio.Semaphore):
+    """`get_entity` with at most `semaphore` calls in flight, waiting out FloodWait."""
+    async with semaphore:
+        for _ in range(MAX_FLOOD_WAIT_RETRIES):
+            try:
+                return await tg_client.get_entity(key)
+            except FloodWaitError as e:
+                await asyncio.sleep(e.seconds)
+        raise TimeoutError(f"Telegram kept asking to wait while resolving {key}")
+
+
+async def _resolve_user(tg_client, user: SelectUnresolvedTgUsersResult, semaphore) -> dict:
+    resolved = {"id": str(user.id)}
+    try:
+        entity = await get_tg_entity(tg_client, user.tg_id or user.tg_username, semaphore)
+    except (ValueError, TimeoutError, RPCError) as e:
+        # Still stamped as resolved, so it is retried after the refresh
+        # interval instead of on every tick. FloodWait never gets here:
+        # `get_tg_entity` waits it out or turns it into TimeoutError.
+        logger.warning("Could not resolve Telegram user %s: %r", user.id, e)
+        return resolved
+    if isinstance(entity, TgUser):
+        resolved["tg_id"] = entity.id
+        if entity.username or entity.phone:
+            resolved["tg_username"] = entity.username or entity.phone
+    return resolved
+
+
+async def resolve_tg_users(db_client, tg_client) -> int:
+    """Fill in or refresh `tg_id`/`tg_username` for one batch of users."""
+    async with resolve_lock:
+        return await _resolve_batch(db_client, tg_client)
+
+
+async def _resolve_batch(db_client, tg_client) -> int:
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.TG_USERNAME_REFRESH_AFTER)
+    users = await select_unresolved_tg_users(db_client, stale_before=stale_before, limit=RESOLVE_BATCH_SIZE)
+    if not users:
+        return 0
+    semaphore = asyncio.Semaphore(settings.TG_RESOLVE_CONCURRENCY)
+    resolved = await asyncio.gather(*(_resolve_user(tg_client, user, semaphore) for user in users))
+    try:
+        await update_tg_users(db_client, users=orjson.dumps(resolved).decode())
+    except ConstraintViolationError:
+        # A Telegram account already linked to another user fails the
+        # whole batch: store one by one and stamp the conflicting ones only.
+        for item in resolved:
+            try:
+                await update_tg_users(db_client, users=orjson.dumps([item]).decode())
+            except ConstraintViolationError:
+                logger.warning("Telegram account of user %s is linked to another user", item["id"])
+                await update_tg_users(db_client, users=orjson.dumps([{"id": item["id"]}]).decode())
+    return len(resolved)
+
+
+async def run_tg_resolver(db_client, tg_client) -> None:
+    while True:
+        try:
+            await resolve_tg_users(db_client, tg_client)
+        except Exception:
+            logger.exception("Telegram username resolution failed")
+        await asyncio.sleep(settings.TG_RESOLVE_INTERVAL)
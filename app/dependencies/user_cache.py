@@ -0,0 +1,93 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.schemas.auth import FullUser
+
+
+def token_expiry(token: str) -> float | None:
+    """Unix time the auth extension token expires at, read without verifying.
+
+    The signing key lives in the auth extension, so this is only good for
+    rejecting expired tokens early; the DB still decides which are valid.
+    """
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+    return float(exp) if isinstance(exp, int | float) else None
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    identity_id: UUID | None
+    user: FullUser
+    expires_at: float | None = None
+
+
+class UserCache:
+    """Bounded LRU of resolved sessions with a TTL, keyed by auth token hash.
+
+    Only the token digest is stored, never the token itself. Entries never
+    outlive the token's own expiry. Each worker process has its own cache,
+    so the TTL bounds how long another worker can serve roles changed
+    through this one.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.clock = clock
+        self.entries: OrderedDict[bytes, tuple[float, CachedSession]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> CachedSession | None:
+        key = self.key(token)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= self.timer() or self.expired(entry[1]):
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def expired(self, session: CachedSession) -> bool:
+        return session.expires_at is not None and session.expires_at <= self.clock()
+
+    def set(self, token: str, session: CachedSession) -> None:
+        if self.expired(session):
+            return
+        key = self.key(token)
+        self.entries[key] = (self.timer() + self.ttl, session)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Drop every session of `user_id`, e.g. after their roles changed."""
+        for key in [k for k, (_, session) in self.entries.items() if session.user.id == user_id]:
+            del self.entries[key]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+current_user_cache = UserCache(
+    maxsize=settings.CURRENT_USER_CACHE_SIZE, ttl=settings.CURRENT_USER_CACHE_TTL
+)
@@ -0,0 +1,83 @@
+import importlib
+import inspect
+import logging
+import pathlib
+import time
+from collections.abc import Iterator
+from types import ModuleType
+
+import edgedb
+from edgedb.protocol.protocol import OutputFormat
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = pathlib.Path(__file__).parents[1]
+
+# (query, output format, expect one) of the queries that are built in the
+# app rather than generated, e.g. per-role and fieldset-dependent ones.
+registered_queries: dict[tuple[str, OutputFormat, bool], None] = {}
+
+
+def register_query(query: str, *, json: bool = True, single: bool = False) -> str:
+    """Add `query` to the startup warm-up and return it unchanged."""
+    output_format = OutputFormat.JSON if json else OutputFormat.BINARY
+    registered_queries[(query, output_format, single)] = None
+    return query
+
+
+class DescribingExecutor:
+    """Stands in for a client to collect what generated wrappers would run."""
+
+    def __init__(self):
+        self.queries: list[tuple[str, OutputFormat, bool]] = []
+
+    async def query(self, query: str, **_):
+        self.queries.append((query, OutputFormat.BINARY, False))
+        return []
+
+    async def query_single(self, query: str, **_):
+        self.queries.append((query, OutputFormat.BINARY, True))
+
+    async def query_required_single(self, query: str, **_):
+        self.queries.append((query, OutputFormat.BINARY, True))
+
+    async def execute(self, query: str, **_):
+        self.queries.append((query, OutputFormat.NONE, False))
+
+
+def generated_query_modules() -> Iterator[ModuleType]:
+    for path in sorted(APP_ROOT.rglob("*_async_edgeql.py")):
+        yield importlib.import_module(".".join(path.relative_to(APP_ROOT.parent).with_suffix("").parts))
+
+
+async def generated_queries() -> list[tuple[str, OutputFormat, bool]]:
+    """Query texts of every `edgedb-py` wrapper under `app/`, exactly as sent."""
+    executor = DescribingExecutor()
+    for module in generated_query_modules():
+        for _, func in inspect.getmembers(module, inspect.iscoroutinefunction):
+            if func.__module__ == module.__name__:
+                params = list(inspect.signature(func).parameters)[1:]
+                await func(executor, **dict.fromkeys(params))
+    return executor.queries
+
+
+async def warm_up_queries(client: edgedb.AsyncIOClient) -> int:
+    """Have EdgeDB compile every known query before the first request does.
+
+    Queries are only described, which parses and compiles them into the
+    server's cache without running anything, so inserts are safe too.
+    """
+    started = time.perf_counter()
+    queries = [*await generated_queries(), *registered_queries]
+    for query, output_format, expect_one in queries:
+        try:
+            await client._describe_query(  # noqa: SLF001
+                query, output_format=output_format, expect_one=expect_one
+            )
+        except edgedb.ClientConnectionError:
+            logger.warning("EdgeDB is unreachable, skipping query warm-up")
+            return 0
+        except edgedb.EdgeDBError:
+            logger.warning("Could not compile query:\n%s", query, exc_info=True)
+    logger.info("Compiled %d queries in %.2fs", len(queries), time.perf_counter() - started)
+    return len(queries)
@@ -0,0 +1,60 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.homeworks import MAX_GRADE
+from app.schemas.students import SparseStudent
+from app.schemas.subjects import SparseSubject
+from app.schemas.teachers import SparseTeacher
+
+
+class CreateAssignmentPayload(BaseModel):
+    text: str
+    teacher_id: UUID
+    subject_id: UUID
+    deadline: datetime
+    student_ids: list[UUID] = []
+    class_ids: list[UUID] = []
+
+    @model_validator(mode="after")
+    def check_recipients(self) -> "CreateAssignmentPayload":
+        if not self.student_ids and not self.class_ids:
+            raise ValueError("Either student_ids or class_ids is required")
+        return self
+
+
+class UpdateAssignmentPayload(BaseModel):
+    text: str | None = None
+    deadline: datetime | None = None
+
+
+class UpdateSubmissionPayload(BaseModel):
+    done_by_student: bool | None = None
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
+
+
+class Submission(BaseModel):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+    done_by_student: bool
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
+    student: SparseStudent
+
+
+class Assignment(BaseModel):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+    text: str
+    deadline: datetime
+    subject: SparseSubject
+    teacher: SparseTeacher
+    submissions_count: int
+    done_count: int
+    submissions: list[Submission] = Field(default_factory=list)
+
+
+class AssignmentsList(BaseModel):
+    data: list[Assignment]
@@ -1,4 +1,5 @@
 import inspect
+from datetime import datetime
 from enum import Enum
 from typing import Annotated, TypeVar
 from uuid import UUID
@@ -38,6 +39,13 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: UUID
+    first_name: str
+    last_name: str
+    status: Status
+    is_teacher: bool | None
+    is_student: bool | None
+    is_admin: bool | None
+    is_parent: bool | None
 
 
 class BaseUser(BaseModel):
@@ -48,14 +56,26 @@ class BaseUser(BaseModel):
 
 @as_form
 class CreateUserPayload(BaseUser):
+    email: str
     password: str
 
 
 class InlineUser(BaseUser):
     id: UUID
+    email: str | None = None
     status: Status
 
 
+class SparseUser(BaseModel):
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    email: str | None = None
+    status: Status | None = None
+
+
 class FullUser(InlineUser):
     is_teacher: bool | None
     is_student: bool | None
@@ -63,6 +83,12 @@ class FullUser(InlineUser):
     is_parent: bool | None
 
 
+class UserCacheStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+
+
 class UsersList(BaseModel):
     data: list[FullUser]
 
@@ -15,5 +15,13 @@ class Class(CreateClassPayload):
     updated_at: datetime
 
 
+class SparseClass(BaseModel):
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    name: str | None = None
+    year: int | None = None
+
+
 class ClassesList(BaseModel):
     data: list[Class]
@@ -1,25 +1,68 @@
 from datetime import datetime
+from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
-from app.schemas.students import Student
-from app.schemas.subjects import Subject
-from app.schemas.teachers import Teacher
+from app.schemas.students import SparseStudent, Student
+from app.schemas.subjects import SparseSubject, Subject
+from app.schemas.teachers import SparseTeacher, Teacher
+
+# Grades are stored as int32.
+MAX_GRADE = 2**31 - 1
 
 
 class CreateHomeworkPayload(BaseModel):
     assignment: str
-    assigned_to: list[UUID]
+    assigned_to: list[UUID] = []
+    class_ids: list[UUID] = []
+    assigned_by: UUID
+    subject_id: UUID
+    deadline: datetime
+
+    @model_validator(mode="after")
+    def check_recipients(self) -> "CreateHomeworkPayload":
+        if not self.assigned_to and not self.class_ids:
+            raise ValueError("Either assigned_to or class_ids is required")
+        return self
+
+
+class CreatedHomework(BaseModel):
+    id: UUID
+    assigned_to: UUID
+
+
+class HomeworksCreated(BaseModel):
+    count: int
+    assignment: str
     assigned_by: UUID
     subject_id: UUID
     deadline: datetime
+    data: list[CreatedHomework]
 
 
 class UpdateHomeworkPayload(BaseModel):
     done_by_student: bool | None = None
     assignment: str | None = None
-    grade: int | None = None
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
+
+
+class BulkUpdateHomeworkItem(BaseModel):
+    id: UUID
+    done_by_student: bool | None = None
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
+
+
+class BulkUpdateHomeworkResult(BaseModel):
+    id: UUID
+    updated: bool
+    detail: str | None = None
+    done_by_student: bool | None = None
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
+
+
+class BulkUpdateHomeworksResult(BaseModel):
+    data: list[BulkUpdateHomeworkResult]
 
 
 class Homework(BaseModel):
@@ -32,8 +75,64 @@ class Homework(BaseModel):
     subject: Subject
     deadline: datetime
     done_by_student: bool
-    grade: int | None = None
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
 
 
 class HomeworksList(BaseModel):
     data: list[Homework]
+
+
+class SparseHomework(BaseModel):
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    assignment: str | None = None
+    assigned_to: SparseStudent | None = None
+    assigned_by: SparseTeacher | None = None
+    subject: SparseSubject | None = None
+    deadline: datetime | None = None
+    done_by_student: bool | None = None
+    grade: int | None = Field(None, ge=0, le=MAX_GRADE)
+
+
+class SparseHomeworksList(BaseModel):
+    data: list[SparseHomework]
+    next_cursor: str | None = None
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class StatsWindow(str, Enum):
+    week = "weeks"
+    month = "months"
+
+
+class GradeCount(BaseModel):
+    grade: int
+    count: int
+
+
+class HomeworkStatsSummary(BaseModel):
+    total: int
+    done: int
+    overdue: int
+    upcoming: int
+    grade_mean: float | None = None
+    grade_median: float | None = None
+    grade_distribution: list[GradeCount]
+
+
+class SubjectHomeworkStats(HomeworkStatsSummary):
+    subject: SparseSubject
+
+
+class WindowHomeworkStats(HomeworkStatsSummary):
+    window: datetime
+
+
+class HomeworkStats(HomeworkStatsSummary):
+    by_subject: list[SubjectHomeworkStats]
+    by_window: list[WindowHomeworkStats]
@@ -3,7 +3,8 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from app.schemas.auth import InlineUser
+from app.schemas.auth import InlineUser, SparseUser
+from app.schemas.students import SparseStudent
 
 
 class CreateParentPayload(BaseModel):
@@ -19,3 +20,15 @@ class Parent(BaseModel):
 
 class ParentsList(BaseModel):
     data: list[Parent]
+
+
+class SparseParent(BaseModel):
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    user: SparseUser | None = None
+    children: list[SparseStudent] | None = None
+
+
+class SparseParentsList(BaseModel):
+    data: list[SparseParent]
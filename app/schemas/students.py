@@ -1,11 +1,11 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from pydantic.fields import Field
 
-from app.schemas.auth import InlineUser
-from app.schemas.classes import Class
+from app.schemas.auth import InlineUser, SparseUser
+from app.schemas.classes import Class, SparseClass
 
 
 class CreateStudentPayload(BaseModel):
@@ -18,6 +18,8 @@ class UpdateStudentPayload(BaseModel):
 
 
 class Student(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     id: UUID
     created_at: datetime
     updated_at: datetime
@@ -27,3 +29,17 @@ class Student(BaseModel):
 
 class StudentsList(BaseModel):
     data: list[Student]
+
+
+class SparseStudent(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    user: SparseUser | None = None
+    class_: SparseClass | None = Field(None, alias="class")
+
+
+class SparseStudentsList(BaseModel):
+    data: list[SparseStudent]
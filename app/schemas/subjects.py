@@ -14,5 +14,12 @@ class Subject(CreateSubjectPayload):
     updated_at: datetime
 
 
+class SparseSubject(BaseModel):
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    name: str | None = None
+
+
 class SubjectsList(BaseModel):
     data: list[Subject]
@@ -4,9 +4,9 @@ from uuid import UUID
 from pydantic import BaseModel
 from pydantic.fields import Field
 
-from app.schemas.auth import InlineUser
-from app.schemas.classes import Class
-from app.schemas.subjects import Subject
+from app.schemas.auth import InlineUser, SparseUser
+from app.schemas.classes import Class, SparseClass
+from app.schemas.subjects import SparseSubject, Subject
 
 
 class CreateTeacherPayload(BaseModel):
@@ -31,3 +31,16 @@ class Teacher(BaseModel):
 
 class TeachersList(BaseModel):
     data: list[Teacher]
+
+
+class SparseTeacher(BaseModel):
+    id: UUID
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    user: SparseUser | None = None
+    classes: list[SparseClass] | None = None
+    subjects: list[SparseSubject] | None = None
+
+
+class SparseTeachersList(BaseModel):
+    data: list[SparseTeacher]
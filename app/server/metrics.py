@@ -0,0 +1,32 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.dependencies.metrics import render
+
+router = APIRouter()
+
+
+def check_metrics_token(authorization: str | None = Header(None)) -> None:
+    """Scrapers must send `METRICS_TOKEN` as a Bearer token; unset, /metrics is off."""
+    if settings.METRICS_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN.get_secret_value()}".encode()
+    if authorization is None or not hmac.compare_digest(authorization.encode(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    response_class=PlainTextResponse,
+    dependencies=[Depends(check_metrics_token)],
+)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -2,7 +2,6 @@ import base64
 import hashlib
 import secrets
 
-import httpx
 from edgedb import AsyncIOClient
 from fastapi import (
     APIRouter,
@@ -23,14 +22,12 @@ from app.dependencies.db_queries.create_parent_with_identity_async_edgeql import
 from app.dependencies.db_queries.get_email_from_current_identity_async_edgeql import (
     get_email_from_current_identity,
 )
+from app.site.auth_client import auth_client
 
 SERVER_PORT = 3000
 
 router = APIRouter()
 
-auth_client = httpx.AsyncClient(base_url=settings.EDGEDB_AUTH_BASE_URL)
-
-
 def base64url_encode(data):
     return base64.urlsafe_b64encode(data).rstrip(b"=").decode("utf-8")
 
@@ -134,7 +131,9 @@ async def handle_sign_in(
 
     code = authenticate_response.json().get("code")
     token_response = await auth_client.get(
-        "/token", params={"code": code, "verifier": pkce["verifier"]}
+        "/token",
+        params={"code": code, "verifier": pkce["verifier"]},
+        idempotent=True,
     )
     if token_response.status_code != 200:
         raise HTTPException(
@@ -181,6 +180,7 @@ async def handle_verify(
     token_response = await auth_client.get(
         "/token",
         params={"code": code, "verifier": edgedb_pkce_verifier},
+        idempotent=True,
     )
 
     if token_response.status_code != 200:
@@ -240,7 +240,9 @@ async def handle_callback(
         )
 
     code_exchange_response = await auth_client.get(
-        "/token", params={"code": code, "verifier": edgedb_pkce_verifier}
+        "/token",
+        params={"code": code, "verifier": edgedb_pkce_verifier},
+        idempotent=True,
     )
 
     if code_exchange_response.status_code != 200:
@@ -345,7 +347,9 @@ async def handle_reset_password(
 
     code = reset_response.json().get("code")
     token_response = await auth_client.get(
-        "/token", params={"code": code, "verifier": edgedb_pkce_verifier}
+        "/token",
+        params={"code": code, "verifier": edgedb_pkce_verifier},
+        idempotent=True,
     )
     if token_response.status_code != 200:
         raise HTTPException(
@@ -0,0 +1,135 @@
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.dependencies.metrics import histogram
+
+# Failures where the request never reached the auth server, so resending
+# it is safe even for calls that consume a code or token.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRY_STATUS_CODES = {502, 503, 504}
+
+
+def auth_server_unavailable(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Auth server is unavailable",
+        headers={"Retry-After": str(int(retry_after))},
+    )
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and lets one trial call
+    through every `reset_timeout` seconds until a call succeeds again."""
+
+    def __init__(self, threshold: int, reset_timeout: float, timer=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.timer = timer
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.timer() - self.opened_at >= self.reset_timeout:
+            # Half-open: this caller is the trial, the rest keep failing fast.
+            self.opened_at = self.timer()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = self.timer()
+
+
+class AuthExtensionClient:
+    """HTTP client for the EdgeDB auth extension.
+
+    Connections are pooled and kept alive, every call has a timeout, calls
+    are retried with jittered backoff and a circuit breaker answers 503
+    right away while the auth server is down. Pass `transport` to run it
+    against a stub server.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        retries: int,
+        breaker: CircuitBreaker,
+        backoff: float = 0.1,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport)
+        self.retries = retries
+        self.breaker = breaker
+        self.backoff = backoff
+
+    async def request(self, method: str, endpoint: str, *, idempotent: bool = False, **kwargs) -> httpx.Response:
+        """Send one call, retrying connect failures always and, for
+        `idempotent` calls, also read failures and 502/503/504 answers."""
+        latency = histogram(
+            "edgedb_auth_request_seconds", "Auth extension call latency", endpoint=endpoint
+        )
+        # The breaker sees logical calls: one check before the first attempt
+        # and one failure once the retries are used up.
+        if not self.breaker.allow():
+            raise auth_server_unavailable(self.breaker.reset_timeout)
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            started = time.perf_counter()
+            try:
+                response = await self.http.request(method, endpoint, **kwargs)
+            except httpx.TransportError as e:
+                latency.observe(time.perf_counter() - started)
+                if last_attempt or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                    self.breaker.record_failure()
+                    raise auth_server_unavailable(self.breaker.reset_timeout) from e
+            else:
+                latency.observe(time.perf_counter() - started)
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                if last_attempt or not idempotent or response.status_code not in RETRY_STATUS_CODES:
+                    self.breaker.record_failure()
+                    return response
+            await asyncio.sleep(self.backoff * 2**attempt * random.uniform(0.5, 1.5))  # noqa: S311
+        raise AssertionError("unreachable")
+
+    async def get(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+auth_client = AuthExtensionClient(
+    settings.EDGEDB_AUTH_BASE_URL,
+    timeout=httpx.Timeout(settings.EDGEDB_AUTH_TIMEOUT, connect=settings.EDGEDB_AUTH_CONNECT_TIMEOUT),
+    limits=httpx.Limits(
+        max_connections=settings.EDGEDB_AUTH_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.EDGEDB_AUTH_MAX_CONNECTIONS,
+        keepalive_expiry=30,
+    ),
+    retries=settings.EDGEDB_AUTH_RETRIES,
+    breaker=CircuitBreaker(settings.EDGEDB_AUTH_BREAKER_THRESHOLD, settings.EDGEDB_AUTH_BREAKER_RESET),
+)
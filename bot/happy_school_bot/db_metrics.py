@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import sys
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import edgedb
+from edgedb import abstract
+
+# A trimmed copy of app/dependencies/db_metrics.py, which is canonical: the
+# bot is packaged on its own and cannot import the app. Keep metric names
+# and buckets in step with it.
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class QueryStats:
+    """Latency and row histograms plus a retry count for one query name."""
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.rows = [0] * (len(ROW_BUCKETS) + 1)
+        self.rows_sum = 0
+        self.count = 0
+        self.retries = 0
+
+    def observe(self, elapsed: float, rows: int | None) -> None:
+        self.latency[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        self.latency_sum += elapsed
+        self.count += 1
+        if rows is not None:
+            self.rows[bisect_left(ROW_BUCKETS, rows)] += 1
+            self.rows_sum += rows
+
+
+stats: defaultdict[str, QueryStats] = defaultdict(QueryStats)
+
+
+class CountingRetryOptions:
+    def __init__(self, options, query_stats: QueryStats):
+        self.options = options
+        self.query_stats = query_stats
+
+    def get_rule_for_exception(self, exception):
+        rule = self.options.get_rule_for_exception(exception)
+
+        def backoff(attempt: int) -> float:
+            self.query_stats.retries += 1
+            return rule.backoff(attempt)
+
+        return rule._replace(backoff=backoff)
+
+
+class InstrumentedClient(edgedb.AsyncIOClient):
+    """`AsyncIOClient` timing every query under the name of the function
+    that ran it, i.e. the generated wrapper. Queries slower than
+    `slow_query_seconds` are logged with argument types, not values."""
+
+    __slots__ = ()
+
+    slow_query_seconds = 0.2
+
+    async def _query(self, query_context: abstract.QueryContext):
+        # Frames up: the public client method, then its caller.
+        query_stats = stats[sys._getframe(2).f_code.co_name]
+        if query_context.retry_options is not None:
+            query_context = query_context._replace(
+                retry_options=CountingRetryOptions(query_context.retry_options, query_stats)
+            )
+        started = time.perf_counter()
+        result = await super()._query(query_context)
+        elapsed = time.perf_counter() - started
+        rows = None if isinstance(result, str) else len(result) if isinstance(result, list) else int(result is not None)
+        query_stats.observe(elapsed, rows)
+        self.log_if_slow(elapsed, query_context.query)
+        return result
+
+    async def _execute(self, execute_context: abstract.ExecuteContext) -> None:
+        query_stats = stats[sys._getframe(2).f_code.co_name]
+        started = time.perf_counter()
+        await super()._execute(execute_context)
+        elapsed = time.perf_counter() - started
+        query_stats.observe(elapsed, None)
+        self.log_if_slow(elapsed, execute_context.query)
+
+    def log_if_slow(self, elapsed: float, query: abstract.QueryWithArgs) -> None:
+        if elapsed >= self.slow_query_seconds:
+            params = ", ".join(f"{key}: {type(value).__name__}" for key, value in query.kwargs.items())
+            logger.warning("Slow query took %.3fs, params (%s)\n%s", elapsed, params, query.query)
+
+
+def create_instrumented_client() -> InstrumentedClient:
+    return InstrumentedClient(connection_class=edgedb.asyncio_client.AsyncIOConnection, max_concurrency=None)
+
+
+def _histogram(name: str, query: str, buckets, counts, total) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), counts):
+        cumulative += count
+        le = bound if isinstance(bound, str) else float(bound)
+        lines.append(f'{name}_bucket{{query="{query}",le="{le}"}} {cumulative}')
+    lines.append(f'{name}_sum{{query="{query}"}} {total}')
+    lines.append(f'{name}_count{{query="{query}"}} {cumulative}')
+    return lines
+
+
+def render() -> str:
+    """The query stats in the Prometheus text exposition format."""
+    latency = ["# TYPE edgedb_query_seconds histogram"]
+    rows = ["# TYPE edgedb_query_rows histogram"]
+    retries = ["# TYPE edgedb_query_retries_total counter"]
+    for query, s in sorted(stats.items()):
+        latency += _histogram("edgedb_query_seconds", query, LATENCY_BUCKETS, s.latency, s.latency_sum)
+        rows += _histogram("edgedb_query_rows", query, ROW_BUCKETS, s.rows, s.rows_sum)
+        retries.append(f'edgedb_query_retries_total{{query="{query}"}} {s.retries}')
+    return "\n".join(latency + rows + retries) + "\n"
+
+
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int) -> asyncio.Server:
+    """Answer every HTTP request on `port` with the query stats, for Prometheus."""
+    return await asyncio.start_server(_serve_metrics, port=port)
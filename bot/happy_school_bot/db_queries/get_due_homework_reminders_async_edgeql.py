@@ -0,0 +1,78 @@
+# AUTOGENERATED FROM 'bot/happy_school_bot/db_queries/get_due_homework_reminders.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import dataclasses
+import datetime
+import edgedb
+import uuid
+
+
+class NoPydanticValidation:
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source_type, _handler):
+        # Pydantic 2.x
+        from pydantic_core.core_schema import any_schema
+        return any_schema()
+
+    @classmethod
+    def __get_validators__(cls):
+        # Pydantic 1.x
+        from pydantic.dataclasses import dataclass as pydantic_dataclass
+        pydantic_dataclass(cls)
+        cls.__pydantic_model__.__get_validators__ = lambda: []
+        return []
+
+
+@dataclasses.dataclass
+class GetDueHomeworkRemindersResult(NoPydanticValidation):
+    id: uuid.UUID
+    deadline: datetime.datetime
+    assignment: str
+    subject: GetDueHomeworkRemindersResultSubject
+    student: GetDueHomeworkRemindersResultStudent
+    tg_ids: list[int]
+
+
+@dataclasses.dataclass
+class GetDueHomeworkRemindersResultStudent(NoPydanticValidation):
+    first_name: str
+    last_name: str
+
+
+@dataclasses.dataclass
+class GetDueHomeworkRemindersResultSubject(NoPydanticValidation):
+    name: str
+
+
+async def get_due_homework_reminders(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    lead_time: datetime.timedelta,
+) -> list[GetDueHomeworkRemindersResult]:
+    return await executor.query(
+        """\
+        with
+            now := datetime_of_statement(),
+            due := (
+                select Homework
+                filter .deadline > now
+                    and .deadline <= now + <duration>$lead_time
+                    and not .done_by_student
+            ),
+        select due {
+            id,
+            deadline,
+            assignment,
+            subject: {name},
+            student := .assigned_to.user {first_name, last_name},
+            tg_ids := (
+                distinct {.assigned_to.user.tg_id, .assigned_to.parents.user.tg_id}
+                except .<homework[is HomeworkReminder].tg_id
+            ),
+        }
+        order by .deadline\
+        """,
+        lead_time=lead_time,
+    )
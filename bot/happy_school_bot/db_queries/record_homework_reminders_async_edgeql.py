@@ -0,0 +1,28 @@
+# AUTOGENERATED FROM 'bot/happy_school_bot/db_queries/record_homework_reminders.edgeql' WITH:
+#     $ edgedb-py
+
+
+from __future__ import annotations
+import edgedb
+import uuid
+
+
+async def record_homework_reminders(
+    executor: edgedb.AsyncIOExecutor,
+    *,
+    homework_ids: list[uuid.UUID],
+    tg_id: int,
+) -> None:
+    await executor.execute(
+        """\
+        for homework_id in array_unpack(<array<uuid>>$homework_ids) union (
+            insert HomeworkReminder {
+                homework := (select Homework filter .id = homework_id),
+                tg_id := <int64>$tg_id,
+            }
+            unless conflict
+        )\
+        """,
+        homework_ids=homework_ids,
+        tg_id=tg_id,
+    )
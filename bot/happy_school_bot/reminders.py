@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from happy_school_bot.db_queries.get_due_homework_reminders_async_edgeql import (
+    GetDueHomeworkRemindersResult,
+    get_due_homework_reminders,
+)
+from happy_school_bot.db_queries.record_homework_reminders_async_edgeql import (
+    record_homework_reminders,
+)
+from telethon.errors import (
+    FloodWaitError,
+    InputUserDeactivatedError,
+    PeerIdInvalidError,
+    UserDeactivatedError,
+    UserIsBlockedError,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = timedelta(minutes=10)
+DEFAULT_LEAD_TIME = timedelta(hours=24)
+# Telegram allows bots about 30 messages per second in total.
+DEFAULT_MESSAGES_PER_SECOND = 20
+# The recipient blocked the bot or is gone; resending will not help.
+PERMANENT_SEND_ERRORS = (
+    UserIsBlockedError,
+    InputUserDeactivatedError,
+    UserDeactivatedError,
+    PeerIdInvalidError,
+)
+
+
+class RateLimitedSender:
+    """Sends messages no faster than `messages_per_second`, waiting out FloodWait."""
+
+    def __init__(self, tg_client, messages_per_second: float = DEFAULT_MESSAGES_PER_SECOND):
+        self.tg_client = tg_client
+        self.interval = 1 / messages_per_second
+        self.next_send_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def send(self, tg_id: int, message: str):
+        async with self.lock:
+            delay = self.next_send_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.tg_client.send_message(tg_id, message)
+            except FloodWaitError as e:
+                await asyncio.sleep(e.seconds)
+                await self.tg_client.send_message(tg_id, message)
+            self.next_send_at = time.monotonic() + self.interval
+
+
+def group_by_recipient(
+    homeworks: list[GetDueHomeworkRemindersResult],
+) -> dict[int, list[GetDueHomeworkRemindersResult]]:
+    digests = defaultdict(list)
+    for homework in homeworks:
+        for tg_id in homework.tg_ids:
+            digests[tg_id].append(homework)
+    return digests
+
+
+def render_digest(homeworks: list[GetDueHomeworkRemindersResult]) -> str:
+    lines = ["Скоро сдавать домашние задания:"]
+    for homework in homeworks:
+        lines.append(
+            f"• {homework.deadline.strftime('%d-%m-%Y %H:%M')} "
+            f"{homework.subject.name} ({homework.student.first_name}): {homework.assignment}"
+        )
+    return "\n".join(lines)
+
+
+async def send_homework_reminders(db_client, sender: RateLimitedSender, lead_time: timedelta) -> int:
+    """One tick: a digest per recipient for homework due within `lead_time`.
+
+    Every delivered digest is recorded as HomeworkReminder rows before the
+    next one is sent, so a restart only resends at most the digest that
+    was in flight. A digest that can never be delivered, e.g. because the
+    recipient blocked the bot, is recorded too, so it is not retried on
+    every tick; other failures are retried on the next tick.
+    """
+    homeworks = await get_due_homework_reminders(db_client, lead_time=lead_time)
+    sent = 0
+    for tg_id, digest in group_by_recipient(homeworks).items():
+        try:
+            await sender.send(tg_id, render_digest(digest))
+        except PERMANENT_SEND_ERRORS as e:
+            logger.warning("Giving up on homework reminder to %s: %s", tg_id, e)
+        except Exception:
+            logger.exception("Failed to send homework reminder to %s", tg_id)
+            continue
+        else:
+            sent += 1
+        await record_homework_reminders(db_client, homework_ids=[i.id for i in digest], tg_id=tg_id)
+    return sent
+
+
+async def run_homework_reminders(
+    db_client,
+    tg_client,
+    interval: timedelta = DEFAULT_INTERVAL,
+    lead_time: timedelta = DEFAULT_LEAD_TIME,
+):
+    sender = RateLimitedSender(tg_client)
+    while True:
+        try:
+            sent = await send_homework_reminders(db_client, sender, lead_time)
+            logger.info("Sent %s homework reminders", sent)
+        except Exception:
+            logger.exception("Homework reminders tick failed")
+        await asyncio.sleep(interval.total_seconds())
@@ -1,11 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import AsyncIterator
 from uuid import UUID
 import os
 
-import edgedb
 import orjson
+from happy_school_bot.db_metrics import create_instrumented_client, start_metrics_server
 from happy_school_bot.db_queries.check_child_async_edgeql import check_child
 from happy_school_bot.db_queries.get_qr_code_by_id_async_edgeql import (
     GetQrCodeByIdResult,
@@ -14,14 +14,19 @@ from happy_school_bot.db_queries.get_qr_code_by_id_async_edgeql import (
 from happy_school_bot.db_queries.get_user_by_tg_id_async_edgeql import (
     get_user_by_tg_id,
 )
+from happy_school_bot.reminders import run_homework_reminders
 from happy_school_bot.scenarios.admin import admin_handler
 from happy_school_bot.scenarios.parent import parent_handler
 from telethon import Button, TelegramClient, events
 
-db_client = edgedb.asyncio_client.create_async_client()
+# The bot checks who may see what itself, from the Telegram chat.
+db_client = create_instrumented_client().with_config(apply_access_policies=False)
 
 API_ID = os.environ.get("API_ID")
 API_HASH = os.environ.get("API_HASH")
+REMINDER_INTERVAL_MINUTES = int(os.environ.get("REMINDER_INTERVAL_MINUTES", 10))
+REMINDER_LEAD_HOURS = int(os.environ.get("REMINDER_LEAD_HOURS", 24))
+METRICS_PORT = os.environ.get("METRICS_PORT")
 
 client = TelegramClient("anon", API_ID, API_HASH)
 
@@ -138,4 +143,14 @@ async def inline_handler(event):
 
 
 client.start()
+client.loop.create_task(
+    run_homework_reminders(
+        db_client,
+        client,
+        interval=timedelta(minutes=REMINDER_INTERVAL_MINUTES),
+        lead_time=timedelta(hours=REMINDER_LEAD_HOURS),
+    )
+)
+if METRICS_PORT:
+    client.loop.run_until_complete(start_metrics_server(int(METRICS_PORT)))
 client.run_until_disconnected()
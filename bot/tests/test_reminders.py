@@ -0,0 +1,114 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from happy_school_bot.db_queries.get_due_homework_reminders_async_edgeql import (
+    GetDueHomeworkRemindersResult,
+    GetDueHomeworkRemindersResultStudent,
+    GetDueHomeworkRemindersResultSubject,
+)
+from happy_school_bot.reminders import (
+    RateLimitedSender,
+    group_by_recipient,
+    render_digest,
+    send_homework_reminders,
+)
+from telethon.errors import FloodWaitError, UserIsBlockedError
+
+STUDENT_TG_ID = 1
+PARENT_TG_ID = 2
+BLOCKED_TG_ID = 3
+
+
+def make_homework(assignment: str, tg_ids: list[int]) -> GetDueHomeworkRemindersResult:
+    return GetDueHomeworkRemindersResult(
+        id=uuid.uuid4(),
+        deadline=datetime(2024, 5, 17, 9, 30),
+        assignment=assignment,
+        subject=GetDueHomeworkRemindersResultSubject(name="Math"),
+        student=GetDueHomeworkRemindersResultStudent(first_name="Anna", last_name="Ivanova"),
+        tg_ids=tg_ids,
+    )
+
+
+class FakeDb:
+    """Returns `homeworks` as due and records what would be inserted."""
+
+    def __init__(self, homeworks):
+        self.homeworks = homeworks
+        self.recorded: dict[int, list[uuid.UUID]] = {}
+
+    async def query(self, query, **kwargs):
+        return self.homeworks
+
+    async def execute(self, query, *, homework_ids, tg_id):
+        self.recorded[tg_id] = homework_ids
+
+
+class FakeSender:
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.sent: dict[int, str] = {}
+
+    async def send(self, tg_id: int, message: str):
+        if tg_id in self.failures:
+            raise self.failures[tg_id]
+        self.sent[tg_id] = message
+
+
+def test_group_by_recipient():
+    first = make_homework("Page 10", [STUDENT_TG_ID, PARENT_TG_ID])
+    second = make_homework("Page 11", [PARENT_TG_ID])
+
+    assert group_by_recipient([first, second]) == {
+        STUDENT_TG_ID: [first],
+        PARENT_TG_ID: [first, second],
+    }
+
+
+def test_render_digest():
+    digest = render_digest([make_homework("Page 10", [STUDENT_TG_ID])])
+
+    assert digest.splitlines() == [
+        "Скоро сдавать домашние задания:",
+        "• 17-05-2024 09:30 Math (Anna): Page 10",
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_send_homework_reminders_records_each_digest():
+    first = make_homework("Page 10", [STUDENT_TG_ID, PARENT_TG_ID])
+    second = make_homework("Page 11", [PARENT_TG_ID])
+    db = FakeDb([first, second])
+    sender = FakeSender()
+
+    sent = await send_homework_reminders(db, sender, timedelta(hours=24))
+
+    assert sent == 2
+    assert "Page 11" in sender.sent[PARENT_TG_ID]
+    assert db.recorded == {STUDENT_TG_ID: [first.id], PARENT_TG_ID: [first.id, second.id]}
+
+
+@pytest.mark.asyncio()
+async def test_send_homework_reminders_gives_up_on_blocked_recipients():
+    homework = make_homework("Page 10", [STUDENT_TG_ID, PARENT_TG_ID, BLOCKED_TG_ID])
+    db = FakeDb([homework])
+    sender = FakeSender({BLOCKED_TG_ID: UserIsBlockedError(request=None), PARENT_TG_ID: ConnectionError()})
+
+    sent = await send_homework_reminders(db, sender, timedelta(hours=24))
+
+    assert sent == 1
+    # Blocked: recorded so the next tick skips it. Transient: retried next tick.
+    assert db.recorded == {STUDENT_TG_ID: [homework.id], BLOCKED_TG_ID: [homework.id]}
+
+
+@pytest.mark.asyncio()
+async def test_rate_limited_sender_waits_out_flood_wait(mocker):
+    sleep = mocker.patch("happy_school_bot.reminders.asyncio.sleep")
+    tg_client = mocker.AsyncMock()
+    tg_client.send_message.side_effect = [FloodWaitError(request=None, capture=7), None]
+
+    await RateLimitedSender(tg_client).send(STUDENT_TG_ID, "hi")
+
+    sleep.assert_awaited_once_with(7)
+    assert tg_client.send_message.await_count == 2
@@ -1,8 +1,10 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.v1.assignments.routes import router as assignments_router
 from app.api.v1.auth.auth import router as auth_router
 from app.api.v1.classes.classes import router as classes_router
 from app.api.v1.homeworks.routes import router as homeworkes_router
@@ -11,21 +13,51 @@ from app.api.v1.students.students import router as students_router
 from app.api.v1.subjects.subjects import router as subjects_router
 from app.api.v1.teachers.teachers import router as teacheres_router
 from app.config import settings
+from app.dependencies.db import client as db_client
+from app.dependencies.db import system_client
+from app.dependencies.db_metrics import QueryCountMiddleware
+from app.dependencies.rate_limit import (
+    RateLimitMiddleware,
+    login_limits,
+    make_bucket_store,
+)
 from app.dependencies.tg import client
+from app.dependencies.tg_resolver import run_tg_resolver
+from app.dependencies.warmup import warm_up_queries
+from app.server.metrics import router as metrics_router
 from app.site.auth import router as site_auth_router
+from app.site.auth_client import auth_client
 from app.site.main import router as site_main_router
 
-app = FastAPI()
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # noqa: ARG001
     await client.connect()
     await client.sign_in(bot_token=settings.BOT_TOKEN)
+    tg_resolver = asyncio.create_task(run_tg_resolver(system_client, client))
+    # With the policy-applying client, as its compiled queries differ.
+    await warm_up_queries(db_client)
     yield
+    tg_resolver.cancel()
+    with suppress(asyncio.CancelledError):
+        await tg_resolver
+    await auth_client.aclose()
     client.disconnect()
 
 
+app = FastAPI(lifespan=lifespan)
+
+# Before CORS, so that 429 answers get CORS headers too.
+app.add_middleware(
+    RateLimitMiddleware,
+    routes={
+        "/auth/signin": login_limits(),
+        "/auth/signup": login_limits(),
+        "/api/v1/token": login_limits(email_field="username"),
+    },
+    store=make_bucket_store(),
+)
+
 # Set all CORS enabled origins.
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +67,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so it counts the queries of every dependency and middleware.
+app.add_middleware(QueryCountMiddleware)
+
 
 app.include_router(auth_router, prefix="/api/v1", tags=["auth"])
 app.include_router(classes_router, prefix="/api/v1/classes", tags=["Classes"])
@@ -51,5 +86,9 @@ app.include_router(
 app.include_router(
     homeworkes_router, prefix="/api/v1/homeworks", tags=["Homework"]
 )
+app.include_router(
+    assignments_router, prefix="/api/v1/assignments", tags=["Assignments"]
+)
 app.include_router(site_auth_router, tags=["Site"])
 app.include_router(site_main_router, tags=["Site"])
+app.include_router(metrics_router)
@@ -0,0 +1,265 @@
+"""Which filters of our queries are backed by an index, and what `analyze` says.
+
+Every query the app and the bot send is collected: the .edgeql files
+under app/ and bot/, the queries the routers build at runtime (see
+`register_query`), plus the globals and access policies of the schema,
+which EdgeDB adds to the queries themselves. For each `filter` and
+`order by` of a type the first path step is checked against
+dbschema/default.esdl:
+
+- `id`, links and properties with an exclusive constraint are indexed
+  by EdgeDB itself;
+- other properties need an `index on`, ideally as its first element;
+  later elements only help after a filter on the ones before;
+- computed properties can't be indexed, so such a filter is a scan,
+  and bool flags are too coarse for an index to pay off.
+
+Missing indexes are printed as `index on` lines to paste into the
+schema, and `--check` exits with 1 when there are any, for CI:
+
+    python -m scripts.audit_indexes --check
+
+With `--analyze`, every query is also run through EdgeDB's `analyze`,
+with placeholder arguments, inside a transaction that is rolled back,
+and its cost and sequential scans are listed. Point the EDGEDB_*
+variables at a seeded database, e.g. a staging snapshot; on near-empty
+tables Postgres prefers scans whatever the indexes.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from app.dependencies.schema import FIRST_STEP, SCHEMA, TypeInfo, parse_schema, strip_comments
+
+ROOT = Path(__file__).parent.parent
+QUERY_DIRS = (ROOT / "app", ROOT / "bot")
+
+STATEMENT = re.compile(r"\b(?:select|update|delete)\s+(?:detached\s+)?(?:default::)?(?P<type>[A-Z]\w*)\b")
+CLAUSE = re.compile(r"\b(filter|order\s+by|limit|offset|set|unless)\b|[{}()\[\];,]")
+# `exists .x` only tests for an empty set; an index rarely serves that.
+EXISTS_TEST = re.compile(r"\bexists\s+\.\w+")
+NESTED_QUERY = re.compile(r"\(\s*(?:select|with|update|insert|delete)\b[^()]*\)")
+
+
+def clause_paths(text: str, start: int) -> list[tuple[str, str]]:
+    """`(clause, first step)` of the filter/order by clauses of the statement at `start`."""
+    depth = 0
+    clause = None
+    clause_start = start
+    found = []
+
+    def close(end: int) -> None:
+        if clause:
+            body = text[clause_start:end]
+            while (stripped := NESTED_QUERY.sub("()", body)) != body:
+                body = stripped
+            body = EXISTS_TEST.sub("", body)
+            found.extend((clause, step) for step in FIRST_STEP.findall(body))
+
+    for token in CLAUSE.finditer(text, start):
+        word = token.group()
+        if word in "{([":
+            depth += 1
+        elif word in "})]":
+            depth -= 1
+            if depth < 0:
+                close(token.start())
+                return found
+        elif depth == 0 and (word in ";," or token.group(1)):
+            close(token.start())
+            if word in ";,":
+                return found
+            clause = word.split()[0] if word.split()[0] in ("filter", "order") else None
+            clause_start = token.end()
+    close(len(text))
+    return found
+
+
+def filtered_fields(query: str) -> set[tuple[str, str, str]]:
+    """`(type, first step, clause)` for every filter and order by in `query`."""
+    query = strip_comments(query)
+    return {
+        (statement["type"], step, clause)
+        for statement in STATEMENT.finditer(query)
+        for clause, step in clause_paths(query, statement.end())
+    }
+
+
+def verdict(info: TypeInfo | None, name: str) -> str | None:
+    if info is None:
+        return None
+    if name == "id":
+        return "primary key"
+    if name in info.computed:
+        return "computed, always scanned"
+    if name in info.links:
+        return "link, indexed by EdgeDB"
+    if name in info.indexed:
+        return "indexed"
+    if name in info.index_tails:
+        return f"indexed after .{info.index_tails[name]}"
+    if name in info.flags:
+        return "bool, too few values for an index to help"
+    if name in info.properties:
+        return "MISSING"
+    return None
+
+
+def collect_queries() -> dict[str, str]:
+    import run  # noqa: F401, registers the runtime-built router queries
+    from app.dependencies.warmup import registered_queries
+
+    queries = {
+        str(path.relative_to(ROOT)): path.read_text() for base in QUERY_DIRS for path in sorted(base.rglob("*.edgeql"))
+    }
+    for i, (query, _, _) in enumerate(registered_queries, 1):
+        queries[f"runtime #{i}: {' '.join(query.split())[:60]}"] = query
+    return queries
+
+
+def audit(queries: dict[str, str], types: dict[str, TypeInfo], schema_text: str) -> dict[tuple[str, str], set[str]]:
+    """`(type, field)` -> names of the queries filtering or ordering on it."""
+    used: dict[tuple[str, str], set[str]] = defaultdict(set)
+    for name, query in {**queries, "schema globals": schema_text}.items():
+        for type_name, step, _ in filtered_fields(query):
+            used[(type_name, step)].add(name)
+    for type_name, info in types.items():
+        for policy in info.policy_filters:
+            for step in FIRST_STEP.findall(policy.split("using", 1)[-1]):
+                used[(type_name, step)].add(f"access policy of {type_name}")
+    return used
+
+
+def placeholder(type_desc, cardinality=None):
+    from edgedb import describe, enums
+
+    if cardinality == enums.Cardinality.AT_MOST_ONE:
+        return None
+    if isinstance(type_desc, describe.ArrayType):
+        return []
+    if isinstance(type_desc, describe.EnumType):
+        return type_desc.members[0]
+    if isinstance(type_desc, describe.ScalarType):
+        type_desc = type_desc.base_type
+    return {
+        "std::uuid": uuid.uuid4(),
+        "std::str": "",
+        "std::bool": False,
+        "std::json": "null",
+        "std::datetime": datetime.now(timezone.utc),
+        "std::duration": timedelta(0),
+        "std::decimal": Decimal(0),
+        "std::float32": 0.0,
+        "std::float64": 0.0,
+        "cal::local_date": date.today(),
+        "cal::local_datetime": datetime.now(),
+    }.get(type_desc.name, 0)
+
+
+def plan_nodes(plan) -> list[dict]:
+    if isinstance(plan, dict):
+        return [plan, *(node for value in plan.values() for node in plan_nodes(value))]
+    if isinstance(plan, list):
+        return [node for value in plan for node in plan_nodes(value)]
+    return []
+
+
+# The plan format differs between server versions, so try the known spellings.
+COST_KEYS = ("Total Cost", "total_cost", "cost")
+
+
+def node_value(node: dict, *keys: str):
+    return next((node[key] for key in keys if key in node), None)
+
+
+class Rollback(Exception):  # noqa: N818
+    pass
+
+
+async def analyze(queries: dict[str, str]) -> None:
+    import edgedb
+
+    from app.dependencies.db import client
+
+    for name, query in queries.items():
+        try:
+            described = await client._describe_query(query)  # noqa: SLF001
+            elements = getattr(described.input_type, "elements", {})
+            args = {key: placeholder(e.type, e.cardinality) for key, e in elements.items()}
+            plan = None
+            async for tx in client.transaction():
+                try:
+                    async with tx:
+                        plan = await tx.query_single(f"analyze {query}", **args)
+                        raise Rollback
+                except Rollback:
+                    pass
+        except edgedb.ClientConnectionError as e:
+            print(f"EdgeDB is unreachable: {e}")  # noqa: T201
+            return
+        except Exception as e:  # noqa: BLE001
+            print(f"{name}\n    could not analyze: {e!r}")  # noqa: T201
+            continue
+        nodes = plan_nodes(json.loads(plan) if isinstance(plan, str) else plan)
+        costs = [node_value(node, *COST_KEYS) for node in nodes]
+        print(f"{name}\n    cost {max((c for c in costs if isinstance(c, int | float)), default=0):.1f}")  # noqa: T201
+        for node, cost in zip(nodes, costs, strict=True):
+            kind = str(node_value(node, "Node Type", "node_type", "plan_type") or "")
+            if "seq" in kind.lower():
+                relation = node_value(node, "Relation Name", "relation_name", "original_relation_name")
+                print(f"    {kind} on {relation} cost {cost}")  # noqa: T201
+
+
+def report(used: dict[tuple[str, str], set[str]], types: dict[str, TypeInfo], verbose: bool) -> dict[str, list[str]]:
+    """Print the verdict for every field and return the unindexed ones by type."""
+    missing: dict[str, list[str]] = defaultdict(list)
+    for (type_name, name), users in sorted(used.items()):
+        result = verdict(types.get(type_name), name)
+        if result is None:
+            continue
+        print(f"{type_name + '.' + name:<32} {result}")  # noqa: T201
+        if verbose:
+            for user in sorted(users):
+                print(f"    {user}")  # noqa: T201
+        if result == "MISSING":
+            missing[type_name].append(name)
+    return missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="exit with 1 if an index is missing")
+    parser.add_argument("--analyze", action="store_true", help="also run `analyze` on every query")
+    parser.add_argument("--verbose", action="store_true", help="list the queries behind each field")
+    args = parser.parse_args()
+
+    schema_text = SCHEMA.read_text()
+    types = parse_schema(schema_text)
+    queries = collect_queries()
+    used = audit(queries, types, schema_text)
+
+    print(f"{len(queries)} queries, {len(used)} filtered or ordered fields\n")  # noqa: T201
+    missing = report(used, types, verbose=args.verbose)
+    if missing:
+        print("\nProposed for dbschema/default.esdl:")  # noqa: T201
+        for type_name, names in sorted(missing.items()):
+            print(f"    type {type_name}:")  # noqa: T201
+            for name in names:
+                print(f"        index on (.{name});")  # noqa: T201
+    if args.analyze:
+        print()  # noqa: T201
+        asyncio.run(analyze(queries))
+    if args.check and missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
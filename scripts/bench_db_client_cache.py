@@ -0,0 +1,78 @@
+"""Per-request cost of deriving the EdgeDB client in `get_db`, with and without the cache.
+
+Every cookie-authenticated request used to call `client.with_globals()`,
+building new option objects and a client facade. `TokenClientCache`
+hands back the facade built for the same token earlier instead.
+
+This replays `--seconds` of traffic at `--rps` requests per second from
+`--users` signed-in users (JWT tokens with an `exp`) through both
+variants and reports time and allocations per request, the share of one
+core spent on it at that rate, and whether every derived client still
+uses the one connection pool. No database is needed, deriving a client
+does not connect:
+
+    python scripts/bench_db_client_cache.py --rps 1000 --users 200
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from jose import jwt
+
+from app.dependencies.db import TokenClientCache, client
+
+
+def make_tokens(users: int) -> list[str]:
+    exp = int(time.time()) + 3600
+    return [jwt.encode({"sub": str(i), "exp": exp}, "bench-secret") for i in range(users)]
+
+
+def uncached(token: str):
+    return client.with_globals({"auth::client_token": token})
+
+
+def run(variant: str, get_client, requests: list[str], rps: int) -> None:
+    started = time.perf_counter()
+    derived = [get_client(token) for token in requests]
+    elapsed = time.perf_counter() - started
+
+    # Kept alive so that what one request allocates shows up as traced memory.
+    kept = [None] * rps
+    tracemalloc.start()
+    for i, token in enumerate(requests[:rps]):
+        kept[i] = get_client(token)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_request = elapsed / len(requests)
+    shared_pool = all(d._impl is client._impl for d in derived)  # noqa: SLF001
+    print(  # noqa: T201
+        f"{variant:<9}{per_request * 1e6:>9.2f}{per_request * rps * 100:>12.3f}"
+        f"{allocated / rps:>12.0f}{len({id(d) for d in derived}):>10}{shared_pool!s:>8}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=int, default=1000)
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument("--users", type=int, default=200, help="distinct session tokens")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.users)
+    rnd = random.Random(args.seed)
+    requests = [rnd.choice(tokens) for _ in range(args.rps * args.seconds)]
+    cache = TokenClientCache(client, maxsize=args.cache_size)
+
+    print(f"{len(requests)} requests at {args.rps} rps from {args.users} users")  # noqa: T201
+    print(f"{'variant':<9}{'us/req':>9}{'% of core':>12}{'bytes/req':>12}{'clients':>10}{'pool':>8}")  # noqa: T201
+    run("uncached", uncached, requests, args.rps)
+    run("cached", cache.get, requests, args.rps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Event-loop latency during a burst of logins, inline bcrypt vs the pool.
+
+A ticker coroutine asks to wake up every `--tick` ms while `--logins`
+concurrent password hashes run. How late each tick fires is how long
+every other request on the worker would have stalled:
+
+    python scripts/bench_password_hashing.py --logins 50 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.dependencies.hashing import PasswordHasher
+
+
+async def measure_lag(stop: asyncio.Event, tick: float) -> list[float]:
+    lags = []
+    while not stop.is_set():
+        expected = time.perf_counter() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, time.perf_counter() - expected))
+    return lags
+
+
+async def run(variant: str, context: CryptContext, args) -> None:
+    hasher = PasswordHasher(context, workers=args.workers, max_queue=args.max_queue)
+    rejected = 0
+
+    async def login(i: int):
+        nonlocal rejected
+        if variant == "inline":
+            context.hash(f"password-{i}")
+            return
+        try:
+            await hasher.hash(f"password-{i}")
+        except HTTPException:
+            rejected += 1
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop, args.tick / 1000))
+    await asyncio.sleep(args.tick / 1000)
+    started = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lags = sorted(await ticker)
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(  # noqa: T201
+        f"{variant:<8}{elapsed:>9.2f}s{statistics.median(lags) * 1000:>11.1f}"
+        f"{p99 * 1000:>11.1f}{lags[-1] * 1000:>11.1f}{rejected:>10}"
+    )
+    hasher.executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=100)
+    parser.add_argument("--tick", type=float, default=10, help="ticker interval, ms")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    print(f"{args.logins} concurrent logins, {args.workers} workers, bcrypt rounds {args.rounds}")  # noqa: T201
+    print(f"{'variant':<8}{'total':>10}{'lag p50 ms':>11}{'p99 ms':>11}{'max ms':>11}{'rejected':>10}")  # noqa: T201
+    for variant in ("inline", "pool"):
+        asyncio.run(run(variant, context, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""PATCH /homeworks/{id} and PATCH /teachers/{id} latency against EdgeDB, before and after.
+
+The old handlers concatenated one `set` clause per non-empty payload
+field, so EdgeDB saw up to 2^n distinct query texts per endpoint, each
+compiled on first use. The handlers now send one fixed text through the
+generated `update_homework`/`update_teacher` wrappers.
+
+This creates a teacher, a student and `--homeworks` homeworks in the
+configured instance (the usual EDGEDB_* environment or linked project),
+replays the same random mix of PATCH payloads through the old query
+texts and the new wrappers, and reports per-request latency for both,
+split into the first use of each text and the rest. The objects it
+created are deleted afterwards:
+
+    python -m scripts.bench_patch_query_cache --requests 2000 --concurrency 10
+
+Run it against a freshly started instance, or use `--rounds` and look at
+the later rounds, since the server keeps compiled queries between runs.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from itertools import combinations
+
+import edgedb
+
+from app.api.v1.homeworks.db_queries.update_homework_async_edgeql import update_homework
+from app.api.v1.teachers.db_queries.update_teacher_async_edgeql import update_teacher
+from app.dependencies.fieldsets import HOMEWORK_FIELDSET, TEACHER_FIELDSET, full_shape
+
+HOMEWORK_FIELDS = ("grade", "done_by_student", "assignment")
+TEACHER_FIELDS = ("class_ids", "subject_ids")
+
+Payload = tuple[str, dict]
+
+
+def legacy_homework_query(payload: dict) -> str:
+    # Homework is a view of its Submission and Assignment, so the old
+    # per-field `set` clauses are replayed against those.
+    set_clauses = []
+    if payload.get("grade") is not None:
+        set_clauses.append("grade := <optional int32>$grade")
+    if payload.get("done_by_student") is not None:
+        set_clauses.append("done_by_student := <optional bool>$done_by_student")
+    bindings = ["homework := (select Homework filter .id = <uuid>$homework_id)"]
+    if set_clauses:
+        bindings.append(
+            "updated_submission := (update Submission filter .id = homework.submission.id"  # noqa: S608
+            f" set {{ {', '.join(set_clauses)} }})"
+        )
+    if payload.get("assignment") is not None:
+        bindings.append(
+            "updated_assignment := (update Assignment filter .id = homework.submission.assignment.id"
+            " set { text := <optional str>$assignment })"
+        )
+    return f"with {', '.join(bindings)} select homework {full_shape(HOMEWORK_FIELDSET)}"
+
+
+def legacy_teacher_query(payload: dict) -> str:
+    set_clauses = []
+    if payload.get("class_ids") is not None:
+        set_clauses.append("classes := (select Class filter .id in array_unpack(<array<uuid>>$class_ids))")
+    if payload.get("subject_ids") is not None:
+        set_clauses.append("subjects := (select Subject filter .id in array_unpack(<array<uuid>>$subject_ids))")
+    target = "Teacher filter .id = <uuid>$teacher_id"
+    statement = f"update {target} set {{ {', '.join(set_clauses)} }}" if set_clauses else f"select {target}"  # noqa: S608
+    return f"with updated := ({statement}) select updated {full_shape(TEACHER_FIELDSET)}"
+
+
+async def legacy(db: edgedb.AsyncIOClient, endpoint: str, payload: dict) -> str:
+    query = legacy_homework_query(payload) if endpoint == "homework" else legacy_teacher_query(payload)
+    await db.query_single_json(query, **{k: v for k, v in payload.items() if v is not None})
+    return query
+
+
+async def fixed(db: edgedb.AsyncIOClient, endpoint: str, payload: dict) -> str:
+    if endpoint == "homework":
+        await update_homework(db, **payload)
+        return "update_homework"
+    await update_teacher(db, **payload)
+    return "update_teacher"
+
+
+async def create_fixtures(db: edgedb.AsyncIOClient, homeworks: int) -> edgedb.Object:
+    marker = f"bench-{uuid.uuid4()}"
+    return await db.query_single(
+        """
+        with
+            marker := <str>$marker,
+            subject := (insert Subject { name := marker }),
+            class_ := (insert Class { name := marker, year := 1 }),
+            teacher := (insert Teacher {
+                user := (insert User {
+                    first_name := 'Bench', last_name := 'Teacher',
+                    email := marker ++ '-teacher', status := 'active',
+                }),
+                classes := class_,
+                subjects := subject,
+            }),
+            student := (insert Student {
+                user := (insert User {
+                    first_name := 'Bench', last_name := 'Student',
+                    email := marker ++ '-student', status := 'active',
+                }),
+                class_ := class_,
+            }),
+            homeworks := (
+                for i in range_unpack(range(0, <int64>$homeworks)) union (
+                    insert Homework {
+                        submission := (insert Submission {
+                            assignment := (insert Assignment {
+                                text := marker ++ <str>i,
+                                teacher := teacher,
+                                subject := subject,
+                                deadline := datetime_current() + <duration>'168 hours',
+                            }),
+                            student := student,
+                        }),
+                    }
+                )
+            ),
+        select {
+            marker := marker,
+            teacher_id := teacher.id,
+            class_id := class_.id,
+            subject_id := subject.id,
+            homework_ids := array_agg(homeworks.id),
+        }
+        """,
+        marker=marker,
+        homeworks=homeworks,
+    )
+
+
+async def delete_fixtures(db: edgedb.AsyncIOClient, marker: str) -> None:
+    await db.execute(
+        """
+        delete Assignment filter .subject.name = <str>$marker;
+        delete User filter .email like <str>$marker ++ '-%';
+        delete Class filter .name = <str>$marker;
+        delete Subject filter .name = <str>$marker;
+        """,
+        marker=marker,
+    )
+
+
+def non_empty_subsets(fields: tuple[str, ...]) -> list[tuple[str, ...]]:
+    return [c for n in range(1, len(fields) + 1) for c in combinations(fields, n)]
+
+
+def workload(fixtures, requests: int, seed: int) -> list[Payload]:
+    rnd = random.Random(seed)
+    homework_fields = non_empty_subsets(HOMEWORK_FIELDS)
+    teacher_fields = non_empty_subsets(TEACHER_FIELDS)
+    values = {
+        "grade": lambda: rnd.randint(1, 5),
+        "done_by_student": lambda: rnd.random() < 0.5,
+        "assignment": lambda: f"{fixtures.marker} {rnd.random()}",
+        "class_ids": lambda: [fixtures.class_id],
+        "subject_ids": lambda: [fixtures.subject_id],
+    }
+    payloads = []
+    for _ in range(requests):
+        if rnd.random() < 0.8:
+            chosen = rnd.choice(homework_fields)
+            payload = {field: values[field]() if field in chosen else None for field in HOMEWORK_FIELDS}
+            payloads.append(("homework", {"homework_id": rnd.choice(fixtures.homework_ids), **payload}))
+        else:
+            chosen = rnd.choice(teacher_fields)
+            payload = {field: values[field]() if field in chosen else None for field in TEACHER_FIELDS}
+            payloads.append(("teacher", {"teacher_id": fixtures.teacher_id, **payload}))
+    return payloads
+
+
+async def replay(
+    db: edgedb.AsyncIOClient,
+    send: Callable[[edgedb.AsyncIOClient, str, dict], Awaitable[str]],
+    payloads: list[Payload],
+    concurrency: int,
+) -> tuple[list[float], list[float], int]:
+    """Latencies of the first use of each text, of the rest, and the number of texts."""
+    queue = list(reversed(payloads))
+    first, rest = [], []
+    texts = set()
+
+    async def worker() -> None:
+        while queue:
+            endpoint, payload = queue.pop()
+            started = time.perf_counter()
+            text = await send(db, endpoint, payload)
+            elapsed = time.perf_counter() - started
+            (rest if text in texts else first).append(elapsed)
+            texts.add(text)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return first, rest, len(texts)
+
+
+def summary(latencies: list[float]) -> str:
+    if not latencies:
+        return f"{0:>7}{'-':>10}{'-':>10}{'-':>10}"
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return (
+        f"{len(latencies):>7}{statistics.median(latencies) * 1e3:>10.2f}"
+        f"{p95 * 1e3:>10.2f}{statistics.fmean(latencies) * 1e3:>10.2f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--homeworks", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async with edgedb.create_async_client(max_concurrency=args.concurrency) as client:
+        db = client.with_config(apply_access_policies=False)
+        fixtures = await create_fixtures(db, args.homeworks)
+        try:
+            payloads = workload(fixtures, args.requests, args.seed)
+            print(f"{args.requests} PATCH requests, {args.concurrency} concurrent, times in ms")  # noqa: T201
+            print(  # noqa: T201
+                f"{'round':<6}{'variant':<8}{'texts':>6}"
+                f"{'first':>7}{'p50':>10}{'p95':>10}{'mean':>10}"
+                f"{'rest':>7}{'p50':>10}{'p95':>10}{'mean':>10}"
+            )
+            for round_ in range(1, args.rounds + 1):
+                for name, send in (("before", legacy), ("after", fixed)):
+                    first, rest, texts = await replay(db, send, payloads, args.concurrency)
+                    print(f"{round_:<6}{name:<8}{texts:>6}{summary(first)}{summary(rest)}")  # noqa: T201
+        finally:
+            await delete_fixtures(db, fixtures.marker)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+
+BASE_URL = "/assignments"
+
+
+@pytest_asyncio.fixture()
+async def assignment(teacher_client, create_subject, teacher, student, faker):
+    subject = await create_subject()
+    teacher_obj, _ = teacher
+    student_obj, _ = student
+    data = {
+        "teacher_id": teacher_obj["id"],
+        "class_ids": [student_obj["class"]["id"]],
+        "subject_id": subject["id"],
+        "text": faker.text(),
+        "deadline": (datetime.utcnow() + timedelta(days=1)).astimezone().isoformat(),
+    }
+    return (await teacher_client.post(BASE_URL, json=data)).json()
+
+
+@pytest.mark.asyncio()
+async def test_create_assignment_for_class(assignment, student):
+    student_obj, _ = student
+    assert assignment["submissions_count"] == 1
+    assert assignment["done_count"] == 0
+    assert [i["student"]["id"] for i in assignment["submissions"]] == [student_obj["id"]]
+
+
+@pytest.mark.asyncio()
+async def test_create_assignment_by_student(student_client, create_subject, teacher, student, faker):
+    subject = await create_subject()
+    teacher_obj, _ = teacher
+    student_obj, _ = student
+    data = {
+        "teacher_id": teacher_obj["id"],
+        "student_ids": [student_obj["id"]],
+        "subject_id": subject["id"],
+        "text": faker.text(),
+        "deadline": (datetime.utcnow() + timedelta(days=1)).astimezone().isoformat(),
+    }
+    res = await student_client.post(BASE_URL, json=data)
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio()
+async def test_get_assignments(teacher_client, assignment, student):
+    student_obj, _ = student
+    res = await teacher_client.get(BASE_URL, params={"class_id": student_obj["class"]["id"]})
+    assert res.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in res.json()["data"]] == [assignment["id"]]
+
+
+@pytest.mark.asyncio()
+async def test_update_assignment_text(teacher_client, assignment):
+    res = await teacher_client.patch(f"{BASE_URL}/{assignment['id']}", json={"text": "new text"})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["text"] == "new text"
+    assert res.json()["submissions_count"] == 1
+
+
+@pytest.mark.asyncio()
+async def test_update_submission(student_client, teacher_client, assignment):
+    submission_url = f"{BASE_URL}/{assignment['id']}/submissions/{assignment['submissions'][0]['id']}"
+
+    res = await student_client.patch(submission_url, json={"done_by_student": True})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["done_by_student"] is True
+
+    res = await student_client.patch(submission_url, json={"grade": 5})
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+    res = await teacher_client.patch(submission_url, json={"grade": 5})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["grade"] == 5
+
+    res = await student_client.get(f"{BASE_URL}/{assignment['id']}")
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["done_count"] == 1
+
+
+@pytest.mark.asyncio()
+async def test_update_submission_admin_grades(admin_client, assignment):
+    submission_url = f"{BASE_URL}/{assignment['id']}/submissions/{assignment['submissions'][0]['id']}"
+    res = await admin_client.patch(submission_url, json={"grade": 4})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["grade"] == 4
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import status
+
+
+@pytest.mark.asyncio()
+async def test_token_with_correct_password(client, create_user):
+    user, password = await create_user()
+    res = await client.post("/token", data={"username": user["email"], "password": password})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["access_token"]
+
+
+@pytest.mark.asyncio()
+async def test_token_with_wrong_password(client, create_user):
+    user, password = await create_user()
+    res = await client.post("/token", data={"username": user["email"], "password": password + "x"})
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio()
+async def test_token_with_unknown_email(client, faker):
+    res = await client.post("/token", data={"username": faker.email(), "password": faker.password()})
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio()
+async def test_token_for_user_without_password(client, db_client, faker):
+    email = faker.email()
+    await db_client.query(
+        """
+        insert User {
+            first_name := <str>$first_name,
+            last_name := <str>$last_name,
+            email := <str>$email,
+            status := 'active',
+        }
+        """,
+        first_name=faker.first_name(),
+        last_name=faker.last_name(),
+        email=email,
+    )
+    res = await client.post("/token", data={"username": email, "password": ""})
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio()
+async def test_create_user(client, db_client, faker, mocker):
+    resolve = mocker.patch("app.api.v1.auth.auth.resolve_tg_users")
+    email = faker.email()
+    res = await client.post(
+        "/users",
+        data={
+            "first_name": faker.first_name(),
+            "last_name": faker.last_name(),
+            "email": email,
+            "password": "secret",
+            "tg_name": "@someone",
+        },
+    )
+    assert res.status_code == status.HTTP_202_ACCEPTED
+    assert res.json()["email"] == email
+    assert res.json()["tg_name"] == "@someone"
+    resolve.assert_called_once()
+
+    created = await db_client.query_single(
+        "select User { hashed_password, tg_username } filter .email = <str>$email",
+        email=email,
+    )
+    assert created.hashed_password == "hashed:secret"  # noqa: S105
+    assert created.tg_username == "@someone"
+
+
+@pytest.mark.asyncio()
+async def test_create_user_with_taken_email(client, create_user, faker):
+    user, _ = await create_user()
+    res = await client.post(
+        "/users",
+        data={
+            "first_name": faker.first_name(),
+            "last_name": faker.last_name(),
+            "email": user["email"],
+            "password": faker.password(),
+        },
+    )
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
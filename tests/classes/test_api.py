@@ -26,3 +26,31 @@ async def test_get_classes(admin_client, create_class):
     res = await admin_client.get(BASE_URL)
     assert res.status_code == status.HTTP_200_OK
     assert len(res.json()["data"]) == number_of_classes
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures("homework")
+async def test_class_homework_stats(teacher_client, student):
+    student_obj, _ = student
+    res = await teacher_client.get(f"{BASE_URL}/{student_obj['class']['id']}/homework-stats?window=weeks")
+    assert res.status_code == status.HTTP_200_OK
+    stats = res.json()
+    assert stats["total"] == stats["upcoming"] == 1
+    assert stats["grade_mean"] is None
+    assert stats["grade_distribution"] == []
+    assert len(stats["by_window"]) == 1
+
+
+@pytest.mark.asyncio()
+async def test_get_classes_not_modified(admin_client, create_class, db_queries):
+    await create_class()
+    res = await admin_client.get(BASE_URL)
+    etag = res.headers["ETag"]
+    db_queries.clear()
+    res = await admin_client.get(BASE_URL, headers={"If-None-Match": etag})
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+    assert len(db_queries.endpoint) == 1
+    await create_class()
+    res = await admin_client.get(BASE_URL, headers={"If-None-Match": etag})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["ETag"] != etag
@@ -1,35 +1,124 @@
 import asyncio
 import random
 from datetime import datetime, timedelta
+from fnmatch import fnmatch
 from typing import AsyncGenerator
-from unittest.mock import MagicMock
 
 import edgedb
 import pytest
 import pytest_asyncio
 from faker import Faker
-from httpx import AsyncClient
+from fastapi import Cookie
+from httpx import AsyncClient, Response
 from pytest_mock import MockerFixture
 from telethon import TelegramClient
 from telethon.types import User as TgUser
 
-import app.api.v1.auth.auth as auth_dependencies
+import app.dependencies.auth as auth_dependencies
+from app.config import settings
+from app.dependencies.db import get_db
+from app.dependencies.user_cache import current_user_cache
 from run import app
 
+# Makes the app report its DB round trips per request, see `query_budget`.
+settings.DEBUG = True
+
+
+class FakePasswordHasher:
+    """Stands in for bcrypt, which would dominate the suite's run time."""
+
+    async def hash(self, password: str) -> str:
+        return f"hashed:{password}"
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return hashed_password == f"hashed:{password}"
+
 
 @pytest.fixture(autouse=True)
 def _mock_auth_functions(mocker: MockerFixture):
-    mocker.patch.object(
-        auth_dependencies,
-        "get_password_hash",
-        MagicMock(return_value="mocked_hash"),
-    )
+    mocker.patch.object(auth_dependencies, "password_hasher", FakePasswordHasher())
 
 
 async def mock_tg_user(*args, **kwargs):  # noqa: ARG001
     return TgUser(id=random.randint(100, 30000))
 
 
+class RecordingClient:
+    """Proxy over the request's db client that records every query text."""
+
+    def __init__(self, db_client, queries: list[str]):
+        self._db_client = db_client
+        self._queries = queries
+
+    def __getattr__(self, name):
+        attr = getattr(self._db_client, name)
+        if name.startswith("with_"):
+            return lambda *args, **kwargs: RecordingClient(attr(*args, **kwargs), self._queries)
+        if not name.startswith(("query", "execute")):
+            return attr
+
+        async def recorded(query, *args, **kwargs):
+            self._queries.append(query)
+            return await attr(query, *args, **kwargs)
+
+        return recorded
+
+
+class QueryLog(list[str]):
+    @property
+    def endpoint(self) -> list[str]:
+        """Queries issued by the handler itself, without the current user lookup."""
+        return [query for query in self if "global current_user" not in query]
+
+
+@pytest.fixture()
+def db_queries():
+    queries = QueryLog()
+
+    async def recording_get_db(edgedb_auth_token: str | None = Cookie(None)):
+        return RecordingClient(await get_db(edgedb_auth_token), queries)
+
+    app.dependency_overrides[get_db] = recording_get_db
+    yield queries
+    app.dependency_overrides.pop(get_db, None)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(budgets): fail a request that makes more DB round trips than its "
+        'endpoint allows, e.g. {"PATCH /api/v1/homeworks/*": 2}',
+    )
+
+
+query_budgets: dict[str, int] = {}
+
+
+@pytest.fixture(autouse=True)
+def _query_budget(request):
+    marker = request.node.get_closest_marker("query_budget")
+    query_budgets.update(marker.args[0] if marker else {})
+    yield
+    query_budgets.clear()
+
+
+async def check_query_budget(response: Response) -> None:
+    endpoint = f"{response.request.method} {response.request.url.path}"
+    budget = next((n for pattern, n in query_budgets.items() if fnmatch(endpoint, pattern)), None)
+    queries = int(response.headers.get("x-db-query-count", 0))
+    if budget is not None and queries > budget:
+        pytest.fail(f"{endpoint} made {queries} DB queries, over its budget of {budget}")
+
+
+def app_client() -> AsyncClient:
+    return AsyncClient(app=app, base_url="http://test/api/v1", event_hooks={"response": [check_query_budget]})
+
+
+@pytest.fixture(autouse=True)
+def _clear_current_user_cache():
+    current_user_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     loop = asyncio.get_event_loop()
@@ -44,10 +133,7 @@ def faker_seed():
 
 @pytest_asyncio.fixture()
 async def client() -> AsyncGenerator[AsyncClient, None]:
-    async with AsyncClient(
-        app=app,
-        base_url="http://test",
-    ) as client:
+    async with app_client() as client:
         # await tg_client.connect() # noqa: ERA001
         # await tg_client.sign_in(bot_token=settings.BOT_TOKEN) # noqa: ERA001
         yield client
@@ -55,12 +141,14 @@ async def client() -> AsyncGenerator[AsyncClient, None]:
 
 @pytest_asyncio.fixture()
 async def db_client():
-    async with edgedb.asyncio_client.create_async_client() as db:
+    async with edgedb.asyncio_client.create_async_client() as client:
+        db = client.with_config(apply_access_policies=False)
         yield db
         await db.query(
             """
             delete Class;
             delete Homework;
+            delete Assignment;
             delete Subject;
             delete User;
             """
@@ -72,14 +160,12 @@ async def create_user(client, faker: Faker, mocker: MockerFixture):
     async def inner(tg_name: str | None = None):
         mocker.patch.object(TelegramClient, "get_entity", mock_tg_user)
         password = faker.password()
-        profile = faker.profile()
-        username = profile["username"]
         resp = await client.post(
             "/users",
             data={
                 "first_name": faker.first_name(),
                 "last_name": faker.last_name(),
-                "username": username,
+                "email": faker.unique.email(),
                 "password": password,
                 "tg_name": tg_name,
             },
@@ -100,14 +186,11 @@ async def admin_client(client, create_user, db_client):
             """,
         user_id=user["id"],
     )
-    async with AsyncClient(
-        app=app,
-        base_url="http://test",
-    ) as client:
+    async with app_client() as client:
         res = (
             await client.post(
                 "/token",
-                data={"username": user["username"], "password": password},
+                data={"username": user["email"], "password": password},
             )
         ).json()
         client.headers.update({"Authorization": f"{res['token_type'].capitalize()} {res['access_token']}"})
@@ -171,16 +254,13 @@ async def teacher(create_teacher):
 
 @pytest_asyncio.fixture()
 async def teacher_client(teacher):
-    async with AsyncClient(
-        app=app,
-        base_url="http://test",
-    ) as client:
+    async with app_client() as client:
         user, password = teacher
         res = (
             await client.post(
                 "/token",
                 data={
-                    "username": user["user"]["username"],
+                    "username": user["user"]["email"],
                     "password": password,
                 },
             )
@@ -225,15 +305,30 @@ async def create_teacher(client, create_user, create_class, create_subject, fake
 async def student_client(student):
     student_obj, password = student
 
-    async with AsyncClient(
-        app=app,
-        base_url="http://test",
-    ) as client:
+    async with app_client() as client:
+        res = (
+            await client.post(
+                "/token",
+                data={
+                    "username": student_obj["user"]["email"],
+                    "password": password,
+                },
+            )
+        ).json()
+        client.headers.update({"Authorization": f"{res['token_type'].capitalize()} {res['access_token']}"})
+        yield client
+
+
+@pytest_asyncio.fixture()
+async def parent_client(parent):
+    parent_obj, password = parent
+
+    async with app_client() as client:
         res = (
             await client.post(
                 "/token",
                 data={
-                    "username": student_obj["user"]["username"],
+                    "username": parent_obj["user"]["email"],
                     "password": password,
                 },
             )
@@ -0,0 +1,140 @@
+import logging
+
+import pytest
+from edgedb import base_client
+from edgedb.errors import TransactionSerializationError
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from pydantic import SecretStr
+
+from app.config import settings
+from app.dependencies import metrics
+from app.dependencies.db_metrics import (
+    InstrumentedClient,
+    QueryCountMiddleware,
+    create_instrumented_client,
+)
+from app.server.metrics import router as metrics_router
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(metrics, "histograms", {})
+    monkeypatch.setattr(metrics, "counters", {})
+    return create_instrumented_client().with_globals({"current_user_id": "x"})
+
+
+async def select_students(client):
+    return await client.query("select Student", class_id="secret")
+
+
+async def select_students_json(client):
+    return await client.query_json("select Student")
+
+
+@pytest.mark.asyncio()
+async def test_query_metrics_are_named_after_the_caller(client, monkeypatch):
+    async def fake_query(self, query_context):  # noqa: ARG001
+        if query_context.query_options.output_format.name == "JSON":
+            return '[{"id": 1}]'
+        return [1, 2, 3]
+
+    monkeypatch.setattr(base_client.BaseClient, "_query", fake_query)
+
+    assert isinstance(client, InstrumentedClient)
+    await select_students(client)
+    await select_students_json(client)
+
+    rows = metrics.histogram("edgedb_query_rows", "", query="select_students")
+    assert (rows.count, rows.sum) == (1, 3)
+    size = metrics.histogram("edgedb_query_result_bytes", "", query="select_students_json")
+    assert (size.count, size.sum) == (1, len('[{"id": 1}]'))
+    assert metrics.histogram("edgedb_query_seconds", "", query="select_students").count == 1
+
+
+@pytest.mark.asyncio()
+async def test_retries_are_counted(client, monkeypatch):
+    async def fake_query(self, query_context):  # noqa: ARG001
+        rule = query_context.retry_options.get_rule_for_exception(TransactionSerializationError())
+        rule.backoff(0)
+        rule.backoff(1)
+        return []
+
+    monkeypatch.setattr(base_client.BaseClient, "_query", fake_query)
+
+    await select_students(client)
+
+    assert metrics.counter("edgedb_query_retries_total", "", query="select_students").value == 2
+
+
+@pytest.mark.asyncio()
+async def test_slow_queries_log_param_shapes_only(client, monkeypatch, caplog):
+    async def fake_query(self, query_context):  # noqa: ARG001
+        return []
+
+    monkeypatch.setattr(base_client.BaseClient, "_query", fake_query)
+    monkeypatch.setattr(InstrumentedClient, "slow_query_seconds", 0)
+
+    with caplog.at_level(logging.WARNING):
+        await select_students(client)
+
+    assert "select_students" in caplog.text
+    assert "class_id: str" in caplog.text
+    assert "secret" not in caplog.text
+
+
+@pytest.mark.asyncio()
+async def test_query_count_header(client, monkeypatch):
+    async def fake_query(self, query_context):  # noqa: ARG001
+        return []
+
+    monkeypatch.setattr(base_client.BaseClient, "_query", fake_query)
+    api = FastAPI()
+    api.add_middleware(QueryCountMiddleware)
+
+    @api.get("/students")
+    async def get_students():
+        await select_students(client)
+        await select_students(client)
+
+    async with AsyncClient(app=api, base_url="http://test") as http:
+        res = await http.get("/students")
+
+    assert res.headers["x-db-query-count"] == "2"
+    assert float(res.headers["x-db-query-time"]) >= 0
+
+
+def test_render_prometheus_text(monkeypatch):
+    monkeypatch.setattr(metrics, "histograms", {})
+    monkeypatch.setattr(metrics, "counters", {})
+    metrics.histogram("q_seconds", "Latency", (0.1,), query='a"b').observe(0.05)
+    metrics.counter("q_retries_total", "Retries", query="a").inc()
+
+    assert metrics.render().splitlines() == [
+        "# HELP q_seconds Latency",
+        "# TYPE q_seconds histogram",
+        'q_seconds_bucket{query="a\\"b",le="0.1"} 1',
+        'q_seconds_bucket{query="a\\"b",le="+Inf"} 1',
+        'q_seconds_sum{query="a\\"b"} 0.05',
+        'q_seconds_count{query="a\\"b"} 1',
+        "# HELP q_retries_total Retries",
+        "# TYPE q_retries_total counter",
+        'q_retries_total{query="a"} 1',
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_metrics_endpoint_needs_the_token(monkeypatch):
+    api = FastAPI()
+    api.include_router(metrics_router)
+
+    async with AsyncClient(app=api, base_url="http://test") as http:
+        monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+        assert (await http.get("/metrics")).status_code == status.HTTP_404_NOT_FOUND
+
+        monkeypatch.setattr(settings, "METRICS_TOKEN", SecretStr("scrape"))
+        assert (await http.get("/metrics")).status_code == status.HTTP_401_UNAUTHORIZED
+        res = await http.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+        res = await http.get("/metrics", headers={"Authorization": "Bearer scrape"})
+        assert res.status_code == status.HTTP_200_OK
@@ -0,0 +1,49 @@
+import orjson
+import pytest
+
+from app.dependencies.fieldsets import (
+    CLASS_FIELDSET,
+    HOMEWORK_FIELDSET,
+    PARENT_FIELDSET,
+    STUDENT_FIELDSET,
+    SUBJECT_FIELDSET,
+    TEACHER_FIELDSET,
+    USER_FIELDSET,
+    Fieldset,
+    full_shape,
+)
+from app.dependencies.schema import SCHEMA, parse_schema
+
+FIELDSETS = {
+    "User": USER_FIELDSET,
+    "Class": CLASS_FIELDSET,
+    "Subject": SUBJECT_FIELDSET,
+    "Student": STUDENT_FIELDSET,
+    "Teacher": TEACHER_FIELDSET,
+    "Parent": PARENT_FIELDSET,
+    "Homework": HOMEWORK_FIELDSET,
+}
+
+
+def test_fieldsets_match_schema():
+    types = parse_schema(SCHEMA.read_text())
+    link_targets = {id(fieldset): name for name, fieldset in FIELDSETS.items()}
+
+    def check(type_name: str, fieldset: Fieldset):
+        info = types[type_name]
+        assert set(fieldset.properties) - {"id"} <= info.properties | info.computed, type_name
+        assert set(fieldset.links) <= info.links, type_name
+        assert set(fieldset.default) <= set(fieldset.properties) | set(fieldset.links), type_name
+        for link in fieldset.links.values():
+            check(link_targets[id(link)], link)
+
+    for type_name, fieldset in FIELDSETS.items():
+        check(type_name, fieldset)
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(("type_name", "fieldset"), FIELDSETS.items(), ids=FIELDSETS)
+async def test_full_shape_runs(db_client, type_name, fieldset):
+    rows = await db_client.query_json(f"select {type_name} {full_shape(fieldset)} limit 1")
+
+    assert isinstance(orjson.loads(rows), list)
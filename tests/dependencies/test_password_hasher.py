@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.dependencies.hashing import PasswordHasher
+
+
+class BlockingContext:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed-{password}"
+
+
+@pytest.mark.asyncio()
+async def test_password_hasher_rejects_when_queue_is_full():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, workers=1, max_queue=1)
+    pending = [asyncio.create_task(hasher.hash(str(i))) for i in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as e:
+        await hasher.hash("overflow")
+    assert e.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    context.release.set()
+    assert await asyncio.gather(*pending) == ["hashed-0", "hashed-1"]
+    assert hasher.in_flight == 0
+    assert hasher.hash_seconds.count >= len(pending)
@@ -0,0 +1,113 @@
+from fastapi import FastAPI, Form, status
+from fastapi.testclient import TestClient
+
+from app.dependencies.rate_limit import (
+    Limit,
+    MemoryBuckets,
+    RateLimitMiddleware,
+    RouteLimits,
+    SharedBuckets,
+    bucket_key,
+)
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_buckets_allow_burst_then_refill():
+    timer = FakeTimer()
+    buckets = MemoryBuckets(timer=timer)
+    limit = Limit(per_minute=6, burst=3)
+    key = bucket_key("ip", "/auth/signin", "10.0.0.1")
+    assert [buckets.take(key, limit) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take(key, limit) == 10
+    timer.now += 10
+    assert buckets.take(key, limit) == 0
+    assert buckets.take(bucket_key("ip", "/auth/signin", "10.0.0.2"), limit) == 0
+
+
+def test_memory_buckets_evict_full_buckets():
+    timer = FakeTimer()
+    buckets = MemoryBuckets(evict_every=60, timer=timer)
+    limit = Limit(per_minute=60, burst=5)
+    for i in range(10):
+        buckets.take(bucket_key(str(i)), limit)
+    assert len(buckets.tats) == 10
+    timer.now += 61
+    buckets.take(bucket_key("new"), limit)
+    assert len(buckets.tats) == 1
+
+
+def test_memory_buckets_evict_in_batches_when_full(mocker):
+    buckets = MemoryBuckets(max_keys=100, timer=FakeTimer())
+    evict = mocker.spy(buckets, "evict")
+    limit = Limit(per_minute=60, burst=5)
+    for i in range(150):
+        buckets.take(bucket_key(str(i)), limit)
+    # Full of live buckets: each pass drops the oldest down to 90 keys.
+    assert evict.call_count == 5
+    assert len(buckets.tats) <= 100
+    assert bucket_key("149") in buckets.tats
+    assert bucket_key("0") not in buckets.tats
+
+
+def test_shared_buckets_are_shared_between_workers(tmp_path):
+    timer = FakeTimer()
+    path = str(tmp_path / "buckets")
+    worker_a = SharedBuckets(path, slots=64, timer=timer)
+    worker_b = SharedBuckets(path, slots=64, timer=timer)
+    limit = Limit(per_minute=6, burst=2)
+    key = bucket_key("email", "/auth/signin", "parent@example.com")
+    assert worker_a.take(key, limit) == 0
+    assert worker_b.take(key, limit) == 0
+    assert worker_a.take(key, limit) == 10
+    timer.now += 10
+    assert worker_b.take(key, limit) == 0
+
+
+def make_client():
+    app = FastAPI()
+    hashed = []
+
+    @app.post("/auth/signin")
+    @app.post("/auth/signin/")
+    async def signin(email: str = Form(...), password: str = Form(...)):
+        hashed.append(password)
+        return {"email": email}
+
+    limits = RouteLimits(per_ip=Limit(per_minute=60, burst=4), per_email=Limit(per_minute=1, burst=2))
+    app.add_middleware(RateLimitMiddleware, routes={"/auth/signin": limits}, store=MemoryBuckets())
+    return TestClient(app), hashed
+
+
+def test_rate_limit_middleware_rejects_before_handler():
+    client, hashed = make_client()
+    for _ in range(2):
+        res = client.post("/auth/signin", data={"email": "A@example.com", "password": "x"})
+        assert res.json() == {"email": "A@example.com"}
+    res = client.post("/auth/signin", data={"email": "a@example.com", "password": "x"})
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert res.headers["Retry-After"] == "60"
+    assert res.json() == {"detail": "Too many attempts, try again later"}
+    assert len(hashed) == 2
+
+    res = client.post("/auth/signin", data={"email": "b@example.com", "password": "x"})
+    assert res.status_code == status.HTTP_200_OK
+    res = client.post("/auth/signin", data={"email": "c@example.com", "password": "x"})
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert len(hashed) == 3
+
+
+def test_rate_limit_middleware_ignores_trailing_slash():
+    client, hashed = make_client()
+    for path in ("/auth/signin", "/auth/signin/"):
+        res = client.post(path, data={"email": "a@example.com", "password": "x"})
+        assert res.status_code == status.HTTP_200_OK
+    res = client.post("/auth/signin/", data={"email": "a@example.com", "password": "x"})
+    assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert len(hashed) == 2
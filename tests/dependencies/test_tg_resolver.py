@@ -0,0 +1,81 @@
+import asyncio
+from uuid import uuid4
+
+import orjson
+import pytest
+from telethon.errors import FloodWaitError, UsernameNotOccupiedError
+from telethon.types import User as TgUser
+
+from app.dependencies.db_queries.select_unresolved_tg_users_async_edgeql import (
+    SelectUnresolvedTgUsersResult,
+)
+from app.dependencies.tg_resolver import resolve_tg_users
+
+
+class FakeDb:
+    def __init__(self, users):
+        self.users = users
+        self.updates = []
+
+    async def query(self, query, **kwargs):  # noqa: ARG002
+        return self.users
+
+    async def execute(self, query, users):  # noqa: ARG002
+        self.updates.extend(orjson.loads(users))
+
+
+class FakeTgClient:
+    def __init__(self, flood_waits=0):
+        self.flood_waits = flood_waits
+        self.active = 0
+        self.max_active = 0
+
+    async def get_entity(self, key):
+        if self.flood_waits:
+            self.flood_waits -= 1
+            raise FloodWaitError(request=None, capture=0)
+        if key == "missing":
+            raise ValueError(key)
+        if key == "unoccupied":
+            raise UsernameNotOccupiedError(request=None)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return TgUser(id=len(str(key)), username=f"@{key}")
+
+
+@pytest.mark.asyncio()
+async def test_resolve_tg_users():
+    users = [SelectUnresolvedTgUsersResult(id=uuid4(), tg_id=None, tg_username=f"name{i}") for i in range(20)]
+    users.append(SelectUnresolvedTgUsersResult(id=uuid4(), tg_id=None, tg_username="missing"))
+    db = FakeDb(users)
+    tg_client = FakeTgClient(flood_waits=1)
+    assert await resolve_tg_users(db, tg_client) == len(users)
+    assert 1 < tg_client.max_active <= 8
+    *resolved, missing = db.updates
+    assert all(u["tg_username"].startswith("@name") and "tg_id" in u for u in resolved)
+    assert missing == {"id": str(users[-1].id)}
+
+
+@pytest.mark.asyncio()
+async def test_resolve_tg_users_stamps_rpc_errors():
+    users = [
+        SelectUnresolvedTgUsersResult(id=uuid4(), tg_id=None, tg_username="unoccupied"),
+        SelectUnresolvedTgUsersResult(id=uuid4(), tg_id=None, tg_username="name"),
+    ]
+    db = FakeDb(users)
+    assert await resolve_tg_users(db, FakeTgClient()) == len(users)
+    failed, resolved = db.updates
+    assert failed == {"id": str(users[0].id)}
+    assert resolved["tg_username"] == "@name"
+
+
+@pytest.mark.asyncio()
+async def test_resolve_tg_users_runs_one_batch_at_a_time():
+    users = [SelectUnresolvedTgUsersResult(id=uuid4(), tg_id=None, tg_username=f"name{i}") for i in range(20)]
+    db = FakeDb(users)
+    tg_client = FakeTgClient()
+    await asyncio.gather(resolve_tg_users(db, tg_client), resolve_tg_users(db, tg_client))
+    assert tg_client.max_active <= 8
+    assert len(db.updates) == 2 * len(users)
@@ -0,0 +1,42 @@
+from jose import jwt
+
+from app.dependencies.db import TokenClientCache, client
+
+
+def make_token(sub: str, exp: int | None = None) -> str:
+    claims = {"sub": sub} if exp is None else {"sub": sub, "exp": exp}
+    return jwt.encode(claims, "auth-extension-key")
+
+
+def test_same_token_reuses_derived_client():
+    now = [1000.0]
+    cache = TokenClientCache(client, maxsize=10, clock=lambda: now[0])
+    token = make_token("a", exp=2000)
+
+    derived = cache.get(token)
+
+    assert cache.get(token) is derived
+    assert cache.get(make_token("b", exp=2000)) is not derived
+    assert derived._impl is client._impl  # noqa: SLF001
+    now[0] = 2000.0
+    assert cache.get(token) is not derived
+
+
+def test_expired_token_is_not_cached():
+    cache = TokenClientCache(client, maxsize=10, clock=lambda: 1000.0)
+
+    cache.get(make_token("a", exp=999))
+
+    assert not cache.entries
+
+
+def test_least_recently_used_client_is_evicted():
+    cache = TokenClientCache(client, maxsize=2, clock=lambda: 1000.0)
+    a, b, c = (make_token(sub) for sub in "abc")
+    derived_a = cache.get(a)
+    cache.get(b)
+    cache.get(a)
+    cache.get(c)
+
+    assert list(cache.entries) == [a, c]
+    assert cache.get(a) is derived_a
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import orjson
+import pytest
+from fastapi import HTTPException, status
+
+from app.dependencies.auth import (
+    create_access_token,
+    decode_access_token,
+    revoked_tokens,
+)
+
+
+def make_token(expires_delta=timedelta(minutes=5), **claims):
+    sub = {
+        "user_id": str(uuid4()),
+        "first_name": "first",
+        "last_name": "last",
+        "status": "active",
+        "is_teacher": True,
+        "is_student": False,
+        "is_admin": False,
+        "is_parent": False,
+        **claims,
+    }
+    return create_access_token({"sub": orjson.dumps(sub).decode()}, expires_delta)
+
+
+def test_decode_access_token():
+    _, user = decode_access_token(make_token(is_admin=True))
+    assert user.is_teacher is True
+    assert user.is_admin is True
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        make_token(expires_delta=timedelta(minutes=-1)),
+        make_token()[:-2] + "xx",
+        "not-a-token",
+    ],
+)
+def test_decode_invalid_access_token(token):
+    with pytest.raises(HTTPException) as e:
+        decode_access_token(token)
+    assert e.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_decode_revoked_access_token():
+    token = make_token()
+    claims, _ = decode_access_token(token)
+    revoked_tokens.revoke(claims["jti"], claims["exp"])
+    with pytest.raises(HTTPException):
+        decode_access_token(token)
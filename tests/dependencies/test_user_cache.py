@@ -0,0 +1,96 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from jose import jwt
+
+from app.dependencies.auth import get_current_user
+from app.dependencies.user_cache import CachedSession, UserCache, token_expiry
+from app.schemas.auth import FullUser, Status
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_user(**kwargs):
+    return FullUser(
+        id=uuid4(),
+        first_name="first",
+        last_name="last",
+        status=Status.active,
+        is_teacher=False,
+        is_student=True,
+        is_admin=False,
+        is_parent=False,
+        **kwargs,
+    )
+
+
+def make_session(expires_at=None):
+    return CachedSession(identity_id=uuid4(), user=make_user(), expires_at=expires_at)
+
+
+def test_user_cache_hit_and_expiry():
+    timer = FakeTimer()
+    cache = UserCache(maxsize=10, ttl=60, timer=timer)
+    session = make_session()
+    assert cache.get("token") is None
+    cache.set("token", session)
+    assert cache.get("token") is session
+    timer.now = 61
+    assert cache.get("token") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2}
+
+
+def test_user_cache_evicts_least_recently_used():
+    cache = UserCache(maxsize=2, ttl=60)
+    cache.set("a", make_session())
+    cache.set("b", make_session())
+    cache.get("a")
+    cache.set("c", make_session())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_user_cache_invalidate_user():
+    cache = UserCache(maxsize=10, ttl=60)
+    session = make_session()
+    cache.set("phone", session)
+    cache.set("laptop", CachedSession(identity_id=None, user=session.user))
+    cache.set("other", make_session())
+    cache.invalidate_user(session.user.id)
+    assert cache.get("phone") is None
+    assert cache.get("laptop") is None
+    assert cache.get("other") is not None
+
+
+def test_user_cache_does_not_outlive_token():
+    clock = FakeTimer()
+    cache = UserCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("token", make_session(expires_at=10))
+    assert cache.get("token") is not None
+    clock.now = 10
+    assert cache.get("token") is None
+    cache.set("token", make_session(expires_at=5))
+    assert cache.stats()["size"] == 0
+
+
+def test_token_expiry_is_read_without_the_signing_key():
+    token = jwt.encode({"sub": "identity", "exp": 1700000000}, "auth-extension-key")
+    assert token_expiry(token) == 1700000000
+    assert token_expiry(jwt.encode({"sub": "identity"}, "auth-extension-key")) is None
+    assert token_expiry("not a jwt") is None
+
+
+@pytest.mark.asyncio()
+async def test_expired_auth_token_is_rejected_without_db():
+    db_client = AsyncMock()
+    token = jwt.encode({"sub": "identity", "exp": 1}, "auth-extension-key")
+    assert await get_current_user(None, db_client, token) is None
+    db_client.query_single.assert_not_called()
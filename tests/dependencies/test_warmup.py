@@ -0,0 +1,58 @@
+import edgedb
+import pytest
+from edgedb.protocol.protocol import OutputFormat
+
+from app.dependencies.warmup import (
+    generated_queries,
+    register_query,
+    registered_queries,
+    warm_up_queries,
+)
+
+
+class DescribeOnlyDb:
+    def __init__(self, fail_on=None):
+        self.described = []
+        self.fail_on = fail_on
+
+    async def _describe_query(self, query, *, output_format, expect_one):
+        if query == self.fail_on:
+            raise edgedb.InvalidReferenceError("no such object")
+        self.described.append((query, output_format, expect_one))
+
+
+@pytest.mark.asyncio()
+async def test_generated_queries_are_collected_without_a_database():
+    queries = await generated_queries()
+
+    texts = [query for query, _, _ in queries]
+    assert len(texts) == len(set(texts))
+    insert_class = [q for q in texts if "insert Class" in q]
+    assert len(insert_class) == 1
+    assert (insert_class[0], OutputFormat.BINARY, True) in queries
+
+
+@pytest.mark.asyncio()
+async def test_warm_up_describes_generated_and_registered_queries():
+    db = DescribeOnlyDb()
+
+    register_query("select Class { name }")
+
+    count = await warm_up_queries(db)
+
+    assert count == len(db.described)
+    described = {query for query, _, _ in db.described}
+    assert "select Class { name }" in described
+    assert {query for query, _, _ in registered_queries} <= described
+    assert all(fmt in (OutputFormat.BINARY, OutputFormat.JSON, OutputFormat.NONE) for _, fmt, _ in db.described)
+
+
+@pytest.mark.asyncio()
+async def test_warm_up_keeps_going_past_a_broken_query():
+    broken = register_query("select Class { name }")
+    db = DescribeOnlyDb(fail_on=broken)
+
+    await warm_up_queries(db)
+
+    assert broken not in {query for query, _, _ in db.described}
+    assert db.described
@@ -1,8 +1,13 @@
+import csv
+import io
 from datetime import datetime, timedelta
 
+import orjson
 import pytest
 from fastapi import status
 
+from app.dependencies.user_cache import current_user_cache
+
 BASE_URL = "/homeworks"
 
 
@@ -38,6 +43,43 @@ async def test_create_homework(
         )
 
 
+@pytest.mark.asyncio()
+async def test_create_homework_for_class(teacher_client, create_subject, teacher, create_student, faker):
+    subject = await create_subject()
+    teacher_obj, _ = teacher
+    student, _ = await create_student()
+    data = {
+        "assigned_by": teacher_obj["id"],
+        "class_ids": [student["class"]["id"]],
+        "subject_id": subject["id"],
+        "assignment": faker.text(),
+        "deadline": (datetime.utcnow() + timedelta(days=1)).astimezone().isoformat(),
+    }
+    res = await teacher_client.post(BASE_URL, json=data)
+    assert res.status_code == status.HTTP_201_CREATED
+    assert res.json()["count"] == 1
+    assert res.json()["assignment"] == data["assignment"]
+    assert [i["assigned_to"] for i in res.json()["data"]] == [student["id"]]
+
+    res = await teacher_client.post(BASE_URL, json=data, params={"full": True})
+    assert res.status_code == status.HTTP_201_CREATED
+    assert res.json()["data"][0]["assigned_to"]["id"] == student["id"]
+
+
+@pytest.mark.asyncio()
+async def test_create_homework_without_recipients(teacher_client, create_subject, teacher, faker):
+    subject = await create_subject()
+    teacher_obj, _ = teacher
+    data = {
+        "assigned_by": teacher_obj["id"],
+        "subject_id": subject["id"],
+        "assignment": faker.text(),
+        "deadline": (datetime.utcnow() + timedelta(days=1)).astimezone().isoformat(),
+    }
+    res = await teacher_client.post(BASE_URL, json=data)
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio()
 async def test_create_homework_by_student(
     student_client,
@@ -75,6 +117,12 @@ async def test_get_homework_by_id_teacher(teacher_client, homework, create_homew
     assert res.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.asyncio()
+async def test_get_homework_by_id_admin(admin_client, homework):
+    res = await admin_client.get(f"{BASE_URL}/{homework['data'][0]['id']}")
+    assert res.status_code == status.HTTP_200_OK
+
+
 @pytest.mark.asyncio()
 async def test_get_homework_by_id_student(student_client, homework, create_teacher, create_student, create_homework):
     res = await student_client.get(f"{BASE_URL}/{homework['data'][0]['id']}")
@@ -98,6 +146,93 @@ async def test_get_homeworks(admin_client, create_homework):
     assert len(res.json()["data"]) == num_of_homeworks
 
 
+@pytest.mark.asyncio()
+async def test_get_homeworks_scoped_to_teacher(
+    teacher_client, homework, create_homework, create_teacher, create_student
+):
+    other_teacher = await create_teacher()
+    other_student = await create_student()
+    await create_homework(other_teacher, other_student)
+
+    res = await teacher_client.get(BASE_URL)
+    assert res.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in res.json()["data"]] == [homework["data"][0]["id"]]
+
+
+@pytest.mark.asyncio()
+async def test_get_homeworks_covers_every_role(
+    teacher_client, teacher, homework, create_homework, create_teacher, create_student, db_client
+):
+    teacher_obj, _ = teacher
+    other_teacher = await create_teacher()
+    child = await create_student()
+    childs_homework = await create_homework(other_teacher, child)
+    await create_homework(other_teacher, await create_student())
+    await db_client.query(
+        """
+        insert Parent {
+            user := (select User filter .id = <uuid>$user_id),
+            children := (select Student filter .id = <uuid>$child_id),
+        }
+        """,
+        user_id=teacher_obj["user"]["id"],
+        child_id=child[0]["id"],
+    )
+    current_user_cache.clear()
+
+    res = await teacher_client.get(BASE_URL)
+    assert res.status_code == status.HTTP_200_OK
+    assert {i["id"] for i in res.json()["data"]} == {
+        homework["data"][0]["id"],
+        childs_homework["data"][0]["id"],
+    }
+
+
+@pytest.mark.asyncio()
+async def test_get_homeworks_paginated(admin_client, create_homework):
+    num_of_homeworks = 5
+    for _ in range(num_of_homeworks):
+        await create_homework()
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        res = await admin_client.get(BASE_URL, params=params)
+        assert res.status_code == status.HTTP_200_OK
+        assert len(res.json()["data"]) <= params["limit"]
+        seen.extend(i["id"] for i in res.json()["data"])
+        if res.json()["next_cursor"] is None:
+            break
+        params["cursor"] = res.json()["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == num_of_homeworks
+
+
+@pytest.mark.asyncio()
+async def test_get_homeworks_invalid_cursor(admin_client):
+    res = await admin_client.get(BASE_URL, params={"cursor": "not-a-cursor"})
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures("homework")
+async def test_get_homeworks_sparse_fields(teacher_client):
+    res = await teacher_client.get(BASE_URL)
+    assert res.status_code == status.HTTP_200_OK
+    default = res.json()["data"][0]
+    assert "classes" not in default["assigned_by"]
+    assert "created_at" not in default
+
+    res = await teacher_client.get(BASE_URL, params={"fields": "assignment", "expand": "assigned_by.classes"})
+    assert res.status_code == status.HTTP_200_OK
+    homework_obj = res.json()["data"][0]
+    assert set(homework_obj) == {"id", "assignment", "deadline", "assigned_by"}
+    assert len(homework_obj["assigned_by"]["classes"]) == 1
+
+    res = await teacher_client.get(BASE_URL, params={"fields": "not_a_field"})
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.asyncio()
 async def test_update_homework_student(student_client, homework):
     res = await student_client.patch(
@@ -142,3 +277,126 @@ async def test_update_homework_teacher(teacher_client, homework):
     )
     assert res.status_code == status.HTTP_200_OK
     assert res.json()["assignment"] == "some"
+
+
+@pytest.mark.asyncio()
+async def test_homework_is_a_view_of_its_submission(teacher_client, homework):
+    homework_id = homework["data"][0]["id"]
+    res = await teacher_client.patch(f"{BASE_URL}/{homework_id}", json={"assignment": "shared", "grade": 4})
+    assert res.status_code == status.HTTP_200_OK
+
+    (assignment,) = (await teacher_client.get("/assignments")).json()["data"]
+    assert assignment["text"] == "shared"
+    assignment = (await teacher_client.get(f"/assignments/{assignment['id']}")).json()
+    submission_url = f"/assignments/{assignment['id']}/submissions/{assignment['submissions'][0]['id']}"
+    assert assignment["submissions"][0]["grade"] == 4
+
+    await teacher_client.patch(submission_url, json={"grade": 5})
+    res = await teacher_client.get(f"{BASE_URL}/{homework_id}")
+    assert res.json()["grade"] == 5
+    assert res.json()["assignment"] == "shared"
+
+
+@pytest.mark.asyncio()
+@pytest.mark.query_budget({"PATCH /homeworks/*": 2})
+async def test_update_homework_single_query(teacher_client, homework, db_queries):
+    for payload in ({"grade": 3}, {"done_by_student": True, "assignment": "some"}, {}):
+        db_queries.clear()
+        res = await teacher_client.patch(f"{BASE_URL}/{homework['data'][0]['id']}", json=payload)
+        assert res.status_code == status.HTTP_200_OK
+        assert len(db_queries.endpoint) == 1
+
+
+@pytest.mark.asyncio()
+@pytest.mark.query_budget({"PATCH /homeworks": 2})
+async def test_bulk_update_homeworks_teacher(teacher_client, create_homework, db_queries):
+    homeworks = [(await create_homework())["data"][0] for _ in range(3)]
+    db_queries.clear()
+    res = await teacher_client.patch(BASE_URL, json=[{"id": i["id"], "grade": 4} for i in homeworks])
+    assert res.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in res.json()["data"]] == [i["id"] for i in homeworks]
+    assert all(i["updated"] and i["grade"] == 4 for i in res.json()["data"])
+    assert len(db_queries.endpoint) == 1
+
+
+@pytest.mark.asyncio()
+async def test_bulk_update_homeworks_student(student_client, homework, create_homework, create_teacher, create_student):
+    other_homework = await create_homework(await create_teacher(), await create_student())
+    own_id = homework["data"][0]["id"]
+    other_id = other_homework["data"][0]["id"]
+    res = await student_client.patch(
+        BASE_URL,
+        json=[
+            {"id": own_id, "done_by_student": True},
+            {"id": other_id, "done_by_student": True},
+        ],
+    )
+    assert res.status_code == status.HTTP_200_OK
+    own, other = res.json()["data"]
+    assert own["updated"] is True
+    assert own["done_by_student"] is True
+    assert other["updated"] is False
+
+    res = await student_client.patch(BASE_URL, json=[{"id": own_id, "grade": 5}])
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["data"][0]["updated"] is False
+
+
+@pytest.mark.asyncio()
+async def test_bulk_update_homeworks_teacher_skips_unowned(teacher_client, homework, create_homework, create_teacher):
+    other_homework = await create_homework(await create_teacher())
+    own_id = homework["data"][0]["id"]
+    other_id = other_homework["data"][0]["id"]
+    res = await teacher_client.patch(BASE_URL, json=[{"id": own_id, "grade": 5}, {"id": other_id, "grade": 5}])
+    assert res.status_code == status.HTTP_200_OK
+    own, other = res.json()["data"]
+    assert own["updated"] is True
+    assert own["grade"] == 5
+    assert other["updated"] is False
+    assert other["detail"] == "Not found"
+
+
+@pytest.mark.asyncio()
+async def test_bulk_update_homeworks_admin_grades(admin_client, homework):
+    homework_id = homework["data"][0]["id"]
+    res = await admin_client.patch(BASE_URL, json=[{"id": homework_id, "grade": 3}])
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["data"][0]["updated"] is True
+    assert res.json()["data"][0]["grade"] == 3
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("grade", [-1, 2**31])
+async def test_bulk_update_homeworks_rejects_out_of_range_grades(teacher_client, homework, grade):
+    res = await teacher_client.patch(BASE_URL, json=[{"id": homework["data"][0]["id"], "grade": grade}])
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio()
+async def test_get_homeworks_etag_changes_on_update(teacher_client, homework):
+    res = await teacher_client.get(BASE_URL)
+    etag = res.headers["ETag"]
+    res = await teacher_client.get(BASE_URL, headers={"If-None-Match": etag})
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+    await teacher_client.patch(f"{BASE_URL}/{homework['data'][0]['id']}", json={"grade": 5})
+    res = await teacher_client.get(BASE_URL, headers={"If-None-Match": etag})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["data"][0]["grade"] == 5
+
+
+@pytest.mark.asyncio()
+async def test_export_homeworks(teacher_client, student, create_homework):
+    student_obj, _ = student
+    for _ in range(3):
+        await create_homework()
+    res = await teacher_client.get(f"{BASE_URL}/export", params={"class_id": student_obj["class"]["id"]})
+    assert res.status_code == status.HTTP_200_OK
+    rows = [orjson.loads(line) for line in res.text.splitlines()]
+    assert len(rows) == 3
+    assert [r["deadline"] for r in rows] == sorted(r["deadline"] for r in rows)
+
+    res = await teacher_client.get(f"{BASE_URL}/export", params={"format": "csv"})
+    assert res.headers["content-type"].startswith("text/csv")
+    header, *lines = list(csv.reader(io.StringIO(res.text)))
+    assert header[0] == "id"
+    assert len(lines) == 3
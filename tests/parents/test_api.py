@@ -20,18 +20,24 @@ async def test_get_parent_by_id(admin_client, parent):
 
 
 @pytest.mark.asyncio()
-async def test_add_child(admin_client, create_parent, student):
+@pytest.mark.query_budget({"POST /parents/*/children/*": 2, "DELETE /parents/*/children/*": 2})
+async def test_add_child(admin_client, create_parent, student, db_queries):
     parent_obj, _ = await create_parent("@mrparalon")
     student_obj, _ = student
+    db_queries.clear()
     res = await admin_client.post(f"{BASE_URL}/{parent_obj['id']}/children/{student_obj['id']}")
     assert res.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in res.json()["children"]] == [student_obj["id"]]
+    assert len(db_queries.endpoint) == 1
 
     res = await admin_client.get(f"{BASE_URL}/{parent_obj['id']}/children")
     assert res.status_code == status.HTTP_200_OK
     assert len(res.json()["data"]) == 1
 
+    db_queries.clear()
     res = await admin_client.delete(f"{BASE_URL}/{parent_obj['id']}/children/{student_obj['id']}")
     assert res.status_code == status.HTTP_204_NO_CONTENT
+    assert len(db_queries.endpoint) == 1
 
     res = await admin_client.get(f"{BASE_URL}/{parent_obj['id']}/children")
     assert res.status_code == status.HTTP_200_OK
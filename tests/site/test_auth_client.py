@@ -0,0 +1,89 @@
+import httpx
+import pytest
+from fastapi import HTTPException, status
+
+from app.dependencies.metrics import histogram
+from app.site.auth_client import AuthExtensionClient, CircuitBreaker
+
+
+class StubAuthServer:
+    """Answers from a script of responses or exceptions, one per call."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        step = self.script.pop(0) if self.script else 200
+        if isinstance(step, Exception):
+            raise step
+        return httpx.Response(step, json={"code": "abc"}, request=request)
+
+
+def make_client(server, retries=2, threshold=5):
+    return AuthExtensionClient(
+        "http://auth.test",
+        timeout=httpx.Timeout(1),
+        limits=httpx.Limits(max_connections=2),
+        retries=retries,
+        breaker=CircuitBreaker(threshold, reset_timeout=30),
+        backoff=0,
+        transport=httpx.MockTransport(server),
+    )
+
+
+@pytest.mark.asyncio()
+async def test_auth_client_retries_unsent_requests():
+    server = StubAuthServer(httpx.ConnectError("refused"), 200)
+    client = make_client(server)
+    res = await client.post("/authenticate", json={})
+    assert res.status_code == status.HTTP_200_OK
+    assert server.calls == 2
+    assert histogram("edgedb_auth_request_seconds", "", endpoint="/authenticate").count >= 2
+
+
+@pytest.mark.asyncio()
+async def test_auth_client_does_not_resend_non_idempotent_calls():
+    server = StubAuthServer(httpx.ReadTimeout("slow"), 503)
+    client = make_client(server)
+    with pytest.raises(HTTPException):
+        await client.post("/authenticate", json={})
+    assert server.calls == 1
+    assert (await client.post("/authenticate", json={})).status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert server.calls == 2
+
+
+@pytest.mark.asyncio()
+async def test_auth_client_retries_idempotent_calls():
+    server = StubAuthServer(httpx.ReadTimeout("slow"), 503, 200)
+    client = make_client(server)
+    assert (await client.get("/token", idempotent=True)).status_code == status.HTTP_200_OK
+    assert server.calls == 3
+
+
+@pytest.mark.asyncio()
+async def test_auth_client_circuit_breaker_fails_fast():
+    server = StubAuthServer(*[httpx.ConnectError("refused")] * 3)
+    client = make_client(server, retries=0, threshold=3)
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await client.post("/register", json={})
+    assert client.breaker.is_open
+    with pytest.raises(HTTPException) as e:
+        await client.post("/register", json={})
+    assert e.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert server.calls == 3
+
+
+@pytest.mark.asyncio()
+async def test_auth_client_breaker_counts_calls_not_attempts():
+    server = StubAuthServer(*[httpx.ConnectError("refused")] * 3, 503, 503, 200)
+    client = make_client(server, retries=2, threshold=2)
+    with pytest.raises(HTTPException):
+        await client.post("/register", json={})
+    assert server.calls == 3
+    assert client.breaker.failures == 1
+    assert not client.breaker.is_open
+    assert (await client.get("/token", idempotent=True)).status_code == status.HTTP_200_OK
+    assert client.breaker.failures == 0
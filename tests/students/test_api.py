@@ -31,9 +31,42 @@ async def test_get_students(admin_client, create_student):
 
 
 @pytest.mark.asyncio()
-async def test_update_student_class(admin_client, create_student, create_class):
+async def test_update_student_class(admin_client, create_student, create_class, db_queries):
     student, _ = await create_student()
     class_ = await create_class()
+    db_queries.clear()
     res = await admin_client.patch(f"{BASE_URL}/{student['id']}", json={"class_id": class_["id"]})
     assert res.status_code == status.HTTP_200_OK
     assert res.json()["class"]["id"] == class_["id"]
+    assert len(db_queries.endpoint) == 1
+
+
+@pytest.mark.asyncio()
+async def test_student_homework_stats(teacher_client, student, create_homework):
+    student_obj, _ = student
+    created = await create_homework()
+    await create_homework()
+    homework_id = created["data"][0]["id"]
+    await teacher_client.patch(f"/homeworks/{homework_id}", json={"grade": 4, "done_by_student": True})
+    res = await teacher_client.get(f"{BASE_URL}/{student_obj['id']}/homework-stats")
+    assert res.status_code == status.HTTP_200_OK
+    stats = res.json()
+    assert (stats["total"], stats["done"], stats["upcoming"], stats["overdue"]) == (2, 1, 1, 0)
+    assert stats["grade_mean"] == stats["grade_median"] == 4
+    assert stats["grade_distribution"] == [{"grade": 4, "count": 1}]
+    assert sorted(s["total"] for s in stats["by_subject"]) == [1, 1]
+    assert sum(w["total"] for w in stats["by_window"]) == 2
+
+
+@pytest.mark.asyncio()
+async def test_parent_gets_only_own_children(admin_client, parent_client, parent, create_student):
+    parent_obj, _ = parent
+    child, _ = await create_student()
+    stranger, _ = await create_student()
+    await admin_client.post(f"/parents/{parent_obj['id']}/children/{child['id']}")
+
+    res = await parent_client.get(f"{BASE_URL}/{child['id']}")
+    assert res.status_code == status.HTTP_200_OK
+
+    res = await parent_client.get(f"{BASE_URL}/{stranger['id']}")
+    assert res.status_code == status.HTTP_404_NOT_FOUND
@@ -26,6 +26,19 @@ async def test_get_teacher_by_id(teacher_client, create_teacher):
     assert res.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.asyncio()
+async def test_get_teacher_by_id_expand(teacher_client, create_teacher):
+    teacher, _ = await create_teacher()
+    res = await teacher_client.get(f"{BASE_URL}/{teacher['id']}")
+    assert res.status_code == status.HTTP_200_OK
+    assert "subjects" not in res.json()
+
+    res = await teacher_client.get(f"{BASE_URL}/{teacher['id']}", params={"expand": "subjects,classes"})
+    assert res.status_code == status.HTTP_200_OK
+    assert [i["id"] for i in res.json()["subjects"]] == [i["id"] for i in teacher["subjects"]]
+    assert [i["id"] for i in res.json()["classes"]] == [i["id"] for i in teacher["classes"]]
+
+
 @pytest.mark.asyncio()
 async def test_get_teachers(admin_client, create_teacher):
     num_of_teachers = 4
@@ -73,3 +86,14 @@ async def test_update_teacher(teacher_client, create_teacher, create_subject, cr
     assert res.status_code == status.HTTP_200_OK
     assert {i["id"] for i in init_res.json()["classes"]} == {i["id"] for i in res.json()["classes"]}
     assert {i["id"] for i in init_res.json()["subjects"]} == {i["id"] for i in res.json()["subjects"]}
+
+
+@pytest.mark.asyncio()
+async def test_update_teacher_single_query(teacher_client, create_teacher, create_class, db_queries):
+    teacher, _ = await create_teacher()
+    class_ = await create_class()
+    for payload in ({"class_ids": [class_["id"]]}, {}):
+        db_queries.clear()
+        res = await teacher_client.patch(f"{BASE_URL}/{teacher['id']}", json=payload)
+        assert res.status_code == status.HTTP_200_OK
+        assert len(db_queries.endpoint) == 1